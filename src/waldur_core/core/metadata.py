@@ -253,6 +253,21 @@ class WaldurCore(BaseModel):
         description='Field oecd_fos_2007_code must be required for project.',
     )
 
+    QUOTA_USAGE_COMPACTION_MIN_ROWS = Field(
+        100,
+        description='Minimal number of quota usage delta rows which are folded into baseline row by periodic compaction.',
+    )
+
+    EVENT_ASYNC_WRITE = Field(
+        False,
+        description='Write events and their feeds in background task instead of writing them on transaction commit.',
+    )
+
+    POLL_CONCURRENCY_LIMIT = Field(
+        10,
+        description='Maximal number of concurrent backend calls made by polling tasks for the same service settings. Set it to 0 in order to disable the limit.',
+    )
+
     class Meta:
         public_settings = [
             'MASTERMIND_URL',
@@ -443,6 +458,11 @@ class WaldurSlurm(BaseModel):
         '/etc/waldur/id_rsa',
         description='Path to private key file used as SSH identity file for accessing SLURM master.',
     )
+    SSH_CONTROL_PERSIST = Field(
+        60,
+        description='Number of seconds SSH connection to SLURM master is kept open after last command, '
+        'so that consecutive commands reuse it. Set to 0 in order to open new connection for each command.',
+    )
     DEFAULT_LIMITS = Field(
         {
             'CPU': 16000,  # Measured unit is CPU-minutes
@@ -748,6 +768,10 @@ class WaldurOpenstack(BaseModel):
         False,
         description='If true, generated credentials of a tenant are exposed to project users',
     )
+    CLIENT_POOL_SIZE = Field(
+        100,
+        description='Maximum number of OpenStack clients kept alive in each process. Set to 0 to disable pooling',
+    )
 
     class Meta:
         public_settings = [
@@ -1,12 +1,15 @@
 import logging
+import random
 import traceback
 from uuid import uuid4
 
 from celery import Task as CeleryTask
-from celery import current_app
+from celery import current_app, states
 from celery.app.task import _reprtask
 from celery.local import Proxy
 from celery.worker.request import Request
+from django.conf import settings
+from django.core.cache import cache
 from django.db import IntegrityError
 from django.db import models as django_models
 from django.db.models import ObjectDoesNotExist
@@ -386,45 +389,68 @@ class BackgroundTask(CeleryTask, metaclass=TaskType):
        should log themselves explicitly and make sure that they will not
        spam error messages.
 
-    Implement "is_equal" method to define what tasks are equal and should
-    be executed simultaneously.
+    Implement "get_lock_key" method to define what tasks are equal and should
+    not be executed simultaneously. Lock is stored in cache when task is scheduled
+    and released when task is completed. If worker is lost, lock expires after
+    "lock_timeout" seconds.
     """
 
     is_background = True
+    lock_timeout = 60 * 60
 
-    def is_equal(self, other_task, *args, **kwargs):
-        """Return True if task do the same operation as other_task.
+    def get_lock_key(self, *args, **kwargs):
+        """Return identity of operation performed by task.
+        By default tasks with the same name are considered equal.
+        """
+        return self.name
+
+    def _get_lock_cache_key(self, *args, **kwargs):
+        return f'background_task_lock:{self.get_lock_key(*args, **kwargs)}'
 
-        Note! Other task is represented as serialized celery task - dictionary.
+    def acquire_lock(self, task_id, *args, **kwargs):
+        """Return True if there is no uncompleted task equal to current one.
+        Task retry is scheduled with the same task ID, so it is allowed to re-acquire its own lock.
         """
-        raise NotImplementedError(
-            'BackgroundTask should implement "is_equal" method to avoid queue overload.'
-        )
+        cache_key = self._get_lock_cache_key(*args, **kwargs)
+        if cache.add(cache_key, task_id, self.lock_timeout):
+            return True
+        if cache.get(cache_key) == task_id:
+            cache.touch(cache_key, self.lock_timeout)
+            return True
+        return False
 
-    def is_previous_task_processing(self, *args, **kwargs):
-        """Return True if exist task that is equal to current and is uncompleted"""
-        app = self._get_app()
-        inspect = app.control.inspect()
-        active = inspect.active() or {}
-        scheduled = inspect.scheduled() or {}
-        reserved = inspect.reserved() or {}
-        uncompleted = sum(
-            list(active.values()) + list(scheduled.values()) + list(reserved.values()),
-            [],
-        )
-        return any(self.is_equal(task, *args, **kwargs) for task in uncompleted)
+    def release_lock(self, task_id, *args, **kwargs):
+        cache_key = self._get_lock_cache_key(*args, **kwargs)
+        if cache.get(cache_key) == task_id:
+            cache.delete(cache_key)
 
     def apply_async(self, args=None, kwargs=None, **options):
         """Do not run background task if previous task is uncompleted"""
-        if self.is_previous_task_processing(*args, **kwargs):
+        if self.app.conf.task_always_eager:
+            return super().apply_async(args=args, kwargs=kwargs, **options)
+
+        args = args or ()
+        kwargs = kwargs or {}
+        task_id = options.setdefault('task_id', str(uuid4()))
+        if not self.acquire_lock(task_id, *args, **kwargs):
             message = (
                 'Background task %s was not scheduled, because its predecessor is not completed yet.'
                 % self.name
             )
             logger.info(message)
             # It is expected by Celery that apply_async return AsyncResult, otherwise celerybeat dies
-            return self.AsyncResult(options.get('task_id') or str(uuid4()))
-        return super().apply_async(args=args, kwargs=kwargs, **options)
+            return self.AsyncResult(task_id)
+        try:
+            return super().apply_async(args=args, kwargs=kwargs, **options)
+        except Exception:
+            self.release_lock(task_id, *args, **kwargs)
+            raise
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        # Retried task is still uncompleted, so lock is kept until it is finished.
+        if status != states.RETRY:
+            self.release_lock(task_id, *(args or ()), **(kwargs or {}))
+        return super().after_return(status, retval, task_id, args, kwargs, einfo)
 
 
 def log_celery_task(request):
@@ -456,9 +482,103 @@ def log_celery_task(request):
 Request.__str__ = log_celery_task
 
 
-class PollRuntimeStateTask(Task):
-    max_retries = 1200
-    default_retry_delay = 5
+def get_poll_slots_key(instance):
+    settings_id = getattr(instance, 'service_settings_id', None)
+    if settings_id:
+        return f'poll_slots:{settings_id}'
+
+
+def get_batch_poll_key(model, pk):
+    return f'batch_poll:{model._meta.label_lower}:{pk}'
+
+
+def mark_batch_polled(instances, timeout):
+    """
+    Mark runtime state of given resources as refreshed by periodic sweep,
+    so that polling tasks of these resources use database state
+    instead of calling backend for each resource.
+    """
+    cache.set_many(
+        {
+            get_batch_poll_key(instance.__class__, instance.pk): True
+            for instance in instances
+        },
+        timeout,
+    )
+
+
+def is_batch_polled(instance):
+    return bool(cache.get(get_batch_poll_key(instance.__class__, instance.pk)))
+
+
+class BackoffPollMixin:
+    """
+    Retry polling with exponential backoff and random jitter.
+    Number of concurrent backend calls per service settings is limited
+    by POLL_CONCURRENCY_LIMIT setting.
+    """
+
+    min_retry_delay = 5
+    max_retry_delay = 60
+    retry_backoff_factor = 1.5
+    slots_timeout = 5 * 60
+
+    def get_retry_countdown(self):
+        delay = min(
+            self.max_retry_delay,
+            self.min_retry_delay * self.retry_backoff_factor**self.request.retries,
+        )
+        return delay * random.uniform(0.8, 1.2)
+
+    def retry(self, *args, **kwargs):
+        kwargs.setdefault('countdown', self.get_retry_countdown())
+        return super().retry(*args, **kwargs)
+
+    def acquire_poll_slot(self, instance):
+        limit = settings.WALDUR_CORE['POLL_CONCURRENCY_LIMIT']
+        key = get_poll_slots_key(instance)
+        if not limit or not key:
+            return True
+        cache.add(key, 0, self.slots_timeout)
+        try:
+            used = cache.incr(key)
+        except ValueError:
+            # Counter has expired in the meantime
+            return True
+        if used > limit:
+            cache.decr(key)
+            return False
+        return True
+
+    def release_poll_slot(self, instance):
+        limit = settings.WALDUR_CORE['POLL_CONCURRENCY_LIMIT']
+        key = get_poll_slots_key(instance)
+        if not limit or not key:
+            return
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+
+    def call_backend(self, instance, method_name):
+        if not self.acquire_poll_slot(instance):
+            logger.debug(
+                'Polling of %s (PK: %s) is postponed, because concurrency limit is reached.',
+                instance.__class__.__name__,
+                instance.pk,
+            )
+            self.retry()
+        try:
+            backend = self.get_backend(instance)
+            return getattr(backend, method_name)(instance)
+        finally:
+            self.release_poll_slot(instance)
+
+
+class PollRuntimeStateTask(BackoffPollMixin, Task):
+    # Retries with backoff cover the same period of time
+    # as 1200 retries with 5 seconds delay.
+    max_retries = 110
 
     @classmethod
     def get_description(cls, instance, backend_pull_method, *args, **kwargs):
@@ -475,8 +595,8 @@ class PollRuntimeStateTask(Task):
         erred_state,
         deleted_state=None,
     ):
-        backend = self.get_backend(instance)
-        getattr(backend, backend_pull_method)(instance)
+        if not is_batch_polled(instance):
+            self.call_backend(instance, backend_pull_method)
         instance.refresh_from_db()
         if instance.runtime_state not in (success_state, erred_state, deleted_state):
             self.retry()
@@ -488,9 +608,8 @@ class PollRuntimeStateTask(Task):
         return instance
 
 
-class PollStateTask(Task):
-    max_retries = 1200
-    default_retry_delay = 5
+class PollStateTask(BackoffPollMixin, Task):
+    max_retries = 110
 
     def execute(self, instance, *args, **kwargs):
         if instance.state not in (
@@ -500,9 +619,10 @@ class PollStateTask(Task):
             self.retry()
 
 
-class PollBackendCheckTask(Task):
-    max_retries = 600
-    default_retry_delay = 5
+class PollBackendCheckTask(BackoffPollMixin, Task):
+    # Retries with backoff cover the same period of time
+    # as 600 retries with 5 seconds delay.
+    max_retries = 60
 
     @classmethod
     def get_description(cls, instance, backend_check_method, *args, **kwargs):
@@ -513,8 +633,7 @@ class PollBackendCheckTask(Task):
 
     def execute(self, instance, backend_check_method):
         # backend_check_method should return True if object does not exist at backend
-        backend = self.get_backend(instance)
-        if not getattr(backend, backend_check_method)(instance):
+        if not self.call_backend(instance, backend_check_method):
             self.retry()
         return instance
 
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from waldur_core.core import transactions
+
+
+class CommitBufferTest(TransactionTestCase):
+    def setUp(self):
+        self.flushed = []
+
+    def add(self, item):
+        buffer = transactions.get_commit_buffer('test', self.flushed.extend)
+        if buffer is None:
+            self.flushed.append(item)
+        else:
+            buffer.add(item)
+
+    def test_items_are_flushed_on_commit(self):
+        with transaction.atomic():
+            self.add(1)
+            self.add(2)
+            self.assertEqual(self.flushed, [])
+
+        self.assertEqual(self.flushed, [1, 2])
+
+    def test_items_of_rolled_back_savepoint_are_discarded(self):
+        with transaction.atomic():
+            self.add(1)
+            try:
+                with transaction.atomic():
+                    self.add(2)
+                    raise ValueError()
+            except ValueError:
+                pass
+            self.add(3)
+
+        self.assertEqual(sorted(self.flushed), [1, 3])
+
+    def test_item_is_handled_immediately_outside_of_transaction(self):
+        self.add(1)
+        self.assertEqual(self.flushed, [1])
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from waldur_core.core import tasks
+from waldur_core.core.tests.helpers import override_waldur_core_settings
+
+
+class DummyBackgroundTask(tasks.BackgroundTask):
+    name = 'waldur_core.core.tests.DummyBackgroundTask'
+
+    def get_lock_key(self, value):
+        return f'{self.name}:{value}'
+
+    def run(self, value):
+        return value
+
+
+@mock.patch('celery.app.task.Task.apply_async')
+class BackgroundTaskLockTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = DummyBackgroundTask()
+
+    def test_equal_task_is_not_scheduled_while_previous_is_uncompleted(
+        self, apply_async_mock
+    ):
+        self.task.apply_async(args=('foo',))
+        self.task.apply_async(args=('foo',))
+        self.assertEqual(apply_async_mock.call_count, 1)
+
+    def test_tasks_with_different_arguments_are_scheduled(self, apply_async_mock):
+        self.task.apply_async(args=('foo',))
+        self.task.apply_async(args=('bar',))
+        self.assertEqual(apply_async_mock.call_count, 2)
+
+    def test_lock_is_released_when_task_is_completed(self, apply_async_mock):
+        self.task.apply_async(args=('foo',), task_id='task-1')
+        self.task.after_return('SUCCESS', None, 'task-1', ('foo',), {}, None)
+        self.task.apply_async(args=('foo',))
+        self.assertEqual(apply_async_mock.call_count, 2)
+
+    def test_retry_is_scheduled_with_the_same_task_id(self, apply_async_mock):
+        self.task.apply_async(args=('foo',), task_id='task-1')
+        self.task.apply_async(args=('foo',), task_id='task-1')
+        self.assertEqual(apply_async_mock.call_count, 2)
+
+    def test_lock_is_kept_while_task_is_retried(self, apply_async_mock):
+        self.task.apply_async(args=('foo',), task_id='task-1')
+        self.task.after_return('RETRY', None, 'task-1', ('foo',), {}, None)
+        self.task.apply_async(args=('foo',))
+        self.assertEqual(apply_async_mock.call_count, 1)
+
+        self.task.after_return('SUCCESS', None, 'task-1', ('foo',), {}, None)
+        self.task.apply_async(args=('foo',))
+        self.assertEqual(apply_async_mock.call_count, 2)
+
+    def test_lock_is_released_if_task_is_not_published(self, apply_async_mock):
+        apply_async_mock.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            self.task.apply_async(args=('foo',))
+
+        apply_async_mock.side_effect = None
+        self.task.apply_async(args=('foo',))
+        self.assertEqual(apply_async_mock.call_count, 2)
+
+
+class PollTaskBackoffTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = tasks.PollRuntimeStateTask()
+        self.instance = mock.Mock(service_settings_id=1)
+
+    def test_retry_delay_grows_exponentially_up_to_maximum(self):
+        delays = []
+        for retries in (0, 3, 100):
+            self.task.push_request(retries=retries)
+            delays.append(self.task.get_retry_countdown())
+            self.task.pop_request()
+
+        self.assertTrue(4 <= delays[0] <= 6)
+        self.assertTrue(delays[0] < delays[1] < delays[2])
+        self.assertTrue(delays[2] <= self.task.max_retry_delay * 1.2)
+
+    @override_waldur_core_settings(POLL_CONCURRENCY_LIMIT=2)
+    def test_concurrent_backend_calls_are_limited_per_service_settings(self):
+        self.assertTrue(self.task.acquire_poll_slot(self.instance))
+        self.assertTrue(self.task.acquire_poll_slot(self.instance))
+        self.assertFalse(self.task.acquire_poll_slot(self.instance))
+
+        self.task.release_poll_slot(self.instance)
+        self.assertTrue(self.task.acquire_poll_slot(self.instance))
@@ -0,0 +1,70 @@
+"""
+Buffering of items produced inside transaction until it is committed.
+
+Items are accumulated per savepoint of transaction and are handed to flush callback
+when transaction is committed. If transaction or savepoint is rolled back,
+its items are discarded together with database changes.
+"""
+import collections
+import threading
+
+from django.db import transaction
+
+_local = threading.local()
+
+
+class CommitBuffer:
+    """
+    Items produced inside the same savepoint of transaction.
+    """
+
+    def __init__(self, flush_items):
+        self.items = []
+        self.flush_items = flush_items
+        self.connection = transaction.get_connection()
+        self.savepoint_ids = tuple(self.connection.savepoint_ids)
+        self.flushed = False
+
+    def is_pending(self):
+        if self.flushed:
+            return False
+        # Callback is dropped by Django when transaction or savepoint is rolled back.
+        return any(entry[1] == self.flush for entry in self.connection.run_on_commit)
+
+    def add(self, item):
+        self.items.append(item)
+
+    def flush(self):
+        if self.flushed:
+            return
+        self.flushed = True
+        self.flush_items(self.items)
+
+
+def _get_buffers(name):
+    if not hasattr(_local, 'buffers'):
+        _local.buffers = collections.defaultdict(list)
+    return _local.buffers[name]
+
+
+def get_commit_buffer(name, flush_items):
+    """
+    Returns buffer of current savepoint of transaction for items of given kind.
+    Flush callback accepts list of items and is called when transaction is committed.
+    Outside of transaction None is returned, so that caller handles items immediately.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return None
+
+    buffers = _get_buffers(name)
+    buffers[:] = [buffer for buffer in buffers if buffer.is_pending()]
+    savepoint_ids = tuple(connection.savepoint_ids)
+    for buffer in buffers:
+        if buffer.savepoint_ids == savepoint_ids:
+            return buffer
+
+    buffer = CommitBuffer(flush_items)
+    transaction.on_commit(buffer.flush)
+    buffers.append(buffer)
+    return buffer
@@ -11,7 +11,7 @@ from collections import defaultdict
 from django.apps import apps
 from django.core.exceptions import ObjectDoesNotExist
 
-from waldur_core.logging import models
+from waldur_core.logging import models, writers
 from waldur_core.logging.log import EventLoggerAdapter
 from waldur_core.logging.middleware import get_event_context
 
@@ -233,15 +233,13 @@ class EventLogger(BaseLogger):
         log = getattr(self.logger, level)
         log(msg, extra={'event_type': event_type, 'event_context': context})
 
-        event = models.Event.objects.create(
+        event = models.Event(
             event_type=event_type,
             message=msg,
             context=context,
         )
-        if event_context:
-            for scope in self.get_scopes(event_context) or []:
-                if scope and scope.id:
-                    models.Feed.objects.create(scope=scope, event=event)
+        scopes = self.get_scopes(event_context) if event_context else []
+        writers.add_event(event, scopes)
 
 
 class LoggableMixin:
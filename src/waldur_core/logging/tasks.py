@@ -8,6 +8,7 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 
 from waldur_core.core.utils import deserialize_instance
+from waldur_core.logging import writers
 from waldur_core.logging.models import BaseHook, Event, Feed, Report, SystemNotification
 from waldur_core.logging.utils import create_report_archive
 from waldur_core.structure import models as structure_models
@@ -15,6 +16,11 @@ from waldur_core.structure import models as structure_models
 logger = logging.getLogger(__name__)
 
 
+@shared_task(name='waldur_core.logging.write_events')
+def write_events(serialized_entries):
+    writers.write_events(writers.deserialize_entries(serialized_entries))
+
+
 @shared_task(name='waldur_core.logging.process_event')
 def process_event(event_id):
     event = Event.objects.get(id=event_id)
@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from waldur_core.core.tests.helpers import override_waldur_core_settings
+from waldur_core.logging import models
+from waldur_core.structure.log import event_logger
+from waldur_core.structure.tests import factories as structure_factories
+
+
+class BufferedEventsTest(TransactionTestCase):
+    def setUp(self):
+        self.customer = structure_factories.CustomerFactory()
+        models.Event.objects.all().delete()
+
+    def log_event(self):
+        event_logger.customer.info(
+            'Customer {customer_name} has been updated.',
+            event_type='customer_update_succeeded',
+            event_context={'customer': self.customer},
+        )
+
+    def test_events_are_written_on_transaction_commit(self):
+        with transaction.atomic():
+            self.log_event()
+            self.log_event()
+            self.assertEqual(models.Event.objects.count(), 0)
+
+        self.assertEqual(models.Event.objects.count(), 2)
+        self.assertEqual(
+            models.Feed.objects.filter(scope=self.customer).count(),
+            2,
+        )
+
+    def test_events_are_discarded_when_transaction_is_rolled_back(self):
+        with transaction.atomic():
+            self.log_event()
+            try:
+                with transaction.atomic():
+                    self.log_event()
+                    raise ValueError()
+            except ValueError:
+                pass
+
+        self.assertEqual(models.Event.objects.count(), 1)
+
+    def test_event_is_written_immediately_outside_of_transaction(self):
+        self.log_event()
+        self.assertEqual(models.Event.objects.count(), 1)
+        self.assertEqual(models.Feed.objects.filter(scope=self.customer).count(), 1)
+
+    @override_settings(task_always_eager=True)
+    @override_waldur_core_settings(EVENT_ASYNC_WRITE=True)
+    def test_events_are_written_by_background_task(self):
+        with transaction.atomic():
+            self.log_event()
+
+        event = models.Event.objects.get()
+        self.assertEqual(event.event_type, 'customer_update_succeeded')
+        self.assertEqual(models.Feed.objects.filter(event=event).count(), 1)
@@ -0,0 +1,106 @@
+"""
+Buffered writing of events and their feeds.
+
+Events emitted inside transaction are accumulated in memory and are written
+using bulk insert when transaction is committed. If transaction or savepoint
+is rolled back, its events are discarded as if they have been written to database.
+Optionally, events are handed to Celery task which writes them in batch.
+"""
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import signals
+from django.utils.dateparse import parse_datetime
+
+from waldur_core.core import transactions
+from waldur_core.logging import models
+
+
+def write_events(entries):
+    """
+    Write events and their feeds using bulk insert.
+    Entries are pairs of unsaved event and list of (content_type_id, object_id) pairs.
+    """
+    if not entries:
+        return []
+
+    with transaction.atomic():
+        events = models.Event.objects.bulk_create([event for event, _ in entries])
+        models.Feed.objects.bulk_create(
+            [
+                models.Feed(
+                    event=event, content_type_id=content_type_id, object_id=object_id
+                )
+                for event, scopes in entries
+                for content_type_id, object_id in scopes
+            ]
+        )
+        # bulk_create does not send signals, therefore they are sent explicitly
+        # in order to keep hooks and other receivers of events working.
+        for event in events:
+            signals.post_save.send(
+                sender=models.Event,
+                instance=event,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=event._state.db,
+            )
+    return events
+
+
+def serialize_entries(entries):
+    return [
+        {
+            'uuid': event.uuid.hex,
+            'created': event.created.isoformat(),
+            'event_type': event.event_type,
+            'message': event.message,
+            'context': event.context,
+            'scopes': scopes,
+        }
+        for event, scopes in entries
+    ]
+
+
+def deserialize_entries(serialized_entries):
+    return [
+        (
+            models.Event(
+                uuid=entry['uuid'],
+                created=parse_datetime(entry['created']),
+                event_type=entry['event_type'],
+                message=entry['message'],
+                context=entry['context'],
+            ),
+            [tuple(scope) for scope in entry['scopes']],
+        )
+        for entry in serialized_entries
+    ]
+
+
+def dispatch_entries(entries):
+    if not entries:
+        return
+    if settings.WALDUR_CORE['EVENT_ASYNC_WRITE']:
+        from waldur_core.logging import tasks
+
+        tasks.write_events.delay(serialize_entries(entries))
+    else:
+        write_events(entries)
+
+
+def add_event(event, scopes):
+    """
+    Store event and its feeds. Scopes are Django model instances.
+    """
+    scopes = [
+        (ContentType.objects.get_for_model(scope).id, scope.id)
+        for scope in scopes or []
+        if scope and scope.id
+    ]
+    buffer = transactions.get_commit_buffer('events', dispatch_entries)
+    if buffer is None:
+        dispatch_entries([(event, scopes)])
+    else:
+        buffer.add((event, scopes))
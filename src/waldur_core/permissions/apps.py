@@ -6,7 +6,9 @@ class PermissionsConfig(AppConfig):
     verbose_name = 'Permissions'
 
     def ready(self):
-        from . import handlers, signals
+        from django.db.models import signals as django_signals
+
+        from . import handlers, models, signals
 
         signals.role_granted.connect(
             handlers.log_role_granted,
@@ -22,3 +24,39 @@ class PermissionsConfig(AppConfig):
             handlers.log_role_updated,
             dispatch_uid='waldur_core.permissions.log_role_updated',
         )
+
+        django_signals.post_save.connect(
+            handlers.invalidate_user_snapshot,
+            sender=models.UserRole,
+            dispatch_uid='waldur_core.permissions.invalidate_user_snapshot_on_post_save',
+        )
+
+        django_signals.post_delete.connect(
+            handlers.invalidate_user_snapshot,
+            sender=models.UserRole,
+            dispatch_uid='waldur_core.permissions.invalidate_user_snapshot_on_post_delete',
+        )
+
+        django_signals.post_save.connect(
+            handlers.invalidate_roles_snapshot,
+            sender=models.Role,
+            dispatch_uid='waldur_core.permissions.invalidate_roles_snapshot_on_role_post_save',
+        )
+
+        django_signals.post_delete.connect(
+            handlers.invalidate_roles_snapshot,
+            sender=models.Role,
+            dispatch_uid='waldur_core.permissions.invalidate_roles_snapshot_on_role_post_delete',
+        )
+
+        django_signals.post_save.connect(
+            handlers.invalidate_roles_snapshot,
+            sender=models.RolePermission,
+            dispatch_uid='waldur_core.permissions.invalidate_roles_snapshot_on_role_permission_post_save',
+        )
+
+        django_signals.post_delete.connect(
+            handlers.invalidate_roles_snapshot,
+            sender=models.RolePermission,
+            dispatch_uid='waldur_core.permissions.invalidate_roles_snapshot_on_role_permission_post_delete',
+        )
@@ -1,3 +1,4 @@
+from waldur_core.permissions import snapshot
 from waldur_core.permissions.log import event_logger
 from waldur_core.structure.models import get_old_role_name
 
@@ -56,3 +57,11 @@ def log_role_updated(sender, instance, current_user=None, **kwargs):
         f'in {instance.scope.name} is updated from {old_time} to {new_time}.',
         event_type='role_updated',
     )
+
+
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    snapshot.invalidate_user(instance.user_id)
+
+
+def invalidate_roles_snapshot(sender, instance, **kwargs):
+    snapshot.invalidate_roles()
@@ -0,0 +1,16 @@
+from django.utils.deprecation import MiddlewareMixin
+
+from . import snapshot
+
+
+class PermissionSnapshotMiddleware(MiddlewareMixin):
+    """
+    Keep roles and permissions of user in memory while request is processed.
+    """
+
+    def process_request(self, request):
+        snapshot.start()
+
+    def process_response(self, request, response):
+        snapshot.finish()
+        return response
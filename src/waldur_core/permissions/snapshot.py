@@ -0,0 +1,217 @@
+"""
+Snapshot of roles and permissions of user.
+
+Snapshot consists of active roles of user per scope and map of all roles to their permissions.
+It is loaded once per request or Celery task and kept in memory until request or task is completed.
+Across processes snapshots are shared via cache. Cache keys contain version token
+which is replaced when UserRole, Role or RolePermission is changed, so that stale
+snapshots are not used anymore and eventually expire.
+"""
+import collections
+import threading
+import uuid
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+
+from . import models
+
+CACHE_TIMEOUT = 60 * 60
+ROLES_VERSION_KEY = 'permissions:roles:version'
+
+_local = threading.local()
+
+
+class RoleInfo:
+    __slots__ = ('name', 'content_type_id', 'permissions')
+
+    def __init__(self, name, content_type_id, permissions):
+        self.name = name
+        self.content_type_id = content_type_id
+        self.permissions = frozenset(permissions)
+
+
+class UserSnapshot:
+    def __init__(self, user_roles, roles):
+        """
+        user_roles is list of (content_type_id, object_id, role_id) tuples,
+        roles is dictionary where key is role ID and value is RoleInfo.
+        """
+        self.roles = roles
+        self.scopes = collections.defaultdict(set)
+        for content_type_id, object_id, role_id in user_roles:
+            self.scopes[(content_type_id, object_id)].add(role_id)
+
+    def get_roles(self, scope):
+        content_type = ContentType.objects.get_for_model(scope)
+        return self.scopes.get((content_type.id, scope.id), set())
+
+    def has_permission(self, permission, scope):
+        for role_id in self.get_roles(scope):
+            role = self.roles.get(role_id)
+            if role and permission in role.permissions:
+                return True
+        return False
+
+    def get_scope_ids(self, content_type, role=None):
+        if role and not isinstance(role, (list, tuple)):
+            role = [role]
+        return sorted(
+            object_id
+            for (content_type_id, object_id), role_ids in self.scopes.items()
+            if content_type_id == content_type.id
+            and (
+                not role
+                or any(
+                    role_id in self.roles and self.roles[role_id].name in role
+                    for role_id in role_ids
+                )
+            )
+        )
+
+
+def _get_local_state():
+    if not hasattr(_local, 'dirty'):
+        # Set of user IDs whose roles have been changed in current thread,
+        # key None stands for roles and their permissions.
+        _local.dirty = set()
+    return _local
+
+
+def start():
+    """
+    Called when request or task is started. Snapshots are kept in memory
+    until request or task is finished.
+    """
+    state = _get_local_state()
+    state.snapshots = {}
+    state.roles = None
+    if not transaction.get_connection().in_atomic_block:
+        state.dirty.clear()
+
+
+def finish():
+    state = _get_local_state()
+    if hasattr(state, 'snapshots'):
+        del state.snapshots
+    state.roles = None
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+    return version
+
+
+def _bump_version(key):
+    cache.set(key, uuid.uuid4().hex, None)
+
+
+def _get_user_version_key(user_id):
+    return f'permissions:user:{user_id}:version'
+
+
+def _mark_dirty(key, version_key):
+    state = _get_local_state()
+    state.dirty.add(key)
+    _bump_version(version_key)
+
+    def on_commit():
+        _bump_version(version_key)
+        state.dirty.discard(key)
+
+    # Version is replaced once again when transaction is committed
+    # so that snapshot loaded by concurrent process before commit is not used.
+    transaction.on_commit(on_commit)
+
+
+def invalidate_user(user_id):
+    state = _get_local_state()
+    snapshots = getattr(state, 'snapshots', None)
+    if snapshots is not None:
+        snapshots.pop(user_id, None)
+    _mark_dirty(user_id, _get_user_version_key(user_id))
+
+
+def invalidate_roles():
+    state = _get_local_state()
+    state.roles = None
+    snapshots = getattr(state, 'snapshots', None)
+    if snapshots is not None:
+        snapshots.clear()
+    _mark_dirty(None, ROLES_VERSION_KEY)
+
+
+def _load_cached(key, version_key, loader):
+    """
+    Snapshot is not put to cache if it has been changed by uncommitted transaction,
+    because that transaction may be rolled back.
+    """
+    version = _get_version(version_key)
+    cache_key = f'{version_key}:{version}'
+    value = cache.get(cache_key)
+    if value is None:
+        value = loader()
+        if key not in _get_local_state().dirty:
+            cache.set(cache_key, value, CACHE_TIMEOUT)
+    return value
+
+
+def _load_roles():
+    roles = {
+        role_id: [name, content_type_id, []]
+        for role_id, name, content_type_id in models.Role.objects.values_list(
+            'id', 'name', 'content_type_id'
+        )
+    }
+    for role_id, permission in models.RolePermission.objects.values_list(
+        'role_id', 'permission'
+    ):
+        if role_id in roles:
+            roles[role_id][2].append(permission)
+    return {role_id: tuple(value) for role_id, value in roles.items()}
+
+
+def get_roles():
+    """
+    Returns dictionary where key is role ID and value is RoleInfo.
+    """
+    state = _get_local_state()
+    roles = getattr(state, 'roles', None)
+    if roles is not None:
+        return roles
+
+    roles = {
+        role_id: RoleInfo(*value)
+        for role_id, value in _load_cached(None, ROLES_VERSION_KEY, _load_roles).items()
+    }
+    if getattr(state, 'snapshots', None) is not None:
+        state.roles = roles
+    return roles
+
+
+def get_snapshot(user):
+    if not user.id:
+        return UserSnapshot([], {})
+
+    state = _get_local_state()
+    snapshots = getattr(state, 'snapshots', None)
+    if snapshots is not None and user.id in snapshots:
+        return snapshots[user.id]
+
+    def loader():
+        return list(
+            models.UserRole.objects.filter(user=user, is_active=True).values_list(
+                'content_type_id', 'object_id', 'role_id'
+            )
+        )
+
+    user_roles = _load_cached(user.id, _get_user_version_key(user.id), loader)
+    snapshot = UserSnapshot(user_roles, get_roles())
+    if snapshots is not None:
+        snapshots[user.id] = snapshot
+    return snapshot
@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TransactionTestCase
+
+from waldur_core.permissions import snapshot
+from waldur_core.permissions.enums import PermissionEnum, RoleEnum
+from waldur_core.permissions.fixtures import CustomerRole
+from waldur_core.permissions.utils import get_scope_ids, has_permission
+from waldur_core.structure.models import Customer
+from waldur_core.structure.tests import fixtures
+from waldur_core.structure.tests.factories import UserFactory
+
+
+class PermissionSnapshotTest(TransactionTestCase):
+    def setUp(self):
+        self.fixture = fixtures.CustomerFixture()
+        self.customer = self.fixture.customer
+        self.user = UserFactory()
+        self.request = mock.Mock(user=self.user)
+        CustomerRole.OWNER.add_permission(PermissionEnum.UPDATE_OFFERING)
+        snapshot.start()
+
+    def tearDown(self):
+        snapshot.finish()
+
+    def test_permission_check_is_answered_from_memory(self):
+        self.customer.add_user(self.user, CustomerRole.OWNER)
+        self.assertTrue(
+            has_permission(self.request, PermissionEnum.UPDATE_OFFERING, self.customer)
+        )
+
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                has_permission(
+                    self.request, PermissionEnum.UPDATE_OFFERING, self.customer
+                )
+            )
+            self.assertFalse(
+                has_permission(
+                    self.request, PermissionEnum.DELETE_OFFERING, self.customer
+                )
+            )
+
+    def test_snapshot_is_invalidated_when_role_is_granted_and_revoked(self):
+        self.assertFalse(
+            has_permission(self.request, PermissionEnum.UPDATE_OFFERING, self.customer)
+        )
+
+        self.customer.add_user(self.user, CustomerRole.OWNER)
+        self.assertTrue(
+            has_permission(self.request, PermissionEnum.UPDATE_OFFERING, self.customer)
+        )
+
+        self.customer.remove_user(self.user, CustomerRole.OWNER)
+        self.assertFalse(
+            has_permission(self.request, PermissionEnum.UPDATE_OFFERING, self.customer)
+        )
+
+    def test_snapshot_is_invalidated_when_permission_is_added_to_role(self):
+        self.customer.add_user(self.user, CustomerRole.OWNER)
+        self.assertFalse(
+            has_permission(self.request, PermissionEnum.DELETE_OFFERING, self.customer)
+        )
+
+        CustomerRole.OWNER.add_permission(PermissionEnum.DELETE_OFFERING)
+        self.assertTrue(
+            has_permission(self.request, PermissionEnum.DELETE_OFFERING, self.customer)
+        )
+
+    def test_snapshot_is_shared_between_requests_via_cache(self):
+        self.customer.add_user(self.user, CustomerRole.OWNER)
+        snapshot.finish()
+        snapshot.start()
+        has_permission(self.request, PermissionEnum.UPDATE_OFFERING, self.customer)
+
+        snapshot.finish()
+        snapshot.start()
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                has_permission(
+                    self.request, PermissionEnum.UPDATE_OFFERING, self.customer
+                )
+            )
+
+    def test_scope_ids_are_filtered_by_role(self):
+        self.customer.add_user(self.user, CustomerRole.OWNER)
+        other_customer = fixtures.CustomerFixture().customer
+        other_customer.add_user(self.user, CustomerRole.SUPPORT)
+        content_type = ContentType.objects.get_for_model(Customer)
+
+        self.assertEqual(
+            get_scope_ids(self.user, content_type),
+            sorted([self.customer.id, other_customer.id]),
+        )
+        self.assertEqual(
+            get_scope_ids(self.user, content_type, RoleEnum.CUSTOMER_OWNER),
+            [self.customer.id],
+        )
+        self.assertEqual(
+            list(
+                Customer.objects.filter(
+                    id__in=get_scope_ids(
+                        self.user, content_type, RoleEnum.CUSTOMER_SUPPORT
+                    )
+                )
+            ),
+            [other_customer],
+        )
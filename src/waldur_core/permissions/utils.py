@@ -4,21 +4,17 @@ from django.db.models import Q
 from django.db.models.query import QuerySet
 from rest_framework import exceptions
 
-from . import models, signals
+from . import models, signals, snapshot
 
 
 def has_permission(request, permission, scope):
     if request.user.is_staff:
         return True
 
-    roles = models.UserRole.objects.filter(
-        user=request.user, is_active=True, scope=scope
-    ).values_list('role', flat=True)
-    if not roles:
+    if scope is None:
         return False
-    return models.RolePermission.objects.filter(
-        role__in=roles, permission=permission
-    ).exists()
+
+    return snapshot.get_snapshot(request.user).has_permission(permission, scope)
 
 
 def permission_factory(permission, sources=None):
@@ -44,9 +40,10 @@ def permission_factory(permission, sources=None):
 
 
 def role_has_permission(role, permission):
-    return models.RolePermission.objects.filter(
-        role__name=role, permission=permission
-    ).exists()
+    return any(
+        info.name == role and permission in info.permissions
+        for info in snapshot.get_roles().values()
+    )
 
 
 def get_users(scope, role):
@@ -57,14 +54,7 @@ def get_users(scope, role):
 
 
 def get_scope_ids(user, content_type, role=None):
-    qs = models.UserRole.objects.filter(
-        is_active=True, user=user, content_type=content_type
-    )
-    if role:
-        if not isinstance(role, (list, tuple)):
-            role = [role]
-        qs = qs.filter(role__name__in=role)
-    return qs.values_list('object_id', flat=True).distinct()
+    return snapshot.get_snapshot(user).get_scope_ids(content_type, role)
 
 
 def get_user_ids(content_type, scope_ids, role=None):
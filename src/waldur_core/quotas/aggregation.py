@@ -0,0 +1,179 @@
+"""
+Propagation of quota usage deltas to aggregator quotas of ancestors.
+
+Deltas of all aggregator quotas of all ancestors are written using single bulk insert
+in the same transaction as child quota usage, so that they are rolled back together.
+
+Ancestors of quota scope are cached until the end of transaction, so that
+consecutive usage changes of the same scope do not traverse ancestors graph again.
+Cache is dropped when parent of any object is changed.
+"""
+import collections
+import functools
+import threading
+
+from django.contrib.contenttypes import models as ct_models
+from django.db import transaction
+from django.db.models import signals
+
+from waldur_core.core.models import DescendantMixin
+from waldur_core.quotas import fields
+
+_local = threading.local()
+
+
+@functools.lru_cache(maxsize=None)
+def get_quota_fields_map(model):
+    return {field.name: field for field in model.get_quotas_fields()}
+
+
+@functools.lru_cache(maxsize=None)
+def get_aggregator_quota_names(model, child_quota_name):
+    return tuple(
+        field.name
+        for field in model.get_quotas_fields(
+            field_class=fields.UsageAggregatorQuotaField
+        )
+        if field.get_child_quota_name() == child_quota_name
+    )
+
+
+def clear_quota_fields_cache():
+    """
+    Should be called when quota field is added to model in runtime.
+    """
+    get_quota_fields_map.cache_clear()
+    get_aggregator_quota_names.cache_clear()
+
+
+def get_ancestors(scope):
+    """Get all unique instance ancestors"""
+    ancestors = list(scope.get_parents())
+    ancestor_unique_attributes = set([(a.__class__, a.id) for a in ancestors])
+    ancestors_with_parents = [a for a in ancestors if isinstance(a, DescendantMixin)]
+    for ancestor in ancestors_with_parents:
+        for parent in get_ancestors(ancestor):
+            if (parent.__class__, parent.id) not in ancestor_unique_attributes:
+                ancestors.append(parent)
+    return ancestors
+
+
+class AncestorsCache:
+    """
+    Ancestors of quota scopes keyed by (model, object_id) of the scope.
+    Cache is valid until transaction it has been created in is committed or rolled back.
+    """
+
+    def __init__(self):
+        self.ancestors = {}
+        self.connection = transaction.get_connection()
+        transaction.on_commit(self.clear)
+
+    def is_valid(self):
+        # Callback is dropped by Django when transaction or savepoint is rolled back.
+        return any(entry[1] == self.clear for entry in self.connection.run_on_commit)
+
+    def clear(self):
+        self.ancestors.clear()
+
+
+def get_ancestors_cache():
+    """
+    Returns ancestors cache of current transaction.
+    Outside of transaction ancestors are not cached, so None is returned.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        return None
+
+    cache = getattr(_local, 'ancestors_cache', None)
+    if cache is None or not cache.is_valid():
+        cache = _local.ancestors_cache = AncestorsCache()
+    return cache
+
+
+def clear_ancestors_cache():
+    """
+    Should be called when parent of any object is changed, for example, when project is moved.
+    """
+    _local.ancestors_cache = None
+
+
+def get_quota_ancestors(model, quota):
+    """
+    Returns set of (model, object_id) pairs for ancestors of quota scope with quotas.
+    """
+    from waldur_core.quotas.models import QuotaModelMixin
+
+    cache = get_ancestors_cache()
+    key = (model, quota.object_id)
+    if cache is not None and key in cache.ancestors:
+        return cache.ancestors[key]
+
+    # We need to use set in order to eliminate duplicates.
+    # Consider, for example, two ways of traversing from resource to customer:
+    # resource -> project -> customer
+    # resource -> service -> customer
+    ancestors = {
+        (ancestor.__class__, ancestor.id)
+        for ancestor in get_ancestors(quota.scope)
+        if isinstance(ancestor, QuotaModelMixin)
+    }
+    if cache is not None:
+        cache.ancestors[key] = ancestors
+    return ancestors
+
+
+def write_deltas(deltas):
+    """
+    Write deltas of aggregator quotas using single bulk insert.
+    Deltas is a dictionary where key is (model, object_id, quota name) and value is delta.
+    """
+    from waldur_core.quotas.models import QuotaUsage
+
+    rows = [
+        QuotaUsage(
+            content_type=ct_models.ContentType.objects.get_for_model(model),
+            object_id=object_id,
+            name=name,
+            delta=delta,
+        )
+        for (model, object_id, name), delta in deltas.items()
+        if delta
+    ]
+    if not rows:
+        return
+
+    with transaction.atomic():
+        QuotaUsage.objects.bulk_create(rows)
+        # bulk_create does not send signals, therefore they are sent explicitly
+        # in order to keep other receivers of quota usage changes working.
+        for row in rows:
+            signals.post_save.send(
+                sender=QuotaUsage,
+                instance=row,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=row._state.db,
+            )
+
+
+def add_aggregated_delta(quota, delta):
+    """
+    Propagate delta of quota usage to aggregator quotas of ancestors of its scope.
+    """
+    content_type = ct_models.ContentType.objects.get_for_id(quota.content_type_id)
+    model = content_type.model_class()
+    if model is None or not issubclass(model, DescendantMixin):
+        return
+
+    quota_field = get_quota_fields_map(model).get(quota.name)
+    # usage aggregation should not count another usage aggregator field to avoid calls duplication.
+    if isinstance(quota_field, fields.UsageAggregatorQuotaField) or quota_field is None:
+        return
+
+    deltas = collections.defaultdict(int)
+    for ancestor_model, ancestor_id in get_quota_ancestors(model, quota):
+        for name in get_aggregator_quota_names(ancestor_model, quota.name):
+            deltas[(ancestor_model, ancestor_id, name)] += delta
+    write_deltas(deltas)
@@ -1,4 +1,4 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
 from django.db.models import signals
 
 
@@ -12,6 +12,7 @@ class QuotasConfig(AppConfig):
     verbose_name = 'Quotas'
 
     def ready(self):
+        from waldur_core.core.models import DescendantMixin
         from waldur_core.quotas import handlers, utils
         from waldur_core.structure import models as structure_models
         from waldur_core.structure import signals as structure_signals
@@ -50,6 +51,15 @@ class QuotasConfig(AppConfig):
             dispatch_uid='waldur_core.quotas.handle_aggregated_quotas_pre_delete',
         )
 
+        for model in apps.get_models():
+            if issubclass(model, DescendantMixin):
+                signals.post_save.connect(
+                    handlers.clear_ancestors_cache_on_parent_change,
+                    sender=model,
+                    dispatch_uid='waldur_core.quotas.clear_ancestors_cache_on_parent_change_'
+                    f'{model.__name__}_{model._meta.app_label}',
+                )
+
         structure_signals.project_moved.connect(
             handlers.projects_customer_has_been_changed,
             sender=structure_models.Project,
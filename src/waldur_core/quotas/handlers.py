@@ -1,8 +1,7 @@
 from django.db.models import signals
 
-from waldur_core.core.models import DescendantMixin
-from waldur_core.quotas import fields
-from waldur_core.quotas.models import QuotaLimit, QuotaModelMixin, QuotaUsage
+from waldur_core.quotas import aggregation, fields
+from waldur_core.quotas.models import QuotaLimit, QuotaUsage
 from waldur_core.structure import models as structure_models
 
 # new quotas
@@ -21,57 +20,28 @@ def count_quota_handler_factory(count_quota_field):
     return recalculate_count_quota
 
 
-def get_ancestors(scope):
-    """Get all unique instance ancestors"""
-    ancestors = list(scope.get_parents())
-    ancestor_unique_attributes = set([(a.__class__, a.id) for a in ancestors])
-    ancestors_with_parents = [a for a in ancestors if isinstance(a, DescendantMixin)]
-    for ancestor in ancestors_with_parents:
-        for parent in get_ancestors(ancestor):
-            if (parent.__class__, parent.id) not in ancestor_unique_attributes:
-                ancestors.append(parent)
-    return ancestors
-
-
-def get_field(quota):
-    fields = quota.scope.get_quotas_fields()
-    try:
-        return next(f for f in fields if f.name == quota.name)
-    except StopIteration:
-        return
-
-
 def handle_aggregated_quotas(sender, instance, **kwargs):
     """Call aggregated quotas fields update methods"""
     quota = instance
-    quota_field = get_field(quota)
-    # usage aggregation should not count another usage aggregator field to avoid calls duplication.
-    if isinstance(quota_field, fields.UsageAggregatorQuotaField) or quota_field is None:
-        return
     signal = kwargs['signal']
-    ancestors = {}
-    if isinstance(quota.scope, DescendantMixin):
-        # We need to use set in order to eliminate duplicates.
-        # Consider, for example, two ways of traversing from resource to customer:
-        # resource -> project -> customer
-        # resource -> service -> customer
-        ancestors = {
-            a for a in get_ancestors(quota.scope) if isinstance(a, QuotaModelMixin)
-        }
-    aggregator_quotas = []
-    for ancestor in ancestors:
-        for ancestor_quota_field in ancestor.get_quotas_fields(
-            field_class=fields.UsageAggregatorQuotaField
-        ):
-            if ancestor_quota_field.get_child_quota_name() == quota.name:
-                aggregator_quotas.append((ancestor, ancestor_quota_field))
+    if signal == signals.post_save:
+        delta = quota.delta
+    elif signal == signals.pre_delete:
+        delta = -quota.delta
+    aggregation.add_aggregated_delta(quota, delta)
+
 
-    for ancestor, field in aggregator_quotas:
-        if signal == signals.post_save:
-            delta = quota.delta
-        elif signal == signals.pre_delete:
-            delta = -quota.delta
-        ancestor.add_quota_usage(field.name, delta)
+def clear_ancestors_cache_on_parent_change(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """Parents of object may be changed only if any of its relations is updated"""
+    if created:
+        return
+    if update_fields is not None and not any(
+        instance._meta.get_field(name).is_relation for name in update_fields
+    ):
+        return
+    aggregation.clear_ancestors_cache()
 
 
 def delete_quotas_when_model_is_deleted(sender, instance, **kwargs):
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from waldur_core.quotas.utils import compact_quota_usages
+
+
+class Command(BaseCommand):
+    help = """Fold quota usage deltas into baseline rows"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows',
+            dest='min_rows',
+            type=int,
+            default=settings.WALDUR_CORE['QUOTA_USAGE_COMPACTION_MIN_ROWS'],
+            help='Minimal number of delta rows for quota to be compacted.',
+        )
+
+    def handle(self, min_rows, *args, **options):
+        self.stdout.write('Compacting quota usages')
+        result = compact_quota_usages(min_rows=min_rows)
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Compacted quotas: %(quotas)s, reclaimed rows: %(reclaimed)s, '
+                'duration: %(duration).2f seconds.' % result
+            )
+        )
@@ -5,17 +5,19 @@ In order to avoid shared write deadlock we use INSERT instead of UPDATE statemen
 That's why for usage we store delta instead of aggregated SUM value.
 And we use SUM function when we read quota usage.
 """
+import collections
 import inspect
 import logging
+from dataclasses import dataclass
 
 from django.contrib.contenttypes import fields as ct_fields
 from django.contrib.contenttypes import models as ct_models
 from django.db import models, transaction
-from django.db.models import Sum
+from django.db.models import F, Q, Sum, Value
 from django.utils.translation import gettext_lazy as _
 from model_utils import FieldTracker
 
-from waldur_core.quotas import exceptions, fields, managers
+from waldur_core.quotas import aggregation, exceptions, fields, managers
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +87,7 @@ class QuotaModelMixin(models.Model):
             return -1
 
     def set_quota_limit(self, quota_name, limit):
+        self._invalidate_prefetched_quotas()
         QuotaLimit.objects.update_or_create(
             object_id=self.id,
             content_type=ct_models.ContentType.objects.get_for_model(self),
@@ -107,41 +110,28 @@ class QuotaModelMixin(models.Model):
     def add_quota_usage(self, quota_name, delta, validate=False):
         if validate:
             self.validate_quota_change({quota_name: delta})
+        self._invalidate_prefetched_quotas()
         QuotaUsage.objects.create(scope=self, name=quota_name, delta=delta)
 
     def apply_quota_usage(self, quota_deltas):
+        self._invalidate_prefetched_quotas()
         for name, delta in quota_deltas.items():
             QuotaUsage.objects.create(scope=self, name=name, delta=delta)
 
     def validate_quota_change(self, quota_deltas):
         """
-        Get error messages about object and his ancestor quotas that will be exceeded if quota_delta will be added.
+        Raise QuotaValidationError if quotas of object will be exceeded if quota_deltas will be added.
 
-        raise_exception - if True QuotaValidationError will be raised if validation fails
         quota_deltas - dictionary of quotas deltas, example:
         {
             'ram': 1024,
             'storage': 2048,
             ...
         }
-        Example of output:
-            ['ram quota limit: 1024, requires: 2048(instance#1)', ...]
-
+        Example of error message:
+            'One or more quotas were exceeded: ram quota limit: 1024, requires 2048'
         """
-        errors = []
-        for name, delta in quota_deltas.items():
-            if not delta:
-                continue
-            usage = self.get_quota_usage(name)
-            limit = self.get_quota_limit(name)
-            if limit == -1:
-                continue
-            if usage + delta > limit:
-                errors.append(f'{name} quota limit: {limit}, requires {usage + delta}')
-        if errors:
-            raise exceptions.QuotaValidationError(
-                _('One or more quotas were exceeded: %s') % ';'.join(errors)
-            )
+        validate_quota_changes([self], quota_deltas)
 
     @classmethod
     def get_quotas_fields(cls, field_class=None):
@@ -159,8 +149,53 @@ class QuotaModelMixin(models.Model):
     def get_quotas_names(cls):
         return [f.name for f in cls.get_quotas_fields()]
 
+    @classmethod
+    def prefetch_quotas(cls, scopes):
+        """
+        Load quota usages and limits for many scopes using one grouped query for each of them.
+        Loaded values are used by quota_usages, quota_limits and quotas properties
+        until quota of the scope is changed.
+        Scopes may be either queryset or list of model instances.
+        """
+        scopes = list(scopes)
+        scopes_by_model = collections.defaultdict(dict)
+        for scope in scopes:
+            scopes_by_model[scope.__class__][scope.id] = scope
+
+        for model, model_scopes in scopes_by_model.items():
+            content_type = ct_models.ContentType.objects.get_for_model(model)
+            usages = collections.defaultdict(dict)
+            limits = collections.defaultdict(dict)
+
+            for row in (
+                QuotaUsage.objects.filter(
+                    content_type=content_type, object_id__in=model_scopes.keys()
+                )
+                .values('object_id', 'name')
+                .annotate(value=Sum('delta'))
+                .order_by()
+            ):
+                usages[row['object_id']][row['name']] = row['value'] or 0
+
+            for row in QuotaLimit.objects.filter(
+                content_type=content_type, object_id__in=model_scopes.keys()
+            ).values('object_id', 'name', 'value'):
+                limits[row['object_id']][row['name']] = row['value'] or -1
+
+            for object_id, scope in model_scopes.items():
+                scope._prefetched_quota_usages = usages[object_id]
+                scope._prefetched_quota_limits = limits[object_id]
+
+        return scopes
+
+    def _invalidate_prefetched_quotas(self):
+        self.__dict__.pop('_prefetched_quota_usages', None)
+        self.__dict__.pop('_prefetched_quota_limits', None)
+
     @property
     def quota_usages(self):
+        if hasattr(self, '_prefetched_quota_usages'):
+            return self._prefetched_quota_usages
         return {
             row['name']: row['value'] or 0
             for row in QuotaUsage.objects.filter(scope=self)
@@ -170,6 +205,8 @@ class QuotaModelMixin(models.Model):
 
     @property
     def quota_limits(self):
+        if hasattr(self, '_prefetched_quota_limits'):
+            return self._prefetched_quota_limits
         return {
             row['name']: row['value'] or -1
             for row in QuotaLimit.objects.filter(scope=self).values('name', 'value')
@@ -189,6 +226,108 @@ class QuotaModelMixin(models.Model):
         ]
 
 
+@dataclass
+class QuotaViolation:
+    scope: QuotaModelMixin
+    name: str
+    limit: int
+    usage: int
+    delta: int
+
+    @property
+    def required(self):
+        return self.usage + self.delta
+
+    def __str__(self):
+        return f'{self.name} quota limit: {self.limit}, requires {self.required}'
+
+
+def get_quota_violations(scopes, quota_deltas):
+    """
+    Return list of quota violations for all scopes if quota_deltas will be added to each of them.
+    Usages and limits of all scopes are fetched using single database query.
+
+    scopes - list of quota model mixins, for example, [tenant, project, customer]
+    quota_deltas - dictionary of quotas deltas, for example, {'ram': 1024, 'storage': 2048}
+    """
+    quota_deltas = {name: delta for name, delta in quota_deltas.items() if delta}
+    scopes = [scope for scope in scopes if scope]
+    if not quota_deltas or not scopes:
+        return []
+
+    scopes_by_key = {}
+    object_ids_by_content_type = collections.defaultdict(set)
+    for scope in scopes:
+        content_type = ct_models.ContentType.objects.get_for_model(scope)
+        scopes_by_key[(content_type.id, scope.id)] = scope
+        object_ids_by_content_type[content_type.id].add(scope.id)
+
+    query = Q()
+    for content_type_id, object_ids in object_ids_by_content_type.items():
+        query |= Q(content_type_id=content_type_id, object_id__in=object_ids)
+    query &= Q(name__in=list(quota_deltas.keys()))
+
+    usages_query = (
+        QuotaUsage.objects.filter(query)
+        .values('content_type_id', 'object_id', 'name')
+        .annotate(
+            amount=Sum('delta'),
+            is_limit=Value(False, output_field=models.BooleanField()),
+        )
+        .order_by()
+    )
+    limits_query = (
+        QuotaLimit.objects.filter(query)
+        .values('content_type_id', 'object_id', 'name')
+        .annotate(
+            amount=F('value'),
+            is_limit=Value(True, output_field=models.BooleanField()),
+        )
+        .order_by()
+    )
+
+    usages = {}
+    limits = {}
+    for row in usages_query.union(limits_query, all=True):
+        key = (row['content_type_id'], row['object_id'], row['name'])
+        if row['is_limit']:
+            limits[key] = row['amount']
+        else:
+            usages[key] = max(0, row['amount'] or 0)
+
+    violations = []
+    for name, delta in quota_deltas.items():
+        for (content_type_id, object_id), scope in scopes_by_key.items():
+            key = (content_type_id, object_id, name)
+            if key in limits:
+                limit = limits[key]
+            else:
+                field = getattr(scope.Quotas, name, None)
+                limit = field.default_limit if field else -1
+            if limit == -1:
+                continue
+            usage = usages.get(key, 0)
+            if usage + delta > limit:
+                violations.append(
+                    QuotaViolation(
+                        scope=scope, name=name, limit=limit, usage=usage, delta=delta
+                    )
+                )
+    return violations
+
+
+def validate_quota_changes(scopes, quota_deltas):
+    """
+    Raise QuotaValidationError if quotas of any scope will be exceeded if quota_deltas will be added.
+    """
+    violations = get_quota_violations(scopes, quota_deltas)
+    if violations:
+        raise exceptions.QuotaValidationError(
+            _('One or more quotas were exceeded: %s')
+            % ';'.join(str(violation) for violation in violations)
+        )
+
+
 class ExtendableQuotaModelMixin(QuotaModelMixin):
     """Allows to add quotas to model in runtime.
 
@@ -214,6 +353,7 @@ class ExtendableQuotaModelMixin(QuotaModelMixin):
         # and initialization is not executed automatically.
         quota_field.name = name
         setattr(cls.Quotas, name, quota_field)
+        aggregation.clear_quota_fields_cache()
         from waldur_core.quotas.apps import QuotasConfig
 
         # For counter quotas we need to register signals explicitly
@@ -246,12 +386,12 @@ class SharedQuotaMixin:
         raise NotImplementedError()
 
     def apply_quota_changes(self, mult=1, validate=False):
-        scopes = self.get_quota_scopes()
-        deltas = self.get_quota_deltas()
-        for name, delta in deltas.items():
-            for scope in scopes:
-                if scope:
-                    scope.add_quota_usage(name, delta * mult, validate=validate)
+        scopes = [scope for scope in self.get_quota_scopes() if scope]
+        deltas = {name: delta * mult for name, delta in self.get_quota_deltas().items()}
+        if validate:
+            validate_quota_changes(scopes, deltas)
+        for scope in scopes:
+            scope.apply_quota_usage(deltas)
 
     def increase_backend_quotas_usage(self, validate=False):
         self.apply_quota_changes(validate=validate)
@@ -1,8 +1,13 @@
 from celery import shared_task
 
-from . import signals
+from . import signals, utils
 
 
 @shared_task(name='waldur_core.quotas.update_custom_quotas')
 def update_custom_quotas():
     signals.recalculate_quotas.send(sender=None)
+
+
+@shared_task(name='waldur_core.quotas.compact_quota_usages')
+def compact_quota_usages():
+    utils.compact_quota_usages()
@@ -1,6 +1,11 @@
+from unittest import mock
+
+from django.db import transaction
 from django.test import TransactionTestCase
 
 from waldur_core.core.utils import silent_call
+from waldur_core.quotas import aggregation
+from waldur_core.quotas.models import QuotaUsage
 from waldur_core.quotas.tests import models as test_models
 
 
@@ -140,3 +145,73 @@ class TestUsageAggregatorField(TransactionTestCase):
                 test_models.ParentModel.Quotas.second_usage_aggregator_quota
             )
             self.assertEqual(actual_usage, usage_value)
+
+    def test_aggregated_deltas_are_written_inside_transaction(self):
+        with transaction.atomic():
+            self.children[0].add_quota_usage('usage_aggregator_quota', 3)
+            self.assertEqual(
+                QuotaUsage.objects.filter(
+                    scope=self.grandparent, name='usage_aggregator_quota'
+                ).count(),
+                1,
+            )
+            self.assertEqual(
+                QuotaUsage.objects.filter(scope=self.children[0].parent).count(), 2
+            )
+
+    def test_aggregated_usage_is_visible_inside_transaction(self):
+        with transaction.atomic():
+            self.children[0].add_quota_usage('usage_aggregator_quota', 2)
+            self.assertEqual(
+                self.grandparent.get_quota_usage('usage_aggregator_quota'), 2
+            )
+
+    def test_aggregated_deltas_are_discarded_on_rollback(self):
+        try:
+            with transaction.atomic():
+                self.children[0].add_quota_usage('usage_aggregator_quota', 5)
+                raise ValueError()
+        except ValueError:
+            pass
+
+        self.assertEqual(self.grandparent.get_quota_usage('usage_aggregator_quota'), 0)
+
+    def test_aggregated_deltas_are_discarded_with_nested_savepoint(self):
+        with transaction.atomic():
+            self.children[0].add_quota_usage('usage_aggregator_quota', 1)
+            try:
+                with transaction.atomic():
+                    self.children[0].add_quota_usage('usage_aggregator_quota', 5)
+                    raise ValueError()
+            except ValueError:
+                pass
+
+        self.assertEqual(self.children[0].get_quota_usage('usage_aggregator_quota'), 1)
+        self.assertEqual(self.grandparent.get_quota_usage('usage_aggregator_quota'), 1)
+
+    def test_ancestors_are_resolved_once_inside_transaction(self):
+        with mock.patch(
+            'waldur_core.quotas.aggregation.get_ancestors',
+            wraps=aggregation.get_ancestors,
+        ) as get_ancestors:
+            with transaction.atomic():
+                self.children[0].add_quota_usage('usage_aggregator_quota', 1)
+                calls_count = get_ancestors.call_count
+                self.children[0].add_quota_usage('usage_aggregator_quota', 1)
+                self.children[0].add_quota_usage('usage_aggregator_quota', 1)
+
+        self.assertTrue(calls_count)
+        self.assertEqual(get_ancestors.call_count, calls_count)
+        self.assertEqual(self.parents[0].get_quota_usage('usage_aggregator_quota'), 3)
+        self.assertEqual(self.grandparent.get_quota_usage('usage_aggregator_quota'), 3)
+
+    def test_aggregated_deltas_follow_moved_child_inside_transaction(self):
+        child = self.children[0]
+        with transaction.atomic():
+            child.add_quota_usage('usage_aggregator_quota', 2)
+            child.parent = self.parents[1]
+            child.save(update_fields=['parent'])
+            child.add_quota_usage('usage_aggregator_quota', 3)
+
+        self.assertEqual(self.parents[0].get_quota_usage('usage_aggregator_quota'), 2)
+        self.assertEqual(self.parents[1].get_quota_usage('usage_aggregator_quota'), 3)
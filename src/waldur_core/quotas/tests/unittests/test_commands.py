@@ -1,6 +1,7 @@
 from django.core.management import call_command
 from django.test import TestCase
 
+from waldur_core.quotas.models import QuotaUsage
 from waldur_core.structure.tests import factories as structure_factories
 
 
@@ -22,3 +23,41 @@ class RecalculateCommandTest(TestCase):
 
         call_command('recalculatequotas')
         self.assertEqual(customer.get_quota_usage('nc_resource_count'), 0)
+
+
+class CompactCommandTest(TestCase):
+    def test_quota_usage_deltas_are_folded_into_baseline(self):
+        customer = structure_factories.CustomerFactory()
+        for _ in range(5):
+            customer.add_quota_usage('nc_resource_count', 2)
+        customer.add_quota_usage('nc_resource_count', -3)
+
+        call_command('compactquotausages', min_rows=2)
+
+        self.assertEqual(
+            QuotaUsage.objects.filter(scope=customer, name='nc_resource_count').count(),
+            1,
+        )
+        self.assertEqual(customer.get_quota_usage('nc_resource_count'), 7)
+
+    def test_quota_with_few_deltas_is_not_compacted(self):
+        customer = structure_factories.CustomerFactory()
+        customer.add_quota_usage('nc_resource_count', 1)
+        customer.add_quota_usage('nc_resource_count', 1)
+
+        call_command('compactquotausages', min_rows=3)
+
+        self.assertEqual(
+            QuotaUsage.objects.filter(scope=customer, name='nc_resource_count').count(),
+            2,
+        )
+
+    def test_ancestor_usage_is_not_changed_by_compaction(self):
+        project = structure_factories.ProjectFactory()
+        for _ in range(3):
+            project.add_quota_usage('nc_resource_count', 1)
+
+        call_command('compactquotausages', min_rows=2)
+
+        self.assertEqual(project.get_quota_usage('nc_resource_count'), 3)
+        self.assertEqual(project.customer.get_quota_usage('nc_resource_count'), 3)
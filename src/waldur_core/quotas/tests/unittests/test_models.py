@@ -1,7 +1,9 @@
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 
 from waldur_core.quotas import exceptions
-from waldur_core.quotas.tests.models import GrandparentModel
+from waldur_core.quotas.models import QuotaModelMixin, get_quota_violations
+from waldur_core.quotas.tests.models import GrandparentModel, ParentModel
 
 
 class QuotaModelMixinTest(TestCase):
@@ -38,3 +40,73 @@ class QuotaModelMixinTest(TestCase):
             delta=200,
             validate=True,
         )
+
+
+class PrefetchQuotasTest(TestCase):
+    def setUp(self):
+        self.first = GrandparentModel.objects.create()
+        self.second = GrandparentModel.objects.create()
+        self.first.add_quota_usage('regular_quota', 10)
+        self.first.add_quota_usage('regular_quota', 5)
+        self.first.set_quota_limit('regular_quota', 20)
+        self.second.add_quota_usage('regular_quota', 3)
+
+    def test_quotas_of_many_scopes_are_loaded_with_two_queries(self):
+        scopes = list(
+            GrandparentModel.objects.filter(
+                id__in=[self.first.id, self.second.id]
+            ).order_by('id')
+        )
+
+        with self.assertNumQueries(2):
+            QuotaModelMixin.prefetch_quotas(scopes)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(scopes[0].quota_usages, {'regular_quota': 15})
+            self.assertEqual(scopes[0].quota_limits, {'regular_quota': 20})
+            self.assertEqual(scopes[1].quota_usages, {'regular_quota': 3})
+            self.assertEqual(scopes[1].quota_limits, {})
+
+    def test_prefetched_quotas_are_invalidated_on_usage_change(self):
+        [scope] = QuotaModelMixin.prefetch_quotas(
+            GrandparentModel.objects.filter(id=self.second.id)
+        )
+        scope.add_quota_usage('regular_quota', 1)
+        self.assertEqual(scope.quota_usages, {'regular_quota': 4})
+
+
+class QuotaViolationsTest(TestCase):
+    def setUp(self):
+        self.grandparent = GrandparentModel.objects.create()
+        self.parent = ParentModel.objects.create(parent=self.grandparent)
+        self.grandparent.set_quota_limit('regular_quota', 10)
+        self.grandparent.add_quota_usage('regular_quota', 8)
+
+    def test_usages_and_limits_of_all_scopes_are_fetched_with_single_query(self):
+        # Content types are cached, so they do not require extra queries.
+        ContentType.objects.get_for_models(GrandparentModel, ParentModel)
+
+        with self.assertNumQueries(1):
+            get_quota_violations(
+                [self.grandparent, self.parent],
+                {'regular_quota': 1, 'quota_with_default_limit': 1},
+            )
+
+    def test_violations_are_reported_for_each_exceeded_quota(self):
+        violations = get_quota_violations(
+            [self.grandparent, self.parent],
+            {'regular_quota': 5, 'quota_with_default_limit': 101},
+        )
+
+        self.assertEqual(
+            [(v.scope, v.name, v.limit, v.required) for v in violations],
+            [
+                (self.grandparent, 'regular_quota', 10, 13),
+                (self.grandparent, 'quota_with_default_limit', 100, 101),
+            ],
+        )
+
+    def test_zero_deltas_are_not_validated(self):
+        self.assertEqual(
+            get_quota_violations([self.grandparent], {'regular_quota': 0}), []
+        )
@@ -1,7 +1,85 @@
+import logging
+import time
+
 from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
 
 from waldur_core.quotas import models
 
+logger = logging.getLogger(__name__)
+
 
 def get_models_with_quotas():
     return [m for m in apps.get_models() if issubclass(m, models.QuotaModelMixin)]
+
+
+def compact_quota_usage(content_type_id, object_id, name, max_id):
+    """
+    Fold quota usage deltas with ID up to max_id into single baseline row.
+    Deltas inserted concurrently get greater ID so they are left intact.
+    Deletion and summation are performed by single statement,
+    so that concurrent compaction of the same quota can not count deltas twice.
+    Returns number of reclaimed rows.
+    """
+    table = models.QuotaUsage._meta.db_table
+    query = (
+        f'WITH deleted AS (DELETE FROM "{table}" '
+        'WHERE "content_type_id" = %s AND "object_id" = %s AND "name" = %s AND "id" <= %s '
+        'RETURNING "delta") SELECT COUNT(*), COALESCE(SUM("delta"), 0) FROM deleted'
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(query, [content_type_id, object_id, name, max_id])
+            count, total = cursor.fetchone()
+        if not count:
+            return 0
+        # bulk_create is used in order to skip aggregation handlers,
+        # because ancestors already account for folded deltas.
+        models.QuotaUsage.objects.bulk_create(
+            [
+                models.QuotaUsage(
+                    content_type_id=content_type_id,
+                    object_id=object_id,
+                    name=name,
+                    delta=total,
+                )
+            ]
+        )
+    return count - 1
+
+
+def compact_quota_usages(min_rows=None):
+    """
+    Compact quota usages which consist of at least min_rows delta rows.
+    By default QUOTA_USAGE_COMPACTION_MIN_ROWS setting is used.
+    Returns dictionary with number of compacted quotas, reclaimed rows and duration in seconds.
+    """
+    if min_rows is None:
+        min_rows = settings.WALDUR_CORE['QUOTA_USAGE_COMPACTION_MIN_ROWS']
+    start = time.monotonic()
+    quotas = (
+        models.QuotaUsage.objects.values('content_type_id', 'object_id', 'name')
+        .annotate(rows=Count('id'), max_id=Max('id'))
+        .filter(rows__gte=max(min_rows, 2))
+        .order_by()
+    )
+    compacted = 0
+    reclaimed = 0
+    for quota in quotas.iterator():
+        reclaimed += compact_quota_usage(
+            quota['content_type_id'],
+            quota['object_id'],
+            quota['name'],
+            quota['max_id'],
+        )
+        compacted += 1
+    duration = time.monotonic() - start
+    logger.info(
+        'Quota usages compaction is completed. Quotas: %s, reclaimed rows: %s, duration: %.2f seconds.',
+        compacted,
+        reclaimed,
+        duration,
+    )
+    return {'quotas': compacted, 'reclaimed': reclaimed, 'duration': duration}
@@ -87,6 +87,7 @@ MIDDLEWARE = (
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'waldur_core.logging.middleware.CaptureEventContextMiddleware',
+    'waldur_core.permissions.middleware.PermissionSnapshotMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'axes.middleware.AxesMiddleware',
@@ -275,6 +276,11 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': timedelta(hours=1),
         'args': (),
     },
+    'compact-quota-usages': {
+        'task': 'waldur_core.quotas.compact_quota_usages',
+        'schedule': timedelta(hours=24),
+        'args': (),
+    },
 }
 
 globals().update(WaldurConfiguration().dict())
@@ -60,3 +60,17 @@ def bind_event_context(sender=None, **kwargs):
 @signals.task_postrun.connect
 def unbind_event_context(sender=None, **kwargs):
     reset_event_context()
+
+
+@signals.task_prerun.connect
+def start_permissions_snapshot(sender=None, **kwargs):
+    from waldur_core.permissions import snapshot
+
+    snapshot.start()
+
+
+@signals.task_postrun.connect
+def finish_permissions_snapshot(sender=None, **kwargs):
+    from waldur_core.permissions import snapshot
+
+    snapshot.finish()
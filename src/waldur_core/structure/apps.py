@@ -12,6 +12,7 @@ class StructureConfig(AppConfig):
 
         from waldur_core.core.models import ChangeEmailRequest, User
         from waldur_core.permissions import signals as permission_signals
+        from waldur_core.permissions.models import UserRole
         from waldur_core.quotas import signals as quota_signals
         from waldur_core.structure import handlers
         from waldur_core.structure import signals as structure_signals
@@ -38,6 +39,24 @@ class StructureConfig(AppConfig):
             dispatch_uid='waldur_core.structure.increase_users_quota_when_role_is_granted',
         )
 
+        signals.post_save.connect(
+            handlers.update_visible_scopes_on_role_change,
+            sender=UserRole,
+            dispatch_uid='waldur_core.structure.handlers.update_visible_scopes_on_role_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.update_visible_scopes_on_role_change,
+            sender=UserRole,
+            dispatch_uid='waldur_core.structure.handlers.update_visible_scopes_on_role_delete',
+        )
+
+        signals.post_save.connect(
+            handlers.update_visible_scopes_on_project_save,
+            sender=Project,
+            dispatch_uid='waldur_core.structure.handlers.update_visible_scopes_on_project_save',
+        )
+
         signals.post_save.connect(
             handlers.log_customer_save,
             sender=Customer,
@@ -2,6 +2,7 @@ import logging
 import re
 
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from django.template.loader import render_to_string
 from django.utils import timezone
@@ -12,7 +13,14 @@ from waldur_core.permissions.enums import RoleEnum
 from waldur_core.permissions.models import UserRole
 from waldur_core.permissions.utils import get_customer, get_permissions
 from waldur_core.structure.log import event_logger
-from waldur_core.structure.managers import count_customer_users, get_connected_customers
+from waldur_core.structure.managers import (
+    add_visible_project,
+    count_customer_users,
+    get_connected_customers,
+    get_customer_users,
+    get_project_users,
+    update_visible_scopes,
+)
 from waldur_core.structure.models import Customer, Project, ServiceSettings
 
 from . import tasks
@@ -42,6 +50,24 @@ def revoke_roles_on_project_deletion(sender, instance=None, **kwargs):
         permission.revoke()
 
 
+def update_visible_scopes_on_role_change(sender, instance, **kwargs):
+    content_types = ContentType.objects.get_for_models(Customer, Project).values()
+    if instance.content_type_id not in {ctype.id for ctype in content_types}:
+        return
+
+    update_visible_scopes([instance.user_id])
+
+
+def update_visible_scopes_on_project_save(sender, instance, created=False, **kwargs):
+    if created:
+        add_visible_project(instance)
+    elif instance.tracker.has_changed('customer_id'):
+        old_customer_id = instance.tracker.previous('customer_id')
+        user_ids = set(get_customer_users([old_customer_id, instance.customer_id]))
+        user_ids.update(get_project_users(instance.id))
+        update_visible_scopes(user_ids)
+
+
 def log_customer_save(sender, instance, created=False, **kwargs):
     if created:
         event_logger.customer.info(
@@ -1,4 +1,7 @@
+import collections
+
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
 
 from waldur_core.core import utils as core_utils
@@ -14,6 +17,32 @@ def build_filter(path, ids):
     return models.Q(**{f'{path}__in': ids})
 
 
+def get_project_customer_path(project_path):
+    if project_path == 'self':
+        return 'customer'
+    return f'{project_path}__customer'
+
+
+def is_multivalued_path(model, path):
+    """
+    Check whether lookup path traverses to-many relation,
+    so that filtering by it may produce duplicate rows.
+    """
+    if path == 'self':
+        return False
+    for part in path.split('__'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return True
+        if field.many_to_many or field.one_to_many:
+            return True
+        if not field.is_relation:
+            return False
+        model = field.related_model
+    return False
+
+
 def filter_queryset_for_user(queryset, user):
     if user is None or user.is_staff or user.is_support:
         return queryset
@@ -28,11 +57,16 @@ def filter_queryset_for_user(queryset, user):
     customer_path = getattr(permissions, 'customer_path', None)
     project_path = getattr(permissions, 'project_path', None)
 
-    if customer_path:
-        subquery |= build_filter(customer_path, get_connected_customers(user))
+    if project_path and customer_path == get_project_customer_path(project_path):
+        # Object is visible if user has role either in project or in its customer,
+        # which is exactly the set of visible projects.
+        subquery |= build_filter(project_path, get_visible_projects(user))
+    else:
+        if customer_path:
+            subquery |= build_filter(customer_path, get_connected_customers(user))
 
-    if project_path:
-        subquery |= build_filter(project_path, get_connected_projects(user))
+        if project_path:
+            subquery |= build_filter(project_path, get_connected_projects(user))
 
     build_query = getattr(permissions, 'build_query', None)
     if build_query:
@@ -41,7 +75,14 @@ def filter_queryset_for_user(queryset, user):
     if not subquery:
         return queryset
 
-    return queryset.filter(subquery).distinct()
+    queryset = queryset.filter(subquery)
+    if build_query or any(
+        is_multivalued_path(queryset.model, path)
+        for path in (customer_path, project_path)
+        if path
+    ):
+        queryset = queryset.distinct()
+    return queryset
 
 
 def filter_queryset_by_user_ip(queryset, request):
@@ -178,12 +219,16 @@ class PrivateServiceSettingsManager(ServiceSettingsManager):
 
 def get_connected_customers(user, role=None):
     ctype = ContentType.objects.get_for_model(structure_models.Customer)
-    return get_scope_ids(user, ctype, role)
+    return structure_models.Customer.objects.filter(
+        id__in=get_scope_ids(user, ctype, role)
+    ).values_list('id', flat=True)
 
 
 def get_connected_projects(user, role=None):
     ctype = ContentType.objects.get_for_model(structure_models.Project)
-    return get_scope_ids(user, ctype, role)
+    return structure_models.Project.objects.filter(
+        id__in=get_scope_ids(user, ctype, role)
+    ).values_list('id', flat=True)
 
 
 def get_customer_users(scope_ids, role=None):
@@ -213,21 +258,117 @@ def count_customer_users(customer):
 
 
 def get_visible_customers(user):
-    direct_projects = get_connected_projects(user)
-    direct_customers = get_connected_customers(user)
-    indirect_customers = structure_models.Project.objects.filter(
-        id__in=direct_projects
-    ).values_list('customer_id', flat=True)
-    return direct_customers.union(indirect_customers)
+    return structure_models.VisibleCustomer.objects.filter(user=user).values_list(
+        'customer_id', flat=True
+    )
 
 
 def get_visible_projects(user):
-    direct_customers = get_connected_customers(user)
-    direct_projects = get_connected_projects(user)
-    indirect_projects = structure_models.Project.objects.filter(
-        customer_id__in=direct_customers
-    ).values_list('id', flat=True)
-    return direct_projects.union(indirect_projects)
+    return structure_models.VisibleProject.objects.filter(user=user).values_list(
+        'project_id', flat=True
+    )
+
+
+def get_visible_scope_pairs(user_ids):
+    """
+    Compute visible customers and projects for given users.
+    Returns two sets of (user_id, customer_id) and (user_id, project_id) pairs.
+    """
+    customer_ctype = ContentType.objects.get_for_model(structure_models.Customer)
+    project_ctype = ContentType.objects.get_for_model(structure_models.Project)
+
+    customer_roles = set()
+    project_roles = set()
+    for user_id, content_type_id, object_id in UserRole.objects.filter(
+        is_active=True,
+        user_id__in=user_ids,
+        content_type__in=(customer_ctype, project_ctype),
+    ).values_list('user_id', 'content_type_id', 'object_id'):
+        if content_type_id == customer_ctype.id:
+            customer_roles.add((user_id, object_id))
+        else:
+            project_roles.add((user_id, object_id))
+
+    customer_ids = set(
+        structure_models.Customer.objects.filter(
+            id__in={customer_id for _, customer_id in customer_roles}
+        ).values_list('id', flat=True)
+    )
+    customer_projects = collections.defaultdict(list)
+    for project_id, customer_id in structure_models.Project.objects.filter(
+        customer_id__in=customer_ids
+    ).values_list('id', 'customer_id'):
+        customer_projects[customer_id].append(project_id)
+    project_customers = dict(
+        structure_models.Project.objects.filter(
+            id__in={project_id for _, project_id in project_roles}
+        ).values_list('id', 'customer_id')
+    )
+
+    customers = set()
+    projects = set()
+    for user_id, customer_id in customer_roles:
+        if customer_id in customer_ids:
+            customers.add((user_id, customer_id))
+            projects.update(
+                (user_id, project_id) for project_id in customer_projects[customer_id]
+            )
+    for user_id, project_id in project_roles:
+        if project_id in project_customers:
+            projects.add((user_id, project_id))
+            customers.add((user_id, project_customers[project_id]))
+    return customers, projects
+
+
+def _sync_visible_pairs(model, field, user_ids, pairs):
+    existing = set(
+        model.objects.filter(user_id__in=user_ids).values_list('user_id', field)
+    )
+
+    stale = collections.defaultdict(list)
+    for user_id, object_id in existing - pairs:
+        stale[user_id].append(object_id)
+    for user_id, object_ids in stale.items():
+        model.objects.filter(user_id=user_id, **{f'{field}__in': object_ids}).delete()
+
+    model.objects.bulk_create(
+        [
+            model(user_id=user_id, **{field: object_id})
+            for user_id, object_id in pairs - existing
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def update_visible_scopes(user_ids):
+    """
+    Synchronize denormalized visible customers and projects of given users
+    with their active roles.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    customers, projects = get_visible_scope_pairs(user_ids)
+    _sync_visible_pairs(
+        structure_models.VisibleCustomer, 'customer_id', user_ids, customers
+    )
+    _sync_visible_pairs(
+        structure_models.VisibleProject, 'project_id', user_ids, projects
+    )
+
+
+def add_visible_project(project):
+    """
+    Make new project visible to users of its customer.
+    """
+    user_ids = set(get_customer_users(project.customer_id))
+    structure_models.VisibleProject.objects.bulk_create(
+        [
+            structure_models.VisibleProject(user_id=user_id, project=project)
+            for user_id in user_ids
+        ],
+        ignore_conflicts=True,
+    )
 
 
 def get_divisions(user):
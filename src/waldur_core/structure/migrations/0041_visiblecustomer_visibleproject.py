@@ -0,0 +1,118 @@
+# Generated by Django 3.2.20 on 2026-10-18 05:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+FILL_VISIBLE_CUSTOMERS = """
+INSERT INTO structure_visiblecustomer (user_id, customer_id)
+SELECT r.user_id, c.id
+FROM permissions_userrole r
+JOIN django_content_type ct ON ct.id = r.content_type_id
+    AND ct.app_label = 'structure' AND ct.model = 'customer'
+JOIN structure_customer c ON c.id = r.object_id
+WHERE r.is_active
+UNION
+SELECT r.user_id, p.customer_id
+FROM permissions_userrole r
+JOIN django_content_type ct ON ct.id = r.content_type_id
+    AND ct.app_label = 'structure' AND ct.model = 'project'
+JOIN structure_project p ON p.id = r.object_id
+WHERE r.is_active
+"""
+
+FILL_VISIBLE_PROJECTS = """
+INSERT INTO structure_visibleproject (user_id, project_id)
+SELECT r.user_id, p.id
+FROM permissions_userrole r
+JOIN django_content_type ct ON ct.id = r.content_type_id
+    AND ct.app_label = 'structure' AND ct.model = 'project'
+JOIN structure_project p ON p.id = r.object_id
+WHERE r.is_active
+UNION
+SELECT r.user_id, p.id
+FROM permissions_userrole r
+JOIN django_content_type ct ON ct.id = r.content_type_id
+    AND ct.app_label = 'structure' AND ct.model = 'customer'
+JOIN structure_project p ON p.customer_id = r.object_id
+WHERE r.is_active
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('structure', '0040_useragreement_uuid'),
+        ('permissions', '0011_role_description_cs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisibleProject',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'project',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to='structure.project',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'unique_together': {('user', 'project')},
+            },
+        ),
+        migrations.CreateModel(
+            name='VisibleCustomer',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'customer',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to='structure.customer',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'unique_together': {('user', 'customer')},
+            },
+        ),
+        migrations.RunSQL(FILL_VISIBLE_CUSTOMERS, migrations.RunSQL.noop),
+        migrations.RunSQL(FILL_VISIBLE_PROJECTS, migrations.RunSQL.noop),
+    ]
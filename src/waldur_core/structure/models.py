@@ -784,6 +784,38 @@ class CustomerPermissionReview(core_models.UuidMixin):
         self.save()
 
 
+class VisibleCustomer(models.Model):
+    """
+    Denormalized set of customers visible to user, i.e. customers where user
+    has active role either in customer itself or in any of its projects.
+    It is maintained by signal handlers on UserRole and Project changes.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+'
+    )
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        unique_together = ('user', 'customer')
+
+
+class VisibleProject(models.Model):
+    """
+    Denormalized set of projects visible to user, i.e. projects where user
+    has active role either in project itself or in its customer.
+    It is maintained by signal handlers on UserRole and Project changes.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+'
+    )
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        unique_together = ('user', 'project')
+
+
 def build_service_settings_query(user):
     return Q(shared=True) | Q(
         shared=False,
@@ -26,6 +26,7 @@ from waldur_core.permissions.enums import SYSTEM_CUSTOMER_ROLES
 from waldur_core.permissions.models import UserRole
 from waldur_core.permissions.serializers import PermissionSerializer
 from waldur_core.permissions.utils import get_permissions
+from waldur_core.quotas import models as quotas_models
 from waldur_core.structure import models
 from waldur_core.structure import permissions as structure_permissions
 from waldur_core.structure import utils
@@ -182,6 +183,27 @@ class BasicUserSerializer(
         }
 
 
+class QuotaListSerializer(serializers.ListSerializer):
+    """
+    Loads quotas of all serialized objects using single grouped query
+    instead of running aggregate queries for each of them.
+
+    In order to use it set Meta.list_serializer_class. Example:
+
+    >>> class TenantSerializer(BaseResourceSerializer):
+    >>>     quotas = serializers.ReadOnlyField()
+    >>>
+    >>>     class Meta(BaseResourceSerializer.Meta):
+    >>>         list_serializer_class = QuotaListSerializer
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, django_models.Manager) else data
+        items = list(iterable)
+        quotas_models.QuotaModelMixin.prefetch_quotas(items)
+        return super().to_representation(items)
+
+
 class BasicProjectSerializer(core_serializers.BasicInfoSerializer):
     class Meta(core_serializers.BasicInfoSerializer.Meta):
         model = models.Project
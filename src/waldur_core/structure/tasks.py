@@ -50,10 +50,8 @@ class BackgroundPullTask(core_tasks.BackgroundTask):
         else:
             self.on_pull_success(instance)
 
-    def is_equal(self, other_task, serialized_instance):
-        return self.name == other_task.get(
-            'name'
-        ) and serialized_instance in other_task.get('args', [])
+    def get_lock_key(self, serialized_instance):
+        return f'{self.name}:{serialized_instance}'
 
     def pull(self, instance):
         """Pull instance from backend.
@@ -105,9 +103,6 @@ class BackgroundListPullTask(core_tasks.BackgroundTask):
     model = NotImplemented
     pull_task = NotImplemented
 
-    def is_equal(self, other_task):
-        return self.name == other_task.get('name')
-
     def get_pulled_objects(self):
         States = self.model.States
         return self.model.objects.filter(state__in=[States.ERRED, States.OK]).exclude(
@@ -228,9 +223,6 @@ class SetErredStuckResources(core_tasks.BackgroundTask):
 
     name = 'waldur_core.structure.SetErredStuckResources'
 
-    def is_equal(self, other_task):
-        return self.name == other_task.get('name')
-
     def run(self):
         cutoff = timezone.now() - timedelta(hours=3)
         states = (
@@ -3,6 +3,7 @@ from unittest import mock
 from django.test import TestCase
 
 from waldur_core.permissions.fixtures import CustomerRole, ProjectRole
+from waldur_core.structure import managers, models
 from waldur_core.structure.tests import factories, fixtures
 
 
@@ -144,3 +145,62 @@ class LogRoleEventTest(TestCase):
                     'role_name': 'manager',
                 },
             )
+
+
+class VisibleScopesTest(TestCase):
+    def setUp(self):
+        self.fixture = fixtures.ProjectFixture()
+        self.customer = self.fixture.customer
+        self.project = self.fixture.project
+
+    def get_visible_customers(self, user):
+        return set(managers.get_visible_customers(user))
+
+    def get_visible_projects(self, user):
+        return set(managers.get_visible_projects(user))
+
+    def test_customer_owner_can_see_all_projects_of_customer(self):
+        owner = self.fixture.owner
+        new_project = factories.ProjectFactory(customer=self.customer)
+
+        self.assertEqual(self.get_visible_customers(owner), {self.customer.id})
+        self.assertEqual(
+            self.get_visible_projects(owner), {self.project.id, new_project.id}
+        )
+
+    def test_project_member_can_see_project_and_its_customer(self):
+        admin = self.fixture.admin
+        factories.ProjectFactory(customer=self.customer)
+
+        self.assertEqual(self.get_visible_customers(admin), {self.customer.id})
+        self.assertEqual(self.get_visible_projects(admin), {self.project.id})
+
+    def test_visible_scopes_are_removed_when_role_is_revoked(self):
+        owner = self.fixture.owner
+        admin = self.fixture.admin
+
+        self.customer.remove_user(owner, CustomerRole.OWNER)
+        self.project.remove_user(admin, ProjectRole.ADMIN)
+
+        for user in (owner, admin):
+            self.assertEqual(self.get_visible_customers(user), set())
+            self.assertEqual(self.get_visible_projects(user), set())
+
+    def test_visible_scopes_are_updated_when_project_is_moved(self):
+        owner = self.fixture.owner
+        admin = self.fixture.admin
+        new_customer = factories.CustomerFactory()
+
+        self.project.customer = new_customer
+        self.project.save()
+
+        self.assertEqual(self.get_visible_projects(owner), set())
+        self.assertEqual(self.get_visible_customers(admin), {new_customer.id})
+
+    def test_visible_scopes_are_restored_from_roles(self):
+        owner = self.fixture.owner
+        models.VisibleProject.objects.all().delete()
+
+        managers.update_visible_scopes([owner.id])
+
+        self.assertEqual(self.get_visible_projects(owner), {self.project.id})
@@ -2,7 +2,9 @@ import logging
 
 from django.conf import settings
 from django.db import transaction
+from django.db.models import signals
 from django.utils.translation import gettext_lazy as _
+from model_utils.fields import AutoLastModifiedField
 from rest_framework.exceptions import ValidationError
 
 from waldur_auth_social.models import IdentityProvider, ProviderChoices
@@ -84,12 +86,12 @@ def get_identity_provider_fields(registration_method):
     }.get(registration_method, [])
 
 
-def update_pulled_fields(instance, imported_instance, fields):
+def get_pulled_changes(instance, imported_instance, fields):
     """
-    Update instance fields based on imported from backend data.
-    Save changes to DB only one or more fields were changed.
+    Copy values of fields from imported instance to instance.
+    Changes are not saved to DB, list of changed fields is returned instead.
     """
-    modified = False
+    changed_fields = []
     for field in fields:
         pulled_value = getattr(imported_instance, field)
         current_value = getattr(instance, field)
@@ -103,13 +105,22 @@ def update_pulled_fields(instance, imported_instance, fields):
                 current_value,
                 pulled_value,
             )
-            modified = True
+            changed_fields.append(field)
     error_message = getattr(imported_instance, 'error_message', '') or getattr(
         instance, 'error_message', ''
     )
     if error_message and instance.error_message != error_message:
         instance.error_message = imported_instance.error_message
-        modified = True
+        changed_fields.append('error_message')
+    return changed_fields
+
+
+def update_pulled_fields(instance, imported_instance, fields):
+    """
+    Update instance fields based on imported from backend data.
+    Save changes to DB only one or more fields were changed.
+    """
+    modified = bool(get_pulled_changes(instance, imported_instance, fields))
     if modified:
         instance.save()
     return modified
@@ -138,25 +149,128 @@ def handle_resource_update_success(resource):
     """
     Recover resource if its state is ERRED and clear error message.
     """
-    update_fields = []
+    update_fields = get_resource_update_success_changes(resource)
+    if update_fields:
+        resource.save(update_fields=update_fields)
+    logger.info(
+        '%s %s (PK: %s) was successfully updated.'
+        % (resource.__class__.__name__, resource, resource.pk)
+    )
+
+
+def get_resource_not_found_changes(resource):
+    """
+    Same as handle_resource_not_found, but changes are not saved to DB.
+    State transition is skipped if resource is erred already.
+    """
+    changed_fields = []
+    if resource.state != resource.States.ERRED:
+        resource.set_erred()
+        changed_fields.append('state')
+    if resource.runtime_state:
+        resource.runtime_state = ''
+        changed_fields.append('runtime_state')
+    message = 'Does not exist at backend.'
+    if message not in resource.error_message:
+        if not resource.error_message:
+            resource.error_message = message
+        else:
+            resource.error_message += f' ({message})'
+        changed_fields.append('error_message')
+    if changed_fields:
+        logger.warning(
+            '%s %s (PK: %s) does not exist at backend.',
+            resource.__class__.__name__,
+            resource,
+            resource.pk,
+        )
+    return changed_fields
+
+
+def get_resource_update_success_changes(resource):
+    """
+    Same as handle_resource_update_success, but changes are not saved to DB.
+    """
+    changed_fields = []
     if resource.state == resource.States.ERRED:
         resource.recover()
-        update_fields.append('state')
+        changed_fields.append('state')
 
     if resource.state in (resource.States.UPDATING, resource.States.CREATING):
         resource.set_ok()
-        update_fields.append('state')
+        changed_fields.append('state')
 
     if resource.error_message:
         resource.error_message = ''
-        update_fields.append('error_message')
+        changed_fields.append('error_message')
+    return changed_fields
 
-    if update_fields:
-        resource.save(update_fields=update_fields)
-    logger.info(
-        '%s %s (PK: %s) was successfully updated.'
-        % (resource.__class__.__name__, resource, resource.pk)
-    )
+
+def bulk_save_changes(model, changes):
+    """
+    Save changed instances using single bulk update query.
+    Changes is a list of (instance, changed_fields) pairs.
+    Post save signal is sent for each instance so that handlers
+    of changed instances keep working.
+    """
+    changes = [(instance, set(fields)) for instance, fields in changes if fields]
+    if not changes:
+        return
+
+    # bulk_update does not call pre_save of fields, therefore
+    # modification timestamps are updated explicitly.
+    auto_now_fields = [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or isinstance(field, AutoLastModifiedField)
+    ]
+    for instance, fields in changes:
+        for field in auto_now_fields:
+            field.pre_save(instance, add=False)
+            fields.add(field.name)
+
+    update_fields = set().union(*(fields for _, fields in changes))
+    with transaction.atomic():
+        model.objects.bulk_update(
+            [instance for instance, _ in changes], sorted(update_fields)
+        )
+        for instance, fields in changes:
+            signals.post_save.send(
+                sender=model,
+                instance=instance,
+                created=False,
+                update_fields=frozenset(fields),
+                raw=False,
+                using=instance._state.db,
+            )
+
+
+def reconcile_resources(model, resources, imported_resources, get_fields):
+    """
+    Synchronize local resources with resources imported from backend.
+    Diff is computed in memory and only changed rows are written to DB
+    using bulk update. State transitions are performed only for resources
+    which state has actually changed.
+
+    imported_resources is a dictionary where key is backend ID and value is unsaved model instance.
+    get_fields is a callable which accepts local and imported resource and returns list of pulled fields.
+    Returns list of resources which exist at backend.
+    """
+    changes = []
+    existing = []
+    for resource in resources:
+        imported_resource = imported_resources.get(resource.backend_id)
+        if imported_resource is None:
+            changes.append((resource, get_resource_not_found_changes(resource)))
+            continue
+        fields = get_fields(resource, imported_resource)
+        changed_fields = get_pulled_changes(resource, imported_resource, fields)
+        changed_fields += get_resource_update_success_changes(resource)
+        changes.append((resource, changed_fields))
+        existing.append(resource)
+
+    bulk_save_changes(model, changes)
+    return existing
 
 
 def check_customer_blocked_or_archived(obj):
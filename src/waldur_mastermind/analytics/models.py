@@ -1,6 +1,6 @@
 from django.contrib.contenttypes import fields as ct_fields
 from django.contrib.contenttypes import models as ct_models
-from django.db import models
+from django.db import connection, models
 
 from waldur_core.core.managers import GenericKeyMixin
 
@@ -16,6 +16,52 @@ class QuotaManager(GenericKeyMixin, models.Manager):
             defaults=dict(usage=usage),
         )
 
+    def bulk_update_or_create_quotas(self, date, rows):
+        """
+        Insert or update usages of many quotas for the given date using single query.
+        Rows should be dictionaries with content_type_id, object_id, name and usage keys.
+        """
+        if not rows:
+            return
+        table = self.model._meta.db_table
+        values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))
+        params = []
+        for row in rows:
+            params.extend(
+                [
+                    row['content_type_id'],
+                    row['object_id'],
+                    row['name'],
+                    date,
+                    row['usage'],
+                ]
+            )
+        query = (
+            f'INSERT INTO "{table}" ("content_type_id", "object_id", "name", "date", "usage") '
+            f'VALUES {values} '
+            'ON CONFLICT ("content_type_id", "object_id", "name", "date") '
+            'DO UPDATE SET "usage" = EXCLUDED."usage"'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+
+    def delete_expired(self, expiration_date, chunk_size):
+        """
+        Delete quotas older than expiration date in chunks to avoid long table locks.
+        Returns number of deleted rows.
+        """
+        deleted = 0
+        while True:
+            ids = list(
+                self.filter(date__lt=expiration_date).values_list('id', flat=True)[
+                    :chunk_size
+                ]
+            )
+            if not ids:
+                return deleted
+            self.filter(id__in=ids).delete()
+            deleted += len(ids)
+
 
 class DailyQuotaHistory(models.Model):
     """
@@ -7,6 +7,8 @@ from rest_framework import serializers
 from waldur_core.core.serializers import GenericRelatedField
 from waldur_core.structure.models import Customer, Project
 
+from . import utils
+
 
 class DailyHistoryQuotaSerializer(serializers.Serializer):
     scope = GenericRelatedField(related_models=(Project, Customer))
@@ -26,3 +28,36 @@ class DailyHistoryQuotaSerializer(serializers.Serializer):
                 _('Invalid period specified. `start` should be lesser than `end`.')
             )
         return attrs
+
+
+class DailyQuotaSeriesSerializer(serializers.Serializer):
+    scope = serializers.ListField(
+        child=GenericRelatedField(related_models=(Project, Customer))
+    )
+    quota_names = serializers.ListField(child=serializers.CharField(), required=False)
+    start = serializers.DateField(format='%Y-%m-%d', required=False)
+    end = serializers.DateField(format='%Y-%m-%d', required=False)
+    interval = serializers.ChoiceField(
+        choices=utils.Intervals.CHOICES, default=utils.Intervals.DAY
+    )
+    aggregate = serializers.ChoiceField(
+        choices=utils.Aggregates.CHOICES, default=utils.Aggregates.LAST
+    )
+
+    def validate(self, attrs):
+        if 'quota_names' not in attrs:
+            quota_names = []
+            for scope in attrs['scope']:
+                for name in scope.get_quotas_names():
+                    if name not in quota_names:
+                        quota_names.append(name)
+            attrs['quota_names'] = quota_names
+        if 'end' not in attrs:
+            attrs['end'] = timezone.now().date()
+        if 'start' not in attrs:
+            attrs['start'] = timezone.now().date() - timedelta(days=30)
+        if attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError(
+                _('Invalid period specified. `start` should be lesser than `end`.')
+            )
+        return attrs
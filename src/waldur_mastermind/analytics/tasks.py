@@ -1,23 +1,81 @@
+import logging
+import time
+
 from celery import shared_task
 from django.conf import settings as django_settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q, Sum
 from django.utils import timezone
 
+from waldur_core.quotas.models import QuotaUsage
 from waldur_core.structure import models as structure_models
 
 from . import models
 
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def get_quota_usages(scope_models):
+    """
+    Get current quota usages of all scopes of given models using single grouped query.
+    """
+    query = Q()
+    for model in scope_models:
+        content_type = ContentType.objects.get_for_model(model)
+        query |= Q(
+            content_type=content_type,
+            object_id__in=model.objects.values('id'),
+        )
+    return (
+        QuotaUsage.objects.filter(query)
+        .values('content_type_id', 'object_id', 'name')
+        .annotate(usage=Sum('delta'))
+        .order_by()
+    )
+
 
 @shared_task(name='analytics.sync_daily_quotas')
 def sync_daily_quotas():
     date = timezone.now().date()
-    for model in (structure_models.Project, structure_models.Customer):
-        for scope in model.objects.all():
-            for name, value in scope.quota_usages.items():
-                models.DailyQuotaHistory.objects.update_or_create_quota(
-                    scope, name, date, value
-                )
+    started = time.monotonic()
+
+    synced = 0
+    batch = []
+    for row in get_quota_usages(
+        (structure_models.Project, structure_models.Customer)
+    ).iterator(chunk_size=BATCH_SIZE):
+        row['usage'] = row['usage'] or 0
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            models.DailyQuotaHistory.objects.bulk_update_or_create_quotas(date, batch)
+            synced += len(batch)
+            batch = []
+    models.DailyQuotaHistory.objects.bulk_update_or_create_quotas(date, batch)
+    synced += len(batch)
+    sync_duration = time.monotonic() - started
 
+    started = time.monotonic()
     expiration_date = (
         timezone.now() - django_settings.WALDUR_ANALYTICS['DAILY_QUOTA_LIFETIME']
     )
-    models.DailyQuotaHistory.objects.filter(date__lt=expiration_date).delete()
+    deleted = models.DailyQuotaHistory.objects.delete_expired(
+        expiration_date, BATCH_SIZE
+    )
+    cleanup_duration = time.monotonic() - started
+
+    logger.info(
+        'Daily quotas are synced. Synced quotas: %s, duration: %.2f seconds. '
+        'Deleted expired quotas: %s, duration: %.2f seconds.',
+        synced,
+        sync_duration,
+        deleted,
+        cleanup_duration,
+    )
+    return {
+        'synced': synced,
+        'sync_duration': sync_duration,
+        'deleted': deleted,
+        'cleanup_duration': cleanup_duration,
+    }
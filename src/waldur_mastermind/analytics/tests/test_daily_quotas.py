@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import testcases
 from django.utils import timezone
 from rest_framework import status, test
@@ -5,7 +6,7 @@ from rest_framework.reverse import reverse
 
 from waldur_core.structure.tests import factories as structure_factories
 from waldur_core.structure.tests import fixtures as structure_fixtures
-from waldur_mastermind.analytics import models, tasks
+from waldur_mastermind.analytics import models, tasks, utils
 from waldur_mastermind.common.utils import parse_date
 
 
@@ -54,6 +55,103 @@ class TestDailyQuotasEndpoint(test.APITransactionTestCase):
         self.assertDictEqual(response.data, expected)
 
 
+class TestDailyQuotaSeriesEndpoint(test.APITransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.fixture = structure_fixtures.ProjectFixture()
+        self.project = self.fixture.project
+        self.customer = self.fixture.customer
+
+        for date, usage in (
+            ('2018-09-20', 5),
+            ('2018-10-01', 10),
+            ('2018-10-09', 20),
+        ):
+            models.DailyQuotaHistory.objects.create(
+                scope=self.project,
+                name='nc_user_count',
+                date=parse_date(date),
+                usage=usage,
+            )
+
+        models.DailyQuotaHistory.objects.create(
+            scope=self.customer,
+            name='nc_user_count',
+            date=parse_date('2018-10-03'),
+            usage=30,
+        )
+
+    def get_series(self, **kwargs):
+        self.client.force_login(self.fixture.owner)
+        request = {
+            'start': '2018-09-30',
+            'end': '2018-10-14',
+            'scope': [
+                structure_factories.ProjectFactory.get_url(self.project),
+                structure_factories.CustomerFactory.get_url(self.customer),
+            ],
+            'quota_names': ['nc_user_count'],
+        }
+        request.update(kwargs)
+        response = self.client.get(reverse('daily-quota-series-list'), request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_series_are_gap_filled_for_many_scopes(self):
+        data = self.get_series(end='2018-10-04')
+        self.assertEqual(
+            data['dates'],
+            ['2018-09-30', '2018-10-01', '2018-10-02', '2018-10-03', '2018-10-04'],
+        )
+        self.assertEqual(data['series'][0]['scope_uuid'], self.project.uuid.hex)
+        self.assertEqual(data['series'][0]['values'], [5, 10, 10, 10, 10])
+        self.assertEqual(data['series'][1]['scope_uuid'], self.customer.uuid.hex)
+        self.assertEqual(data['series'][1]['values'], [0, 0, 0, 30, 30])
+
+    def test_series_are_downsampled_by_weeks(self):
+        data = self.get_series(interval='week')
+        self.assertEqual(data['dates'], ['2018-09-30', '2018-10-01', '2018-10-08'])
+        self.assertEqual(data['series'][0]['values'], [5, 10, 20])
+
+        data = self.get_series(interval='week', aggregate='max')
+        self.assertEqual(data['series'][0]['values'], [5, 10, 20])
+
+        data = self.get_series(interval='week', aggregate='avg')
+        # 2018-10-08 has usage 10, the rest of the week has usage 20.
+        self.assertEqual(data['series'][0]['values'], [5, 10, 18.57])
+
+    def test_series_are_downsampled_by_months(self):
+        data = self.get_series(interval='month', aggregate='max')
+        self.assertEqual(data['dates'], ['2018-09-30', '2018-10-01'])
+        self.assertEqual(data['series'][0]['values'], [5, 20])
+        self.assertEqual(data['series'][1]['values'], [0, 30])
+
+    def test_closed_buckets_are_cached(self):
+        self.get_series(interval='week')
+        models.DailyQuotaHistory.objects.filter(scope=self.project).update(usage=100)
+        data = self.get_series(interval='week')
+        self.assertEqual(data['series'][0]['values'], [5, 10, 20])
+
+    def test_clipped_bucket_is_not_reused_for_longer_period(self):
+        data = self.get_series(interval='week', aggregate='avg', end='2018-10-08')
+        self.assertEqual(data['series'][0]['values'], [5, 10, 10])
+
+        data = self.get_series(interval='week', aggregate='avg')
+        self.assertEqual(data['series'][0]['values'], [5, 10, 18.57])
+
+    def test_buckets_are_clipped_by_period(self):
+        buckets = utils.get_buckets(
+            parse_date('2018-10-03'), parse_date('2018-10-10'), utils.Intervals.WEEK
+        )
+        self.assertEqual(
+            buckets,
+            [
+                (parse_date('2018-10-03'), parse_date('2018-10-07')),
+                (parse_date('2018-10-08'), parse_date('2018-10-10')),
+            ],
+        )
+
+
 class TestDailyQuotasTask(test.APITransactionTestCase):
     def setUp(self):
         self.fixture = structure_fixtures.ProjectFixture()
@@ -68,6 +166,39 @@ class TestDailyQuotasTask(test.APITransactionTestCase):
         ).usage
         self.assertEqual(30, actual)
 
+    def test_existing_quotas_are_updated(self):
+        self.project.set_quota_usage('nc_user_count', 30)
+        models.DailyQuotaHistory.objects.filter(scope=self.project).update(usage=0)
+        tasks.sync_daily_quotas()
+        actual = models.DailyQuotaHistory.objects.get(
+            scope=self.project, name='nc_user_count', date=timezone.now().date()
+        ).usage
+        self.assertEqual(30, actual)
+
+    def test_customer_quotas_are_synced(self):
+        customer = self.fixture.customer
+        customer.set_quota_usage('nc_user_count', 5)
+        models.DailyQuotaHistory.objects.all().delete()
+        tasks.sync_daily_quotas()
+        actual = models.DailyQuotaHistory.objects.get(
+            scope=customer, name='nc_user_count', date=timezone.now().date()
+        ).usage
+        self.assertEqual(5, actual)
+
+    def test_expired_quotas_are_deleted(self):
+        models.DailyQuotaHistory.objects.create(
+            scope=self.project,
+            name='nc_user_count',
+            date=parse_date('2018-10-01'),
+            usage=10,
+        )
+        tasks.sync_daily_quotas()
+        self.assertFalse(
+            models.DailyQuotaHistory.objects.filter(
+                date=parse_date('2018-10-01')
+            ).exists()
+        )
+
 
 class TestDailyQuotasSignalHandler(testcases.TestCase):
     def setUp(self):
@@ -5,6 +5,11 @@ def register_in(router):
     router.register(
         r'daily-quotas', views.DailyQuotaHistoryViewSet, basename='daily-quotas'
     )
+    router.register(
+        r'daily-quota-series',
+        views.DailyQuotaSeriesViewSet,
+        basename='daily-quota-series',
+    )
     router.register(
         r'project-quotas', views.ProjectQuotasViewSet, basename='project-quotas'
     )
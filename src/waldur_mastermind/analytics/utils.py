@@ -0,0 +1,183 @@
+import datetime
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from . import models
+
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+class Intervals:
+    DAY = 'day'
+    WEEK = 'week'
+    MONTH = 'month'
+
+    CHOICES = (DAY, WEEK, MONTH)
+
+
+class Aggregates:
+    LAST = 'last'
+    MAX = 'max'
+    AVG = 'avg'
+
+    CHOICES = (LAST, MAX, AVG)
+
+
+def get_buckets(start, end, interval):
+    """
+    Split period into list of (start, end) pairs of dates for the given interval.
+    The first and the last buckets are clipped by period boundaries.
+    """
+    buckets = []
+    bucket_start = start
+    while bucket_start <= end:
+        if interval == Intervals.WEEK:
+            next_start = bucket_start + datetime.timedelta(
+                days=7 - bucket_start.weekday()
+            )
+        elif interval == Intervals.MONTH:
+            if bucket_start.month == 12:
+                next_start = datetime.date(bucket_start.year + 1, 1, 1)
+            else:
+                next_start = datetime.date(bucket_start.year, bucket_start.month + 1, 1)
+        else:
+            next_start = bucket_start + datetime.timedelta(days=1)
+        bucket_end = min(next_start - datetime.timedelta(days=1), end)
+        buckets.append((bucket_start, bucket_end))
+        bucket_start = next_start
+    return buckets
+
+
+def aggregate_bucket(initial, points, bucket_start, bucket_end, aggregate):
+    """
+    Aggregate gap-filled daily values within bucket.
+    Initial is the value at the beginning of the bucket,
+    points is sorted list of (date, usage) pairs within the bucket.
+    """
+    if aggregate == Aggregates.LAST:
+        return points[-1][1] if points else initial
+    if aggregate == Aggregates.MAX:
+        return max([initial] + [usage for _, usage in points])
+
+    total = 0
+    value = initial
+    day = bucket_start
+    for date, usage in points:
+        total += value * (date - day).days
+        value = usage
+        day = date
+    total += value * ((bucket_end - day).days + 1)
+    days = (bucket_end - bucket_start).days + 1
+    return round(total / days, 2)
+
+
+def get_cache_key(content_type_id, object_id, name, interval, aggregate, bucket):
+    # Both boundaries are included, because the first and the last buckets
+    # may be clipped differently by period of each request.
+    return (
+        f'analytics:daily_quotas:{content_type_id}:{object_id}:{name}:'
+        f'{interval}:{aggregate}:{bucket[0].isoformat()}:{bucket[1].isoformat()}'
+    )
+
+
+def get_daily_quotas_series(scopes, quota_names, start, end, interval, aggregate):
+    """
+    Get gap-filled series of quota usages for many scopes and quota names.
+    Returns list of buckets and dictionary where key is (scope, name) pair
+    and value is list of aggregated usages for each bucket.
+
+    Values of closed buckets are cached, because daily quota history
+    is written only for the current date.
+    """
+    buckets = get_buckets(start, end, interval)
+    today = timezone.now().date()
+    keys = {}
+    for scope in scopes:
+        content_type_id = ContentType.objects.get_for_model(scope).id
+        for name in quota_names:
+            keys[(scope, name)] = (content_type_id, scope.id, name)
+
+    cache_keys = {
+        (series_key, bucket): get_cache_key(
+            *keys[series_key], interval, aggregate, bucket
+        )
+        for series_key in keys
+        for bucket in buckets
+        if bucket[1] < today
+    }
+    cached = cache.get_many(cache_keys.values())
+
+    result = {}
+    missing = []
+    for series_key in keys:
+        values = []
+        for bucket in buckets:
+            cache_key = cache_keys.get((series_key, bucket))
+            if cache_key not in cached:
+                missing.append(series_key)
+                break
+            values.append(cached[cache_key])
+        else:
+            result[series_key] = values
+
+    if not missing:
+        return buckets, result
+
+    points = load_points([keys[series_key] for series_key in missing], start, end)
+    to_cache = {}
+    for series_key in missing:
+        initial, series_points = points[keys[series_key]]
+        values = []
+        index = 0
+        for bucket in buckets:
+            bucket_points = []
+            while index < len(series_points) and series_points[index][0] <= bucket[1]:
+                bucket_points.append(series_points[index])
+                index += 1
+            value = aggregate_bucket(initial, bucket_points, *bucket, aggregate)
+            if bucket_points:
+                initial = bucket_points[-1][1]
+            values.append(value)
+            cache_key = cache_keys.get((series_key, bucket))
+            if cache_key:
+                to_cache[cache_key] = value
+        result[series_key] = values
+
+    cache.set_many(to_cache, CACHE_TIMEOUT)
+    return buckets, result
+
+
+def load_points(keys, start, end):
+    """
+    Load daily quota history for many (content_type_id, object_id, name) keys.
+    Returns dictionary where key is the same tuple and value is pair of
+    the last usage before start and sorted list of (date, usage) pairs within period.
+    """
+    query = Q()
+    for content_type_id, object_id, name in keys:
+        query |= Q(content_type_id=content_type_id, object_id=object_id, name=name)
+
+    points = {key: [0, []] for key in keys}
+    for row in (
+        models.DailyQuotaHistory.objects.filter(query, date__lt=start)
+        .order_by('content_type_id', 'object_id', 'name', '-date')
+        .distinct('content_type_id', 'object_id', 'name')
+        .values('content_type_id', 'object_id', 'name', 'usage')
+    ):
+        points[(row['content_type_id'], row['object_id'], row['name'])][0] = row[
+            'usage'
+        ]
+
+    for row in (
+        models.DailyQuotaHistory.objects.filter(query, date__gte=start, date__lte=end)
+        .order_by('date')
+        .values('content_type_id', 'object_id', 'name', 'date', 'usage')
+    ):
+        points[(row['content_type_id'], row['object_id'], row['name'])][1].append(
+            (row['date'], row['usage'])
+        )
+
+    return {key: tuple(value) for key, value in points.items()}
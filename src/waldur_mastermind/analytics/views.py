@@ -12,7 +12,7 @@ from waldur_mastermind.billing.models import PriceEstimate
 from waldur_mastermind.invoices.models import InvoiceItem
 from waldur_mastermind.invoices.utils import get_current_month, get_current_year
 
-from . import models, serializers
+from . import models, serializers, utils
 
 
 class DailyQuotaHistoryViewSet(viewsets.GenericViewSet):
@@ -60,6 +60,49 @@ class DailyQuotaHistoryViewSet(viewsets.GenericViewSet):
         return values
 
 
+class DailyQuotaSeriesViewSet(viewsets.GenericViewSet):
+    """
+    Gap-filled series of daily quota usages for many scopes at once.
+    Series may be downsampled to weeks or months using last, max or avg aggregate.
+    """
+
+    # Fix for schema generation
+    queryset = []
+
+    def list(self, request):
+        serializer = serializers.DailyQuotaSeriesSerializer(
+            data=request.query_params,
+            context={'request': request},
+        )
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+        scopes = query['scope']
+        quota_names = query['quota_names']
+        buckets, series = utils.get_daily_quotas_series(
+            scopes,
+            quota_names,
+            query['start'],
+            query['end'],
+            query['interval'],
+            query['aggregate'],
+        )
+        return Response(
+            {
+                'dates': [bucket_start.isoformat() for bucket_start, _ in buckets],
+                'series': [
+                    {
+                        'scope_uuid': scope.uuid.hex,
+                        'scope_type': scope._meta.model_name,
+                        'name': name,
+                        'values': series[(scope, name)],
+                    }
+                    for scope in scopes
+                    for name in quota_names
+                ],
+            }
+        )
+
+
 class ProjectQuotasViewSet(viewsets.GenericViewSet):
     # Fix for schema generation
     queryset = []
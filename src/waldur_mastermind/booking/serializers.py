@@ -114,7 +114,7 @@ class BookingSerializer(serializers.Serializer):
         user_customers = get_connected_customers(self.context['request'].user)
         creator_customers = get_connected_customers(order_item.order.created_by)
 
-        if user_customers.intersection(creator_customers):
+        if user_customers.filter(id__in=creator_customers).exists():
             return order_item.order.created_by.full_name
 
 
@@ -1,3 +1,4 @@
+from django.test import override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 from rest_framework import test
@@ -9,6 +10,7 @@ from . import fixtures
 
 
 @freeze_time('2020-11-01')
+@override_settings(task_always_eager=True)
 class InvoiceTest(test.APITransactionTestCase):
     def setUp(self):
         self.fixtures = fixtures.BookingFixture()
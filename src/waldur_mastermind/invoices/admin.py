@@ -129,6 +129,21 @@ class PaymentAdmin(admin.ModelAdmin):
     list_display = ('profile', 'date_of_payment', 'sum')
 
 
+class InvoicingRunAdmin(core_admin.ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'year',
+        'month',
+        'state',
+        'total_customers',
+        'processed_customers',
+        'failed_customers',
+        'modified',
+    )
+    list_filter = ('state',)
+    readonly_fields = list_display
+
+
 admin.site.register(models.Invoice, InvoiceAdmin)
 admin.site.register(models.PaymentProfile, PaymentProfileAdmin)
 admin.site.register(models.Payment, PaymentAdmin)
+admin.site.register(models.InvoicingRun, InvoicingRunAdmin)
@@ -87,6 +87,11 @@ class InvoicesExtension(WaldurExtension):
                 'schedule': crontab(minute=0, hour=0, day_of_month='1'),
                 'args': (),
             },
+            'check-invoicing-runs': {
+                'task': 'invoices.check_invoicing_runs',
+                'schedule': timedelta(hours=1),
+                'args': (),
+            },
             'send-monthly-invoicing-reports-about-customers': {
                 'task': 'invoices.send_monthly_invoicing_reports_about_customers',
                 'schedule': crontab(minute=0, hour=0, day_of_month='2'),
@@ -34,6 +34,7 @@ class InvoiceFilter(django_filters.FilterSet):
 
 class InvoiceItemFilter(django_filters.FilterSet):
     resource_uuid = django_filters.UUIDFilter(field_name='resource__uuid')
+    offering_uuid = django_filters.UUIDFilter(field_name='resource__offering__uuid')
     year = django_filters.NumberFilter(field_name='invoice__year')
     month = django_filters.NumberFilter(field_name='invoice__month')
     project_uuid = django_filters.UUIDFilter(field_name='project__uuid')
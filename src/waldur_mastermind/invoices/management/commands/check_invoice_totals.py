@@ -0,0 +1,66 @@
+import decimal
+
+from django.core.management.base import BaseCommand
+from django.db.backends.utils import format_number
+
+from waldur_mastermind.invoices import models
+
+
+def quantize_total(value):
+    field = models.Invoice._meta.get_field('total_cost')
+    return decimal.Decimal(format_number(value, field.max_digits, field.decimal_places))
+
+
+class Command(BaseCommand):
+    help = """
+    Find invoices with drifted total cost.
+    Price of each invoice is computed both in database and by summing up price of each item in Python.
+    Cached total cost is compared against total computed in Python.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Check invoices of given year.')
+        parser.add_argument('--month', type=int, help='Check invoices of given month.')
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Update cached total cost of drifted invoices.',
+        )
+
+    def handle(self, *args, **options):
+        invoices = models.Invoice.objects.annotate_price().select_related('customer')
+        if options['year']:
+            invoices = invoices.filter(year=options['year'])
+        if options['month']:
+            invoices = invoices.filter(month=options['month'])
+
+        checked = 0
+        drifted = 0
+        for invoice in invoices.order_by('id').iterator():
+            checked += 1
+            price = invoice.compute_price()
+            total = quantize_total(price + price * invoice.tax_percent / 100)
+
+            if invoice.price != price:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f'Invoice {invoice.uuid.hex} ({invoice}): price computed in database '
+                        f'is {invoice.price}, but price of items is {price}.'
+                    )
+                )
+
+            if invoice.total_cost != total:
+                drifted += 1
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'Invoice {invoice.uuid.hex} ({invoice}): cached total cost '
+                        f'is {invoice.total_cost}, but actual total is {total}.'
+                    )
+                )
+                if options['fix']:
+                    invoice.total_cost = total
+                    invoice.save(update_fields=['total_cost'])
+
+        self.stdout.write(
+            f'{checked} invoices have been checked, {drifted} of them have drifted total cost.'
+        )
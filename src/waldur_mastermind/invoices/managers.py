@@ -0,0 +1,70 @@
+from django.db import models as django_models
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Abs, Ceil, Coalesce, Sign
+
+
+def get_item_price_expression(prefix=''):
+    """
+    Database counterpart of InvoiceItem.price: unit price multiplied
+    by quantity and rounded up to 2 places after the decimal point.
+    """
+    value = F(prefix + 'unit_price') * F(prefix + 'quantity')
+    return ExpressionWrapper(
+        Sign(value) * Ceil(Abs(value) * 100) / 100,
+        output_field=DecimalField(),
+    )
+
+
+class InvoiceItemQuerySet(django_models.QuerySet):
+    def get_price(self):
+        """
+        Total price of invoice items computed using single aggregate query.
+        """
+        return self.aggregate(price=Sum(get_item_price_expression()))['price'] or 0
+
+
+class InvoiceItemManager(django_models.Manager):
+    def get_queryset(self):
+        return InvoiceItemQuerySet(self.model, using=self._db)
+
+    def get_price(self):
+        return self.get_queryset().get_price()
+
+
+class InvoiceQuerySet(django_models.QuerySet):
+    def annotate_price(self):
+        """
+        Annotate invoices with total price of their items so that
+        price, tax and total of invoice are computed without extra queries.
+        """
+        from .models import InvoiceItem
+
+        price = (
+            InvoiceItem.objects.filter(invoice=OuterRef('pk'))
+            .order_by()
+            .values('invoice')
+            .annotate(price=Sum(get_item_price_expression()))
+            .values('price')
+        )
+        return self.annotate(
+            items_price=Coalesce(
+                Subquery(price, output_field=DecimalField()),
+                Value(0, output_field=DecimalField()),
+            )
+        )
+
+
+class InvoiceManager(django_models.Manager):
+    def get_queryset(self):
+        return InvoiceQuerySet(self.model, using=self._db)
+
+    def annotate_price(self):
+        return self.get_queryset().annotate_price()
@@ -0,0 +1,72 @@
+# Generated by Django 3.2.20 on 2026-10-18 05:08
+
+import django.core.validators
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+import waldur_core.core.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('invoices', '0002_invoiceitem_backend_uuid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoicingRun',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'created',
+                    model_utils.fields.AutoCreatedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name='created',
+                    ),
+                ),
+                (
+                    'modified',
+                    model_utils.fields.AutoLastModifiedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name='modified',
+                    ),
+                ),
+                ('uuid', waldur_core.core.fields.UUIDField()),
+                (
+                    'month',
+                    models.PositiveSmallIntegerField(
+                        validators=[
+                            django.core.validators.MinValueValidator(1),
+                            django.core.validators.MaxValueValidator(12),
+                        ]
+                    ),
+                ),
+                ('year', models.PositiveSmallIntegerField()),
+                (
+                    'state',
+                    models.CharField(
+                        choices=[('running', 'Running'), ('done', 'Done')],
+                        default='running',
+                        max_length=30,
+                    ),
+                ),
+                ('total_customers', models.PositiveIntegerField(default=0)),
+                ('processed_customers', models.PositiveIntegerField(default=0)),
+                ('failed_customers', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('month', 'year')},
+            },
+        ),
+    ]
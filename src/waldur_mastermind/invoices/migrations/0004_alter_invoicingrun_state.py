@@ -0,0 +1,25 @@
+# Generated by Django 3.2.20 on 2026-10-18 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('invoices', '0003_invoicingrun'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='invoicingrun',
+            name='state',
+            field=models.CharField(
+                choices=[
+                    ('running', 'Running'),
+                    ('done', 'Done'),
+                    ('failed', 'Failed'),
+                ],
+                default='running',
+                max_length=30,
+            ),
+        ),
+    ]
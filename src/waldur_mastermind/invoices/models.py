@@ -19,7 +19,7 @@ from waldur_mastermind.common import mixins as common_mixins
 from waldur_mastermind.common.utils import quantize_price
 from waldur_mastermind.marketplace import models as marketplace_models
 
-from . import utils
+from . import managers, utils
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +97,7 @@ class Invoice(core_models.UuidMixin, core_models.BackendMixin, models.Model):
     )
 
     tracker = FieldTracker()
+    objects = managers.InvoiceManager()
 
     def update_total_cost(self):
         current_total = self.total
@@ -111,10 +112,21 @@ class Invoice(core_models.UuidMixin, core_models.BackendMixin, models.Model):
 
     @property
     def total(self):
-        return self.price + self.tax
+        price = self.price
+        return price + price * self.tax_percent / 100
 
     @property
     def price(self):
+        # Invoices fetched using annotate_price already have price of items.
+        if hasattr(self, 'items_price'):
+            return quantize_price(decimal.Decimal(self.items_price))
+        return quantize_price(decimal.Decimal(self.items.get_price()))
+
+    def compute_price(self):
+        """
+        Compute price by summing up price of each item in Python.
+        It is used for verification of price computed in database.
+        """
         return quantize_price(
             decimal.Decimal(sum(item.price for item in self.items.all()))
         )
@@ -261,6 +273,7 @@ class InvoiceItem(
     backend_uuid = models.UUIDField(null=True, blank=True)
 
     tracker = FieldTracker()
+    objects = managers.InvoiceItemManager()
 
     @property
     def tax(self):
@@ -476,5 +489,43 @@ class Payment(core_models.UuidMixin, core_models.TimeStampedModel):
         return 'payment'
 
 
+class InvoicingRun(core_models.UuidMixin, core_models.TimeStampedModel):
+    """
+    Progress of monthly invoicing. Customers are processed in chunks by separate tasks.
+    Counters refer to the latest attempt, because customers which are already
+    invoiced are skipped when invoicing is restarted.
+    Run is failed if it has not made progress for too long, for example
+    because chunk tasks have been lost.
+    """
+
+    class States:
+        RUNNING = 'running'
+        DONE = 'done'
+        FAILED = 'failed'
+
+        CHOICES = (
+            (RUNNING, _('Running')),
+            (DONE, _('Done')),
+            (FAILED, _('Failed')),
+        )
+
+    month = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(12)],
+    )
+    year = models.PositiveSmallIntegerField()
+    state = models.CharField(
+        max_length=30, choices=States.CHOICES, default=States.RUNNING
+    )
+    total_customers = models.PositiveIntegerField(default=0)
+    processed_customers = models.PositiveIntegerField(default=0)
+    failed_customers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('month', 'year')
+
+    def __str__(self):
+        return f'{self.year}-{self.month} | {self.state}'
+
+
 reversion.register(InvoiceItem)
 reversion.register(Invoice, follow=('items',))
@@ -1,12 +1,12 @@
 import datetime
 import logging
 from csv import DictWriter
-from io import StringIO
 
 from celery import shared_task
 from constance import config
 from django.conf import settings
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, QuerySet
 from django.template.loader import render_to_string
 from django.utils import timezone
 
@@ -18,6 +18,42 @@ from . import models, registrators, serializers, utils
 
 logger = logging.getLogger(__name__)
 
+REPORT_CHUNK_SIZE = 500
+INVOICING_CHUNK_SIZE = 100
+INVOICING_RUN_TIMEOUT = datetime.timedelta(hours=6)
+
+
+def get_invoiced_customers():
+    customers = structure_models.Customer.objects.exclude(archived=True)
+    if settings.WALDUR_CORE['ENABLE_ACCOUNTING_START_DATE']:
+        customers = customers.filter(accounting_start_date__lt=timezone.now())
+    return customers
+
+
+def get_old_pending_invoices(year, month):
+    return models.Invoice.objects.filter(
+        Q(state=models.Invoice.States.PENDING, year__lt=year)
+        | Q(state=models.Invoice.States.PENDING, year=year, month__lt=month)
+    )
+
+
+def get_pending_customer_ids(year, month):
+    """
+    Customers which do not have invoice for given month yet
+    or have pending invoices for previous months.
+    """
+    current_invoices = models.Invoice.objects.filter(year=year, month=month)
+    customer_ids = set(
+        get_invoiced_customers()
+        .exclude(id__in=current_invoices.values('customer_id'))
+        .values_list('id', flat=True)
+    ) | set(get_old_pending_invoices(year, month).values_list('customer_id', flat=True))
+    return sorted(customer_ids)
+
+
+def is_invoicing_run_stale(run):
+    return run.modified < timezone.now() - INVOICING_RUN_TIMEOUT
+
 
 @shared_task(name='invoices.create_monthly_invoices')
 def create_monthly_invoices():
@@ -25,31 +61,116 @@ def create_monthly_invoices():
     - For every customer change state of the invoices for previous months from "pending" to "billed"
       and freeze their items.
     - Create new invoice for every customer in current month if not created yet.
+
+    Customers are split into chunks processed by separate tasks.
+    Customers which are already invoiced are skipped, so task could be safely restarted.
+    Run which is still in progress is not restarted, because its chunk tasks
+    are updating counters of the run.
     """
     date = timezone.now()
+    customer_ids = get_pending_customer_ids(date.year, date.month)
 
-    old_invoices = models.Invoice.objects.filter(
-        Q(state=models.Invoice.States.PENDING, year__lt=date.year)
-        | Q(state=models.Invoice.States.PENDING, year=date.year, month__lt=date.month)
+    run, created = models.InvoicingRun.objects.get_or_create(
+        year=date.year, month=date.month
+    )
+    if not customer_ids and run.state == models.InvoicingRun.States.DONE:
+        logger.info('All customers are already invoiced for %s.', run)
+        return
+
+    if (
+        not created
+        and run.state == models.InvoicingRun.States.RUNNING
+        and not is_invoicing_run_stale(run)
+    ):
+        logger.info('Monthly invoicing %s is still in progress.', run)
+        return
+
+    run.state = models.InvoicingRun.States.RUNNING
+    run.total_customers = len(customer_ids)
+    run.processed_customers = 0
+    run.failed_customers = 0
+    run.save(
+        update_fields=[
+            'state',
+            'total_customers',
+            'processed_customers',
+            'failed_customers',
+            'modified',
+        ]
+    )
+    logger.info(
+        'Monthly invoicing %s has been started for %s customers.',
+        run,
+        len(customer_ids),
     )
-    for invoice in old_invoices:
-        invoice.set_created()
 
-    customers = structure_models.Customer.objects.exclude(archived=True)
-    if settings.WALDUR_CORE['ENABLE_ACCOUNTING_START_DATE']:
-        customers = customers.filter(accounting_start_date__lt=timezone.now())
+    if not customer_ids:
+        complete_invoicing_run(run.id)
+        return
+
+    for index in range(0, len(customer_ids), INVOICING_CHUNK_SIZE):
+        chunk = customer_ids[index : index + INVOICING_CHUNK_SIZE]
+        create_customers_invoices.delay(run.id, chunk)
 
-    for customer in customers.iterator():
+
+@shared_task(name='invoices.create_customers_invoices')
+def create_customers_invoices(run_id, customer_ids):
+    run = models.InvoicingRun.objects.get(id=run_id)
+    date = core_utils.month_start(datetime.date(run.year, run.month, 1))
+    invoiced_ids = set(
+        get_invoiced_customers()
+        .filter(id__in=customer_ids)
+        .values_list('id', flat=True)
+    )
+
+    processed = failed = 0
+    for customer in structure_models.Customer.objects.filter(id__in=customer_ids):
         try:
-            registrators.RegistrationManager.get_or_create_invoice(
-                customer, core_utils.month_start(date)
-            )
+            with transaction.atomic():
+                old_invoices = get_old_pending_invoices(
+                    run.year, run.month
+                ).select_for_update()
+                for invoice in old_invoices.filter(customer=customer):
+                    invoice.set_created()
+
+                if customer.id in invoiced_ids:
+                    registrators.RegistrationManager.get_or_create_invoice(
+                        customer, date
+                    )
+            processed += 1
         except Exception:
             # Continue processing even if some customers could not be processed
+            failed += 1
             logger.exception(
                 'Unable to create monthly invoice for customer %s', customer
             )
 
+    # Modification time is updated so that run which makes progress is not considered stale.
+    models.InvoicingRun.objects.filter(
+        id=run_id, state=models.InvoicingRun.States.RUNNING
+    ).update(
+        processed_customers=F('processed_customers') + processed,
+        failed_customers=F('failed_customers') + failed,
+        modified=timezone.now(),
+    )
+
+    complete_invoicing_run(run_id)
+
+
+def complete_invoicing_run(run_id):
+    # Only the task which completes invoicing triggers notifications.
+    completed = models.InvoicingRun.objects.filter(
+        id=run_id,
+        state=models.InvoicingRun.States.RUNNING,
+        total_customers__lte=F('processed_customers') + F('failed_customers'),
+    ).update(state=models.InvoicingRun.States.DONE)
+    if completed:
+        notify_invoicing_completed(run_id)
+
+
+def notify_invoicing_completed(run_id):
+    logger.info('Monthly invoicing %s has been completed.', run_id)
+
     if settings.WALDUR_INVOICES['INVOICE_REPORTING']['ENABLE']:
         send_invoice_report.delay()
 
@@ -57,6 +178,41 @@ def create_monthly_invoices():
         send_new_invoices_notification.delay()
 
 
+@shared_task(name='invoices.check_invoicing_runs')
+def check_invoicing_runs():
+    """
+    Complete or fail invoicing runs which have not made progress for too long,
+    for example because chunk tasks have been lost.
+    """
+    runs = models.InvoicingRun.objects.filter(
+        state=models.InvoicingRun.States.RUNNING,
+        modified__lt=timezone.now() - INVOICING_RUN_TIMEOUT,
+    )
+    for run in runs:
+        pending_customer_ids = get_pending_customer_ids(run.year, run.month)
+        new_state = (
+            models.InvoicingRun.States.FAILED
+            if pending_customer_ids
+            else models.InvoicingRun.States.DONE
+        )
+        updated = models.InvoicingRun.objects.filter(
+            id=run.id,
+            state=models.InvoicingRun.States.RUNNING,
+            modified=run.modified,
+        ).update(state=new_state, modified=timezone.now())
+        if not updated:
+            continue
+
+        if new_state == models.InvoicingRun.States.DONE:
+            notify_invoicing_completed(run.id)
+        else:
+            logger.error(
+                'Monthly invoicing %s has been abandoned, %s customers are not invoiced.',
+                run,
+                len(pending_customer_ids),
+            )
+
+
 @shared_task(name='invoices.send_invoice_notification')
 def send_invoice_notification(invoice_uuid):
     """Sends email notification with invoice link to customer owners"""
@@ -120,7 +276,7 @@ def send_invoice_report(
         },
     ).strip()
     filename = '3M%02d%dWaldur.txt' % (date.month, date.year)
-    invoices = models.Invoice.objects.filter(
+    invoices = models.Invoice.objects.annotate_price().filter(
         year=date.year, month=date.month, customer__archived=False
     )
 
@@ -131,7 +287,9 @@ def send_invoice_report(
         )
 
     # Report should not include customers with 0 invoice items.
-    invoices = [invoice for invoice in invoices if invoice.items.count() > 0]
+    invoices = invoices.filter(
+        Exists(models.InvoiceItem.objects.filter(invoice=OuterRef('pk')))
+    )
     text_message = format_invoice_csv(invoices)
 
     # Please note that email body could be empty if there are no valid invoices
@@ -150,50 +308,73 @@ def send_invoice_report(
     )
 
 
-def format_invoice_csv(invoices):
-    if not isinstance(invoices, list):
+class Echo:
+    """
+    File-like object which returns written value instead of storing it,
+    so that CSV writer could be used for producing lines one by one.
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_report_serializer_class():
+    reporting = settings.WALDUR_INVOICES['INVOICE_REPORTING']
+    if reporting.get('USE_SAF'):
+        return serializers.SAFReportSerializer
+    elif reporting.get('USE_SAP'):
+        return serializers.SAPReportSerializer
+    return serializers.InvoiceItemReportSerializer
+
+
+def get_report_items(invoice, ordering):
+    items = invoice.items.select_related('resource__offering', 'project').order_by(
+        *ordering
+    )
+    # Items are fetched in chunks. They keep reference to the invoice,
+    # so that invoice price is not computed again for each item.
+    return items.iterator(chunk_size=REPORT_CHUNK_SIZE)
+
+
+def stream_invoice_csv(invoices):
+    """
+    Generate CSV report line by line so that memory usage
+    does not depend on the number of invoices and their items.
+    Invoices may be passed as single invoice, list or queryset.
+    """
+    if isinstance(invoices, models.Invoice):
         invoices = [invoices]
+    elif isinstance(invoices, QuerySet):
+        invoices = invoices.select_related('customer').iterator(
+            chunk_size=REPORT_CHUNK_SIZE
+        )
 
     csv_params = settings.WALDUR_INVOICES['INVOICE_REPORTING']['CSV_PARAMS']
+    serializer_class = get_report_serializer_class()
+    # Serializer fields are bound once and reused for all rows.
+    serializer = serializer_class()
+    if serializer_class == serializers.InvoiceItemReportSerializer:
+        ordering = ('id',)
+    else:
+        ordering = ('project_name', 'name')
+    writer = DictWriter(Echo(), fieldnames=serializer_class.Meta.fields, **csv_params)
+    yield writer.writeheader()
 
-    if settings.WALDUR_INVOICES['INVOICE_REPORTING'].get('USE_SAF'):
-        fields = serializers.SAFReportSerializer.Meta.fields
-        stream = StringIO()
-        writer = DictWriter(stream, fieldnames=fields, **csv_params)
-        writer.writeheader()
+    for invoice in invoices:
+        for item in get_report_items(invoice, ordering):
+            # skip empty, but leave in credit and debit
+            if item.total == 0:
+                continue
+            yield writer.writerow(serializer.to_representation(item))
 
-        for invoice in invoices:
-            items = utils.filter_invoice_items(
-                invoice.items.order_by('project_name', 'name')
-            )
-            serializer = serializers.SAFReportSerializer(items, many=True)
-            writer.writerows(serializer.data)
-        return stream.getvalue()
-    elif settings.WALDUR_INVOICES['INVOICE_REPORTING'].get('USE_SAP'):
-        fields = serializers.SAPReportSerializer.Meta.fields
-        stream = StringIO()
-        writer = DictWriter(stream, fieldnames=fields, **csv_params)
-        writer.writeheader()
-
-        for invoice in invoices:
-            items = utils.filter_invoice_items(
-                invoice.items.order_by('project_name', 'name')
-            )
-            serializer = serializers.SAPReportSerializer(items, many=True)
-            writer.writerows(serializer.data)
-        return stream.getvalue()
 
-    fields = serializers.InvoiceItemReportSerializer.Meta.fields
-    stream = StringIO()
-    writer = DictWriter(stream, fieldnames=fields, **csv_params)
-    writer.writeheader()
+def write_invoice_csv(invoices, file):
+    for line in stream_invoice_csv(invoices):
+        file.write(line)
 
-    for invoice in invoices:
-        items = utils.filter_invoice_items(invoice.items.all())
-        serializer = serializers.InvoiceItemReportSerializer(items, many=True)
-        writer.writerows(serializer.data)
 
-    return stream.getvalue()
+def format_invoice_csv(invoices):
+    return ''.join(stream_invoice_csv(invoices))
 
 
 @shared_task(name='invoices.update_invoices_total_cost')
@@ -201,7 +382,9 @@ def update_invoices_total_cost():
     year = utils.get_current_year()
     month = utils.get_current_month()
 
-    for invoice in models.Invoice.objects.filter(year=year, month=month):
+    for invoice in models.Invoice.objects.annotate_price().filter(
+        year=year, month=month
+    ):
         invoice.update_total_cost()
 
 
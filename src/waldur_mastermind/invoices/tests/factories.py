@@ -23,8 +23,9 @@ class InvoiceFactory(factory.DjangoModelFactory):
         return url if action is None else url + action + '/'
 
     @classmethod
-    def get_list_url(cls):
-        return 'http://testserver' + reverse('invoice-list')
+    def get_list_url(cls, action=None):
+        url = 'http://testserver' + reverse('invoice-list')
+        return url if action is None else url + action + '/'
 
 
 class InvoiceItemFactory(factory.DjangoModelFactory):
@@ -176,6 +176,7 @@ class MeasuredUnitTest(test.APITransactionTestCase):
         self.assertEqual(item.get_measured_unit(), _('allocations'))
 
 
+@override_settings(task_always_eager=True)
 class InvoiceStatsTest(test.APITransactionTestCase):
     def setUp(self):
         self.provider = marketplace_factories.ServiceProviderFactory()
@@ -405,6 +406,32 @@ class DeleteCustomerWithInvoiceTest(test.APITransactionTestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
 
+@ddt
+class InvoiceExportTest(test.APITransactionTestCase):
+    def setUp(self):
+        self.fixture = fixtures.InvoiceFixture()
+        self.invoice = self.fixture.invoice
+        self.fixture.invoice_item
+        self.url = factories.InvoiceFactory.get_list_url('export')
+
+    def test_staff_can_export_invoices(self):
+        self.client.force_authenticate(self.fixture.staff)
+        response = self.client.get(
+            self.url, {'customer_uuid': self.fixture.customer.uuid.hex}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertIn(self.invoice.uuid.hex, lines[1])
+
+    @data('owner', 'manager', 'admin', 'user')
+    def test_other_users_cannot_export_invoices(self, user):
+        self.client.force_authenticate(getattr(self.fixture, user))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 @ddt
 class InvoicePaidTest(test.APITransactionTestCase):
     def setUp(self):
@@ -1,6 +1,7 @@
 from unittest import mock
 
 from ddt import data, ddt
+from django.test import override_settings
 from freezegun import freeze_time
 from rest_framework import status, test
 
@@ -208,6 +209,7 @@ class ProfileModelTest(test.APITransactionTestCase):
         self.assertTrue(self.profile.is_active)
 
 
+@override_settings(task_always_eager=True)
 class ProfileProcessingTest(test.APITransactionTestCase):
     def setUp(self):
         self.profile = factories.PaymentProfileFactory(
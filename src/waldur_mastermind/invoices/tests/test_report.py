@@ -27,6 +27,16 @@ class BaseReportFormatterTest(TransactionTestCase):
 
 
 class GenericReportFormatterTest(BaseReportFormatterTest):
+    def test_report_is_streamed_line_by_line(self):
+        fixture = fixtures.InvoiceFixture()
+        fixture.invoice_item
+        invoices = models.Invoice.objects.annotate_price().filter(
+            id__in=[self.invoice.id, fixture.invoice.id]
+        )
+        lines = list(tasks.stream_invoice_csv(invoices))
+        self.assertEqual(3, len(lines))
+        self.assertEqual(''.join(lines), format_invoice_csv(invoices))
+
     def test_invoice_items_are_properly_formatted(self):
         report = format_invoice_csv(self.invoice)
         lines = report.splitlines()
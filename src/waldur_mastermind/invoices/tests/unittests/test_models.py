@@ -1,5 +1,7 @@
 import decimal
+from io import StringIO
 
+from django.core.management import call_command
 from django.test import TestCase
 
 from waldur_mastermind.common.utils import parse_datetime, quantize_price
@@ -41,3 +43,45 @@ class InvoiceItemTest(TestCase):
             ),
             4,
         )
+
+
+class InvoicePriceTest(TestCase):
+    def setUp(self):
+        self.invoice = factories.InvoiceFactory(tax_percent=20)
+        for unit_price, quantity in (
+            ('10.5', '0.3333333'),
+            ('0.0125', '7'),
+            ('-3.333', '1'),
+            ('100', '2'),
+        ):
+            factories.InvoiceItemFactory(
+                invoice=self.invoice,
+                unit_price=decimal.Decimal(unit_price),
+                quantity=decimal.Decimal(quantity),
+            )
+
+    def test_price_computed_in_database_matches_price_of_items(self):
+        self.assertEqual(self.invoice.price, self.invoice.compute_price())
+
+    def test_annotated_price_matches_price_of_items(self):
+        invoice = models.Invoice.objects.annotate_price().get(id=self.invoice.id)
+        self.assertEqual(invoice.price, self.invoice.compute_price())
+        self.assertEqual(invoice.total, self.invoice.total)
+
+    def test_price_of_invoice_without_items_is_zero(self):
+        invoice = factories.InvoiceFactory()
+        self.assertEqual(invoice.price, 0)
+        invoice = models.Invoice.objects.annotate_price().get(id=invoice.id)
+        self.assertEqual(invoice.price, 0)
+
+    def test_drifted_total_cost_is_fixed(self):
+        models.Invoice.objects.filter(id=self.invoice.id).update(total_cost=1)
+        stdout = StringIO()
+        call_command('check_invoice_totals', '--fix', stdout=stdout)
+        self.assertIn(self.invoice.uuid.hex, stdout.getvalue())
+
+        self.invoice.refresh_from_db()
+        self.assertEqual(
+            self.invoice.total_cost,
+            quantize_price(self.invoice.total),
+        )
@@ -13,6 +13,7 @@ from waldur_mastermind.invoices import models, tasks
 from waldur_mastermind.invoices.tests import factories, fixtures
 
 
+@override_settings(task_always_eager=True)
 class CreateMonthlyInvoiceTest(TestCase):
     def test_invoice_item_is_created_for_created_resource_in_new_month(self):
         with freeze_time('2017-01-15'):
@@ -61,7 +62,104 @@ class CreateMonthlyInvoiceTest(TestCase):
             )
 
 
+@override_settings(task_always_eager=True)
+class InvoicingRunTest(TestCase):
+    def test_invoicing_progress_is_tracked(self):
+        with freeze_time('2017-01-15'):
+            factories.InvoiceFactory()
+            factories.InvoiceFactory()
+
+        with freeze_time('2017-02-01'):
+            tasks.create_monthly_invoices()
+
+        run = models.InvoicingRun.objects.get(year=2017, month=2)
+        self.assertEqual(run.state, models.InvoicingRun.States.DONE)
+        self.assertEqual(run.total_customers, 2)
+        self.assertEqual(run.processed_customers, 2)
+        self.assertEqual(run.failed_customers, 0)
+
+    def test_restarted_invoicing_skips_invoiced_customers(self):
+        with freeze_time('2017-01-15'):
+            invoice = factories.InvoiceFactory()
+
+        with freeze_time('2017-02-01'):
+            tasks.create_monthly_invoices()
+            structure_factories.CustomerFactory()
+            tasks.create_monthly_invoices()
+
+        run = models.InvoicingRun.objects.get(year=2017, month=2)
+        self.assertEqual(run.total_customers, 1)
+        self.assertEqual(
+            models.Invoice.objects.filter(
+                customer=invoice.customer, year=2017, month=2
+            ).count(),
+            1,
+        )
+        self.assertEqual(models.Invoice.objects.filter(year=2017, month=2).count(), 2)
+
+    def test_run_in_progress_is_not_restarted(self):
+        with freeze_time('2017-01-15'):
+            factories.InvoiceFactory()
+
+        with freeze_time('2017-02-01'):
+            run = models.InvoicingRun.objects.create(
+                year=2017, month=2, total_customers=5, processed_customers=3
+            )
+            tasks.create_monthly_invoices()
+
+        run.refresh_from_db()
+        self.assertEqual(run.state, models.InvoicingRun.States.RUNNING)
+        self.assertEqual(run.total_customers, 5)
+        self.assertEqual(run.processed_customers, 3)
+
+    def test_abandoned_run_is_failed(self):
+        with freeze_time('2017-01-15'):
+            factories.InvoiceFactory()
+
+        with freeze_time('2017-02-01'):
+            run = models.InvoicingRun.objects.create(
+                year=2017, month=2, total_customers=1
+            )
+
+        with freeze_time('2017-02-02'):
+            tasks.check_invoicing_runs()
+
+        run.refresh_from_db()
+        self.assertEqual(run.state, models.InvoicingRun.States.FAILED)
+
+    def test_abandoned_run_is_completed_if_all_customers_are_invoiced(self):
+        with freeze_time('2017-02-01'):
+            factories.InvoiceFactory()
+            run = models.InvoicingRun.objects.create(
+                year=2017, month=2, total_customers=1
+            )
+
+        with freeze_time('2017-02-02'):
+            tasks.check_invoicing_runs()
+
+        run.refresh_from_db()
+        self.assertEqual(run.state, models.InvoicingRun.States.DONE)
+
+    def test_failed_run_is_restarted(self):
+        with freeze_time('2017-01-15'):
+            factories.InvoiceFactory()
+
+        with freeze_time('2017-02-01'):
+            models.InvoicingRun.objects.create(
+                year=2017,
+                month=2,
+                state=models.InvoicingRun.States.FAILED,
+                total_customers=5,
+            )
+            tasks.create_monthly_invoices()
+
+        run = models.InvoicingRun.objects.get(year=2017, month=2)
+        self.assertEqual(run.state, models.InvoicingRun.States.DONE)
+        self.assertEqual(run.total_customers, 1)
+
+
 @ddt
+@override_settings(task_always_eager=True)
 class CheckAccountingStartDateTest(TestCase):
     @data(
         (True, True, True),  # invoice is created if trial period ended
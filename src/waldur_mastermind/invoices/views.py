@@ -5,6 +5,7 @@ import uuid
 from dateutil.relativedelta import relativedelta
 from django.db import transaction
 from django.db.models import F, Sum
+from django.http import StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import exceptions, status
@@ -13,6 +14,7 @@ from rest_framework.response import Response
 
 from waldur_core.core import validators as core_validators
 from waldur_core.core import views as core_views
+from waldur_core.media.utils import format_content_disposition
 from waldur_core.structure import filters as structure_filters
 from waldur_core.structure import models as structure_models
 from waldur_core.structure import permissions as structure_permissions
@@ -24,7 +26,7 @@ from . import filters, log, models, serializers, tasks, utils
 
 
 class InvoiceViewSet(core_views.ReadOnlyActionsViewSet):
-    queryset = models.Invoice.objects.order_by('-year', '-month')
+    queryset = models.Invoice.objects.annotate_price().order_by('-year', '-month')
     serializer_class = serializers.InvoiceSerializer
     lookup_field = 'uuid'
     filter_backends = (
@@ -196,7 +198,7 @@ class InvoiceViewSet(core_views.ReadOnlyActionsViewSet):
         other_periods = {}
 
         for i in range(13):
-            invoices = models.Invoice.objects.filter(
+            invoices = models.Invoice.objects.annotate_price().filter(
                 year=current_month.year,
                 month=current_month.month,
             )
@@ -232,6 +234,22 @@ class InvoiceViewSet(core_views.ReadOnlyActionsViewSet):
 
         return Response(result, status=status.HTTP_200_OK)
 
+    @action(detail=False)
+    def export(self, request):
+        """
+        Stream accounting report for filtered invoices as CSV.
+        Format of the report is the same as in the report sent by email.
+        """
+        if not self.request.user.is_staff and not request.user.is_support:
+            raise exceptions.PermissionDenied()
+
+        invoices = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            tasks.stream_invoice_csv(invoices), content_type='text/csv'
+        )
+        response['Content-Disposition'] = format_content_disposition('invoices.csv')
+        return response
+
     @action(detail=True, methods=['post'])
     def set_backend_id(self, request, uuid=None):
         serializer = self.get_serializer(instance=self.get_object(), data=request.data)
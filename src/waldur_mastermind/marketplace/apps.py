@@ -13,6 +13,8 @@ class MarketplaceConfig(AppConfig):
         from waldur_core.structure import models as structure_models
         from waldur_core.structure import signals as structure_signals
         from waldur_core.structure.serializers import BaseResourceSerializer
+        from waldur_mastermind.invoices import models as invoices_models
+        from waldur_mastermind.promotions import models as promotions_models
 
         from . import PLUGIN_NAME, handlers, models, processors
         from . import registrators as marketplace_registrators
@@ -222,3 +224,69 @@ class MarketplaceConfig(AppConfig):
             sender=models.Offering,
             dispatch_uid='waldur_mastermind.marketplace.update_offering_user_username_after_offering_settings_change',
         )
+
+        signals.post_save.connect(
+            handlers.refresh_service_provider_stats_on_offering_change,
+            sender=models.Offering,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_offering_post_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.refresh_service_provider_stats_on_offering_change,
+            sender=models.Offering,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_offering_post_delete',
+        )
+
+        signals.post_save.connect(
+            handlers.refresh_service_provider_stats_on_resource_change,
+            sender=models.Resource,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_resource_post_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.refresh_service_provider_stats_on_resource_change,
+            sender=models.Resource,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_resource_post_delete',
+        )
+
+        signals.post_save.connect(
+            handlers.refresh_service_provider_stats_on_resource_change,
+            sender=models.OrderItem,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_order_item_post_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.refresh_service_provider_stats_on_resource_change,
+            sender=models.OrderItem,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_order_item_post_delete',
+        )
+
+        signals.post_save.connect(
+            handlers.refresh_service_provider_stats_on_order_change,
+            sender=models.Order,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_order_post_save',
+        )
+
+        signals.post_save.connect(
+            handlers.refresh_service_provider_stats_on_campaign_change,
+            sender=promotions_models.Campaign,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_campaign_post_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.refresh_service_provider_stats_on_campaign_change,
+            sender=promotions_models.Campaign,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_campaign_post_delete',
+        )
+
+        signals.post_save.connect(
+            handlers.refresh_service_provider_stats_on_invoice_item_change,
+            sender=invoices_models.InvoiceItem,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_invoice_item_post_save',
+        )
+
+        signals.post_delete.connect(
+            handlers.refresh_service_provider_stats_on_invoice_item_change,
+            sender=invoices_models.InvoiceItem,
+            dispatch_uid='waldur_mastermind.marketplace.refresh_service_provider_stats_on_invoice_item_post_delete',
+        )
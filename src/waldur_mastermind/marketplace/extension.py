@@ -34,6 +34,11 @@ class MarketplaceExtension(WaldurExtension):
                 'schedule': timedelta(hours=1),
                 'args': (),
             },
+            'waldur-marketplace-refresh-service-provider-stats': {
+                'task': 'waldur_mastermind.marketplace.refresh_all_service_provider_stats',
+                'schedule': timedelta(hours=1),
+                'args': (),
+            },
             'waldur-mastermind-send-notifications-about-usages': {
                 'task': 'waldur_mastermind.marketplace.send_notifications_about_usages',
                 'schedule': crontab(minute=0, hour=10, day_of_month='25'),
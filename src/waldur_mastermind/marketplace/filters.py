@@ -521,6 +521,7 @@ class RobotAccountFilter(django_filters.FilterSet):
         view_name='marketplace-resource-detail', field_name='resource__uuid'
     )
     resource_uuid = django_filters.UUIDFilter(field_name='resource__uuid')
+    offering_uuid = django_filters.UUIDFilter(field_name='resource__offering__uuid')
     project_uuid = django_filters.UUIDFilter(field_name='resource__project__uuid')
     customer_uuid = django_filters.UUIDFilter(
         field_name='resource__project__customer__uuid'
@@ -716,3 +716,56 @@ def update_offering_user_username_after_offering_settings_change(
 
         utils.setup_linux_related_data(offering_user, offering)
         offering_user.save(update_fields=['username', 'backend_metadata'])
+
+
+def schedule_service_provider_stats_refresh(customer_ids):
+    def refresh():
+        for service_provider_id in models.ServiceProvider.objects.filter(
+            customer_id__in=customer_ids
+        ).values_list('id', flat=True):
+            tasks.RefreshServiceProviderStats().schedule(service_provider_id)
+
+    transaction.on_commit(refresh)
+
+
+def refresh_service_provider_stats_on_offering_change(sender, instance, **kwargs):
+    schedule_service_provider_stats_refresh([instance.customer_id])
+
+
+def refresh_service_provider_stats_on_resource_change(sender, instance, **kwargs):
+    # Both resource and order item refer to offering.
+    if instance.offering_id:
+        schedule_service_provider_stats_refresh(
+            models.Offering.objects.filter(id=instance.offering_id).values_list(
+                'customer_id', flat=True
+            )
+        )
+
+
+def refresh_service_provider_stats_on_order_change(
+    sender, instance, created=False, **kwargs
+):
+    if created or not instance.tracker.has_changed('state'):
+        return
+    schedule_service_provider_stats_refresh(
+        models.OrderItem.objects.filter(order=instance).values_list(
+            'offering__customer_id', flat=True
+        )
+    )
+
+
+def refresh_service_provider_stats_on_campaign_change(sender, instance, **kwargs):
+    schedule_service_provider_stats_refresh(
+        models.ServiceProvider.objects.filter(
+            id=instance.service_provider_id
+        ).values_list('customer_id', flat=True)
+    )
+
+
+def refresh_service_provider_stats_on_invoice_item_change(sender, instance, **kwargs):
+    if instance.resource_id:
+        schedule_service_provider_stats_refresh(
+            models.Resource.objects.filter(id=instance.resource_id).values_list(
+                'offering__customer_id', flat=True
+            )
+        )
@@ -217,7 +217,9 @@ class PlanManager(MixinManager):
 
 def get_connected_offerings(user, role=None):
     content_type = ContentType.objects.get_for_model(models.Offering)
-    return get_scope_ids(user, content_type, role)
+    return models.Offering.objects.filter(
+        id__in=get_scope_ids(user, content_type, role)
+    ).values_list('id', flat=True)
 
 
 def filter_offering_permissions(user, is_active=True):
@@ -0,0 +1,59 @@
+# Generated by Django 3.2.20 on 2026-10-18 05:33
+
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('marketplace', '0104_translations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceProviderStats',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'created',
+                    model_utils.fields.AutoCreatedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name='created',
+                    ),
+                ),
+                (
+                    'modified',
+                    model_utils.fields.AutoLastModifiedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name='modified',
+                    ),
+                ),
+                ('stat', models.JSONField(default=dict)),
+                ('revenue', models.JSONField(default=list)),
+                (
+                    'service_provider',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='stats',
+                        to='marketplace.serviceprovider',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Service provider statistics',
+                'verbose_name_plural': 'Service provider statistics',
+            },
+        ),
+    ]
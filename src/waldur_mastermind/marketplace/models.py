@@ -98,6 +98,27 @@ class ServiceProvider(
         super().save(*args, **kwargs)
 
 
+class ServiceProviderStats(TimeStampedModel):
+    """
+    Snapshot of service provider dashboard statistics.
+    It is refreshed in background when related objects are changed and periodically,
+    so that dashboard is rendered without aggregating the whole marketplace.
+    """
+
+    service_provider = models.OneToOneField(
+        ServiceProvider, on_delete=models.CASCADE, related_name='stats'
+    )
+    stat = models.JSONField(default=dict)
+    revenue = models.JSONField(default=list)
+
+    class Meta:
+        verbose_name = _('Service provider statistics')
+        verbose_name_plural = _('Service provider statistics')
+
+    def __str__(self):
+        return str(self.service_provider)
+
+
 class CategoryGroup(
     core_models.UuidMixin,
     TimeStampedModel,
@@ -10,12 +10,14 @@ from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import Q, Sum
 from django.utils import timezone
 from rest_framework import status
 
 from waldur_core.core import models as core_models
+from waldur_core.core import tasks as core_tasks
 from waldur_core.core import utils as core_utils
 from waldur_core.logging import models as logging_models
 from waldur_core.permissions.enums import PermissionEnum, RoleEnum
@@ -560,3 +562,65 @@ def send_metrics():
         )
 
     return response
+
+
+class RefreshServiceProviderStats(core_tasks.BackgroundTask):
+    """
+    Recompute dashboard statistics of service provider.
+    Task is scheduled with delay and is not scheduled again until it is completed,
+    so that burst of changes results in single refresh.
+    If changes have been made while task was running, it is scheduled again when completed.
+    """
+
+    name = 'waldur_mastermind.marketplace.refresh_service_provider_stats'
+    # Delay in seconds before statistics are recomputed,
+    # so that changes made in short period of time are aggregated only once.
+    refresh_delay = 60
+    dirty_timeout = 60 * 60
+
+    def get_lock_key(self, service_provider_id):
+        return f'{self.name}:{service_provider_id}'
+
+    def get_dirty_key(self, service_provider_id):
+        return f'{self.name}:{service_provider_id}:dirty'
+
+    def schedule(self, service_provider_id):
+        cache.set(self.get_dirty_key(service_provider_id), True, self.dirty_timeout)
+        return self.apply_async(
+            args=(service_provider_id,), countdown=self.refresh_delay
+        )
+
+    def run(self, service_provider_id):
+        # Changes made after this point are not guaranteed to be included
+        # into statistics, therefore they mark it as dirty again.
+        cache.delete(self.get_dirty_key(service_provider_id))
+        try:
+            service_provider = models.ServiceProvider.objects.get(
+                id=service_provider_id
+            )
+        except models.ServiceProvider.DoesNotExist:
+            return
+        utils.refresh_service_provider_stats(service_provider)
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        result = super().after_return(status, retval, task_id, args, kwargs, einfo)
+        service_provider_id = args[0] if args else kwargs['service_provider_id']
+        if cache.get(self.get_dirty_key(service_provider_id)):
+            self.schedule(service_provider_id)
+        return result
+
+
+class RefreshAllServiceProviderStats(core_tasks.BackgroundTask):
+    name = 'waldur_mastermind.marketplace.refresh_all_service_provider_stats'
+
+    def run(self):
+        for service_provider in models.ServiceProvider.objects.select_related(
+            'customer'
+        ).iterator():
+            try:
+                utils.refresh_service_provider_stats(service_provider)
+            except Exception:
+                logger.exception(
+                    'Unable to refresh statistics of service provider %s.',
+                    service_provider,
+                )
@@ -1,4 +1,5 @@
 from ddt import data, ddt
+from django.test import override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 from rest_framework import test
@@ -13,6 +14,7 @@ from . import fixtures
 
 
 @freeze_time('2020-11-01')
+@override_settings(task_always_eager=True)
 class InvoiceTest(test.APITransactionTestCase):
     def setUp(self):
         self.fixture = fixtures.MarketplaceFixture()
@@ -65,6 +67,7 @@ class InvoiceTest(test.APITransactionTestCase):
 
 
 @freeze_time('2020-11-01')
+@override_settings(task_always_eager=True)
 class TotalLimitTest(test.APITransactionTestCase):
     def setUp(self):
         self.fixture = fixtures.MarketplaceFixture()
@@ -2,7 +2,7 @@ from ddt import data, ddt
 from freezegun import freeze_time
 from rest_framework import status, test
 
-from waldur_core.permissions.enums import PermissionEnum
+from waldur_core.permissions.enums import PermissionEnum, RoleEnum
 from waldur_core.permissions.fixtures import CustomerRole, OfferingRole
 from waldur_core.structure.tests import fixtures
 from waldur_core.structure.tests.factories import UserFactory
@@ -218,3 +218,25 @@ class OfferingUpdateTest(BaseOfferingPermissionTest):
         self.client.force_authenticate(self.fixture.user)
         response = self.client.patch(self.url, {'name': 'new_offering'})
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ServiceManagerRoleRevocationTest(BaseOfferingPermissionTest):
+    def setUp(self):
+        super().setUp()
+        self.user = self.fixture.user
+        self.other_offering = factories.OfferingFactory(customer=self.fixture.customer)
+        self.offering.add_user(self.user, OfferingRole.MANAGER)
+        self.other_offering.add_user(self.user, OfferingRole.MANAGER)
+
+    def test_customer_manager_role_is_kept_while_user_manages_other_offering(self):
+        self.offering.remove_user(self.user, OfferingRole.MANAGER)
+        self.assertTrue(
+            self.fixture.customer.has_user(self.user, RoleEnum.CUSTOMER_MANAGER)
+        )
+
+    def test_customer_manager_role_is_revoked_with_last_offering_role(self):
+        self.offering.remove_user(self.user, OfferingRole.MANAGER)
+        self.other_offering.remove_user(self.user, OfferingRole.MANAGER)
+        self.assertFalse(
+            self.fixture.customer.has_user(self.user, RoleEnum.CUSTOMER_MANAGER)
+        )
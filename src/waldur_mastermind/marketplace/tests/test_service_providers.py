@@ -1,4 +1,5 @@
 import re
+from unittest import mock
 
 from ddt import data, ddt
 from django.core import mail
@@ -550,3 +551,65 @@ class ServiceProviderUserCustomersTest(test.APITransactionTestCase):
         self.client.force_authenticate(self.fixture.staff)
         response = self.client.get(self.url, {'user_uuid': self.fixture.user.uuid.hex})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ServiceProviderStatsTest(test.APITransactionTestCase):
+    def setUp(self):
+        self.fixture = structure_fixtures.CustomerFixture()
+        self.service_provider = factories.ServiceProviderFactory(
+            customer=self.fixture.customer
+        )
+        self.offering = factories.OfferingFactory(customer=self.fixture.customer)
+        self.url = factories.ServiceProviderFactory.get_url(
+            self.service_provider, 'stat'
+        )
+
+    def test_stat_is_served_from_snapshot(self):
+        factories.ResourceFactory(
+            offering=self.offering, state=models.Resource.States.ERRED
+        )
+        self.client.force_authenticate(self.fixture.staff)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['active_resources'], 1)
+        self.assertEqual(response.data['erred_resources'], 1)
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertTrue(response.has_header('Age'))
+
+        factories.ResourceFactory(offering=self.offering)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['active_resources'], 1)
+
+        tasks.RefreshServiceProviderStats().run(self.service_provider.id)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['active_resources'], 2)
+
+    @mock.patch.object(tasks.RefreshServiceProviderStats, 'apply_async')
+    def test_refresh_is_rescheduled_if_changes_arrive_while_it_is_running(
+        self, apply_async
+    ):
+        task = tasks.RefreshServiceProviderStats()
+        args = (self.service_provider.id,)
+
+        task.schedule(self.service_provider.id)
+        task.run(self.service_provider.id)
+        task.after_return('SUCCESS', None, 'task_id', args, {}, None)
+        self.assertEqual(apply_async.call_count, 1)
+
+        task.run(self.service_provider.id)
+        task.schedule(self.service_provider.id)
+        task.after_return('SUCCESS', None, 'task_id', args, {}, None)
+        self.assertEqual(apply_async.call_count, 3)
+
+    def test_revenue_is_served_from_snapshot(self):
+        url = factories.ServiceProviderFactory.get_url(self.service_provider, 'revenue')
+        self.client.force_authenticate(self.fixture.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+        self.assertTrue(
+            models.ServiceProviderStats.objects.filter(
+                service_provider=self.service_provider
+            ).exists()
+        )
@@ -1,5 +1,6 @@
 from ddt import data, ddt
 from django.contrib.contenttypes.models import ContentType
+from django.test import override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 from rest_framework import status, test
@@ -161,6 +162,7 @@ class StatsTest(StatsBaseTest):
 
 
 @freeze_time('2020-01-01')
+@override_settings(task_always_eager=True)
 class CostsStatsTest(StatsBaseTest):
     def setUp(self):
         super().setUp()
@@ -227,6 +229,7 @@ class CostsStatsTest(StatsBaseTest):
 
 
 @freeze_time('2020-03-01')
+@override_settings(task_always_eager=True)
 class ComponentStatsTest(StatsBaseTest):
     def setUp(self):
         super().setUp()
@@ -521,6 +524,35 @@ class LimitsStatsTest(test.APITransactionTestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class ProjectsLimitsStatsTest(test.APITransactionTestCase):
+    def setUp(self):
+        self.fixture = fixtures.MarketplaceFixture()
+        industry_project = structure_factories.ProjectFactory(is_industry=True)
+        factories.ResourceFactory(
+            limits={'cpu': 5, 'ram': 0},
+            state=models.Resource.States.OK,
+            project=industry_project,
+        )
+        factories.ResourceFactory(
+            limits={'cpu': 2},
+            state=models.Resource.States.OK,
+            project=industry_project,
+        )
+        factories.ResourceFactory(
+            limits={'cpu': 10},
+            state=models.Resource.States.TERMINATED,
+            project=industry_project,
+        )
+        self.url = '/api/marketplace-stats/projects_limits_grouped_by_industry_flag/'
+
+    def test_limits_are_summed_per_group(self):
+        self.client.force_authenticate(self.fixture.staff)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['True'], {'cpu': 7})
+        self.assertIn('False', response.data)
+
+
 @ddt
 class CountUsersOfServiceProviderTest(test.APITransactionTestCase):
     def setUp(self):
@@ -11,6 +11,7 @@ from enum import Enum
 from io import BytesIO
 from typing import Union
 
+from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
@@ -1358,3 +1359,113 @@ def user_offerings_mapping(offerings):
             offering_user.set_propagation_date()
             offering_user.save()
             logger.info('Offering user %s has been created.')
+
+
+def count_unresolved_tickets(resource_ids):
+    from waldur_mastermind.support import models as support_models
+
+    issues = support_models.Issue.objects.filter(
+        resource_content_type=ContentType.objects.get_for_model(support_models.Issue),
+        resource_object_id__in=resource_ids,
+    )
+    statuses = support_models.IssueStatus.objects.all()
+    if not (
+        statuses.filter(type=support_models.IssueStatus.Types.RESOLVED).exists()
+        and statuses.filter(type=support_models.IssueStatus.Types.CANCELED).exists()
+    ):
+        # Issue is not considered resolved unless statuses are configured.
+        return issues.count()
+    resolved_statuses = statuses.filter(
+        type=support_models.IssueStatus.Types.RESOLVED
+    ).values_list('name', flat=True)
+    return issues.exclude(status__in=resolved_statuses).count()
+
+
+def get_service_provider_stat(service_provider):
+    from waldur_mastermind.promotions import models as promotions_models
+
+    to_day = timezone.datetime.today().date()
+    customer = service_provider.customer
+
+    active_campaigns = promotions_models.Campaign.objects.filter(
+        service_provider=service_provider,
+        state=promotions_models.Campaign.States.ACTIVE,
+        start_date__lte=to_day,
+        end_date__gte=to_day,
+    ).count()
+
+    active_resources = models.Resource.objects.filter(
+        offering__customer=customer,
+    ).exclude(state=models.Resource.States.TERMINATED)
+
+    current_customers = (
+        active_resources.order_by()
+        .values_list('project__customer', flat=True)
+        .distinct()
+        .count()
+    )
+
+    active_and_paused_offerings = models.Offering.objects.filter(
+        customer=customer,
+        billable=True,
+        shared=True,
+        state__in=(models.Offering.States.ACTIVE, models.Offering.States.PAUSED),
+    ).count()
+
+    pended_orders = (
+        models.OrderItem.objects.filter(
+            offering__customer=customer,
+            order__state=models.Order.States.REQUESTED_FOR_APPROVAL,
+        )
+        .order_by()
+        .values_list('order', flat=True)
+        .distinct()
+        .count()
+    )
+
+    erred_resources = models.Resource.objects.filter(
+        offering__customer=customer,
+        state=models.Resource.States.ERRED,
+    ).count()
+
+    return {
+        'active_campaigns': active_campaigns,
+        'current_customers': current_customers,
+        'customers_number_change': count_customers_number_change(service_provider),
+        'active_resources': active_resources.count(),
+        'resources_number_change': count_resources_number_change(service_provider),
+        'active_and_paused_offerings': active_and_paused_offerings,
+        'unresolved_tickets': count_unresolved_tickets(
+            active_resources.values_list('id', flat=True)
+        ),
+        'pended_orders': pended_orders,
+        'erred_resources': erred_resources,
+    }
+
+
+def get_service_provider_revenue(service_provider):
+    from waldur_mastermind.invoices import models as invoice_models
+    from waldur_mastermind.marketplace.serializers import ServiceProviderRevenues
+
+    start = core_utils.month_start(timezone.datetime.today()) - relativedelta(years=1)
+    data = (
+        invoice_models.InvoiceItem.objects.filter(
+            invoice__created__gte=start,
+            resource__offering__customer=service_provider.customer,
+        )
+        .values('invoice__year', 'invoice__month')
+        .annotate(total=Sum(F('unit_price') * F('quantity')))
+        .order_by('invoice__year', 'invoice__month')
+    )
+    return ServiceProviderRevenues(data, many=True).data
+
+
+def refresh_service_provider_stats(service_provider):
+    stats, _ = models.ServiceProviderStats.objects.update_or_create(
+        service_provider=service_provider,
+        defaults={
+            'stat': get_service_provider_stat(service_provider),
+            'revenue': get_service_provider_revenue(service_provider),
+        },
+    )
+    return stats
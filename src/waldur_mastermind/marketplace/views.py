@@ -2,9 +2,9 @@ import copy
 import datetime
 import logging
 import textwrap
+from uuid import UUID
 
 import reversion
-from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
@@ -27,6 +27,7 @@ from django.http.response import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.cache import cache_page
 from django.views.decorators.csrf import csrf_exempt
@@ -86,8 +87,6 @@ from waldur_mastermind.marketplace.utils import validate_attributes
 from waldur_mastermind.marketplace_slurm_remote import (
     PLUGIN_NAME as SLURM_REMOTE_PLUGIN_NAME,
 )
-from waldur_mastermind.promotions import models as promotions_models
-from waldur_mastermind.support import models as support_models
 from waldur_pid import models as pid_models
 
 from . import filters, log, models, permissions, plugins, serializers, tasks, utils
@@ -274,15 +273,15 @@ class ServiceProviderViewSet(PublicViewsetMixin, BaseMarketplaceView):
         resource_customers = resources.values_list('project__customer_id', flat=True)
         connected_customers = get_connected_customers(user)
 
-        valid_projects = resource_projects.intersection(connected_projects)
-        valid_customers = resource_customers.intersection(connected_customers)
+        valid_projects = connected_projects.filter(id__in=resource_projects)
+        valid_customers = connected_customers.filter(id__in=resource_customers)
 
         project_customers = structure_models.Project.objects.filter(
             id__in=valid_projects
         ).values_list('customer_id', flat=True)
 
         customers = structure_models.Customer.objects.filter(
-            id__in=project_customers.union(valid_customers)
+            Q(id__in=project_customers) | Q(id__in=valid_customers)
         )
         page = self.paginate_queryset(customers)
         context = self.get_serializer_context()
@@ -354,109 +353,27 @@ class ServiceProviderViewSet(PublicViewsetMixin, BaseMarketplaceView):
         )
         return self.get_paginated_response(serializer.data)
 
-    @action(detail=True, methods=['GET'])
-    def stat(self, request, uuid=None):
-        to_day = timezone.datetime.today().date()
+    def get_stats_response(self, field):
         service_provider = self.get_object()
+        try:
+            stats = service_provider.stats
+        except models.ServiceProviderStats.DoesNotExist:
+            stats = utils.refresh_service_provider_stats(service_provider)
 
-        active_campaigns = promotions_models.Campaign.objects.filter(
-            service_provider=service_provider,
-            state=promotions_models.Campaign.States.ACTIVE,
-            start_date__lte=to_day,
-            end_date__gte=to_day,
-        ).count()
-
-        current_customers = (
-            models.Resource.objects.filter(
-                offering__customer=service_provider.customer,
-            )
-            .exclude(state=models.Resource.States.TERMINATED)
-            .order_by()
-            .values_list('project__customer', flat=True)
-            .distinct()
-            .count()
-        )
-
-        active_resources = models.Resource.objects.filter(
-            offering__customer=service_provider.customer,
-        ).exclude(state=models.Resource.States.TERMINATED)
-
-        active_and_paused_offerings = models.Offering.objects.filter(
-            customer=service_provider.customer,
-            billable=True,
-            shared=True,
-            state__in=(models.Offering.States.ACTIVE, models.Offering.States.PAUSED),
-        ).count()
-
-        content_type = ContentType.objects.get_for_model(support_models.Issue)
-        unresolved_tickets = len(
-            [
-                i
-                for i in support_models.Issue.objects.filter(
-                    resource_content_type=content_type,
-                    resource_object_id__in=(
-                        active_resources.values_list('id', flat=True)
-                    ),
-                )
-                if not i.resolved
-            ]
+        response = Response(getattr(stats, field), status=status.HTTP_200_OK)
+        response['Last-Modified'] = http_date(stats.modified.timestamp())
+        response['Age'] = str(
+            max(0, int((timezone.now() - stats.modified).total_seconds()))
         )
+        return response
 
-        pended_orders = (
-            models.OrderItem.objects.filter(
-                offering__customer=service_provider.customer,
-                order__state=models.Order.States.REQUESTED_FOR_APPROVAL,
-            )
-            .order_by()
-            .values_list('order', flat=True)
-            .distinct()
-            .count()
-        )
-
-        erred_resources = models.Resource.objects.filter(
-            offering__customer=service_provider.customer,
-            state=models.Resource.States.ERRED,
-        ).count()
-
-        return Response(
-            {
-                'active_campaigns': active_campaigns,
-                'current_customers': current_customers,
-                'customers_number_change': utils.count_customers_number_change(
-                    service_provider
-                ),
-                'active_resources': active_resources.count(),
-                'resources_number_change': utils.count_resources_number_change(
-                    service_provider
-                ),
-                'active_and_paused_offerings': active_and_paused_offerings,
-                'unresolved_tickets': unresolved_tickets,
-                'pended_orders': pended_orders,
-                'erred_resources': erred_resources,
-            },
-            status=status.HTTP_200_OK,
-        )
+    @action(detail=True, methods=['GET'])
+    def stat(self, request, uuid=None):
+        return self.get_stats_response('stat')
 
     @action(detail=True, methods=['GET'])
     def revenue(self, request, uuid=None):
-        start = month_start(timezone.datetime.today()) - relativedelta(years=1)
-        service_provider = self.get_object()
-        customer = service_provider.customer
-
-        data = (
-            invoice_models.InvoiceItem.objects.filter(
-                invoice__created__gte=start,
-                resource__offering__customer=customer,
-            )
-            .values('invoice__year', 'invoice__month')
-            .annotate(total=Sum(F('unit_price') * F('quantity')))
-            .order_by('invoice__year', 'invoice__month')
-        )
-
-        return Response(
-            serializers.ServiceProviderRevenues(data, many=True).data,
-            status=status.HTTP_200_OK,
-        )
+        return self.get_stats_response('revenue')
 
     @action(detail=True, methods=['GET'])
     def robot_account_customers(self, request, uuid=None):
@@ -2667,7 +2584,9 @@ class OfferingUsersViewSet(
         nested_customers = structure_models.Project.objects.filter(
             id__in=managed_projects
         ).values_list('customer_id', flat=True)
-        visible_customers = managed_customers.union(nested_customers)
+        visible_customers = structure_models.Customer.objects.filter(
+            Q(id__in=managed_customers) | Q(id__in=nested_customers)
+        ).values_list('id', flat=True)
         visible_divisions = structure_models.Customer.objects.filter(
             id__in=visible_customers
         ).values_list('division_id', flat=True)
@@ -2791,41 +2710,39 @@ class StatsViewSet(rf_viewsets.ViewSet):
 
         return Response(customers)
 
+    @staticmethod
+    def _sum_limits(rows):
+        """
+        Accumulate positive limits of resources.
+        Rows are pairs of group key and limits of resource.
+        Returns dictionary where key is group key and value is
+        dictionary mapping limit name to total value.
+        """
+        totals = {}
+        for key, limits in rows:
+            group = totals.setdefault(key, {})
+            for name, value in limits.items():
+                if value > 0:
+                    group[name] = group.get(name, 0) + value
+        return totals
+
     @action(detail=False, methods=['get'])
     def resources_limits(self, request, *args, **kwargs):
-        data = []
-
-        for resource in (
+        totals = self._sum_limits(
             models.Resource.objects.filter(state=models.Resource.States.OK)
             .exclude(limits={})
-            .values('offering__uuid', 'limits')
-        ):
-            limits = resource['limits']
-
-            for name, value in limits.items():
-                if value > 0:
-                    try:
-                        prev = next(
-                            filter(
-                                lambda x: x['offering_uuid']
-                                == resource['offering__uuid']
-                                and x['name'] == name,
-                                data,
-                            )
-                        )
-                    except StopIteration:
-                        prev = None
-
-                    if not prev:
-                        data.append(
-                            {
-                                'offering_uuid': resource['offering__uuid'],
-                                'name': name,
-                                'value': value,
-                            }
-                        )
-                    else:
-                        prev['value'] += value
+            .values_list('offering__uuid', 'limits')
+            .iterator()
+        )
+        data = [
+            {
+                'offering_uuid': offering_uuid,
+                'name': name,
+                'value': value,
+            }
+            for offering_uuid, limits in totals.items()
+            for name, value in limits.items()
+        ]
 
         return Response(
             self._expand_result_with_information_of_divisions(data),
@@ -2890,10 +2807,20 @@ class StatsViewSet(rf_viewsets.ViewSet):
 
     @staticmethod
     def _expand_result_with_information_of_divisions(result):
+        offerings = {
+            offering.uuid.hex: offering
+            for offering in models.Offering.objects.filter(
+                uuid__in={record['offering_uuid'] for record in result}
+            )
+            .select_related('customer')
+            .prefetch_related('divisions')
+        }
         data_with_divisions = []
 
         for record in result:
-            offering = models.Offering.objects.get(uuid=record['offering_uuid'])
+            offering = offerings.get(UUID(str(record['offering_uuid'])).hex)
+            if not offering:
+                continue
             record['offering_country'] = offering.country or offering.customer.country
             divisions = offering.divisions.all()
 
@@ -2975,34 +2902,32 @@ class StatsViewSet(rf_viewsets.ViewSet):
             self._expand_result_with_oecd_name(result), status=status.HTTP_200_OK
         )
 
-    def _projects_usages_grouped_by_field(self, field_name):
-        results = {}
-
-        for project in structure_models.Project.objects.all():
-            field_value = str(getattr(project, field_name))
-            if field_value in results:
-                results[field_value]['projects_ids'].append(project.id)
-            else:
-                results[field_value] = {
-                    'projects_ids': [project.id],
-                }
+    @staticmethod
+    def _get_projects_groups(field_name):
+        return {
+            str(value): {}
+            for value in structure_models.Project.objects.order_by()
+            .values_list(field_name, flat=True)
+            .distinct()
+        }
 
+    def _projects_usages_grouped_by_field(self, field_name):
+        results = self._get_projects_groups(field_name)
         now = timezone.now()
-
-        for key, result in results.items():
-            ids = result.pop('projects_ids')
-            usages = (
-                models.ComponentUsage.objects.filter(
-                    billing_period__year=now.year,
-                    billing_period__month=now.month,
-                    resource__project__id__in=ids,
-                )
-                .values('component__type')
-                .annotate(usage=Sum('usage'))
+        usages = (
+            models.ComponentUsage.objects.filter(
+                billing_period__year=now.year,
+                billing_period__month=now.month,
+                resource__project__isnull=False,
             )
+            .values(f'resource__project__{field_name}', 'component__type')
+            .annotate(usage=Sum('usage'))
+            .order_by()
+        )
 
-            for usage in usages:
-                result[usage['component__type']] = usage['usage']
+        for usage in usages:
+            key = str(usage[f'resource__project__{field_name}'])
+            results.setdefault(key, {})[usage['component__type']] = usage['usage']
 
         return results
 
@@ -3023,35 +2948,18 @@ class StatsViewSet(rf_viewsets.ViewSet):
         )
 
     def _projects_limits_grouped_by_field(self, field_name):
-        results = {}
-
-        for project in structure_models.Project.objects.all():
-            field_value = str(getattr(project, field_name))
-            if field_value in results:
-                results[field_value]['projects_ids'].append(project.id)
-            else:
-                results[field_value] = {
-                    'projects_ids': [project.id],
-                }
-
-        for key, result in results.items():
-            ids = result.pop('projects_ids')
-
-            for resource in (
-                models.Resource.objects.filter(
-                    state=models.Resource.States.OK, project__id__in=ids
-                )
-                .exclude(limits={})
-                .values('offering__uuid', 'limits')
-            ):
-                limits = resource['limits']
-
-                for name, value in limits.items():
-                    if value > 0:
-                        if name in result:
-                            result[name] += value
-                        else:
-                            result[name] = value
+        results = self._get_projects_groups(field_name)
+        totals = self._sum_limits(
+            (str(key), limits)
+            for key, limits in models.Resource.objects.filter(
+                state=models.Resource.States.OK, project__isnull=False
+            )
+            .exclude(limits={})
+            .values_list(f'project__{field_name}', 'limits')
+            .iterator()
+        )
+        for key, limits in totals.items():
+            results.setdefault(key, {}).update(limits)
 
         return results
 
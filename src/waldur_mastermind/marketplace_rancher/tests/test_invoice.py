@@ -2,6 +2,7 @@ import copy
 import datetime
 from unittest import mock
 
+from django.test import override_settings
 from freezegun import freeze_time
 from rest_framework import test
 
@@ -25,6 +26,7 @@ from waldur_rancher.tests.factories import RancherServiceSettingsFactory
 from waldur_rancher.tests.utils import backend_node_response
 
 
+@override_settings(task_always_eager=True)
 class InvoiceTest(test.APITransactionTestCase):
     def setUp(self):
         self.fixture = openstack_tenant_fixtures.OpenStackTenantFixture()
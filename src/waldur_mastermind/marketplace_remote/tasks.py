@@ -1,14 +1,12 @@
-import collections
 import logging
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 import requests
 from celery.app import shared_task
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
 from django.utils import dateparse, timezone
-from rest_framework import exceptions as rf_exceptions
 from waldur_client import WaldurClient, WaldurClientException
 
 from waldur_core.core.mixins import ReviewStateMixin
@@ -324,6 +322,9 @@ class ResourcePullTask(BackgroundPullTask):
     def pull(self, local_resource):
         client = get_client_for_offering(local_resource.offering)
         remote_resource = client.get_marketplace_resource(local_resource.backend_id)
+        self.sync_resource(client, local_resource, remote_resource)
+
+    def sync_resource(self, client, local_resource, remote_resource):
         pull_fields(
             RESOURCE_FIELDS,
             local_resource,
@@ -333,27 +334,118 @@ class ResourcePullTask(BackgroundPullTask):
             local_resource.effective_id = remote_resource['backend_id']
             local_resource.save(update_fields=['effective_id'])
         # When pulling resource, if remote state is different from local, import remote order items.
-        utils.import_resource_order_items(local_resource)
-        if utils.parse_resource_state(remote_resource['state']) != local_resource.state:
-            utils.pull_resource_state(local_resource)
+        utils.import_resource_order_items(local_resource, client)
+        remote_state = utils.parse_resource_state(remote_resource['state'])
+        if remote_state != local_resource.state:
+            local_resource.state = remote_state
+            local_resource.save(update_fields=['state'])
+
+
+class OfferingBatchPullTask(BackgroundPullTask):
+    """
+    Pull data of all resources of remote offering using paginated list endpoints
+    filtered by offering instead of scheduling separate task for each resource.
+    If remote data can not be listed for offering, it falls back to pull task
+    of each resource.
+    """
+
+    resource_pull_task = NotImplemented
+
+    def get_resources(self, local_offering):
+        return models.Resource.objects.filter(offering=local_offering).exclude(
+            backend_id=''
+        )
+
+    def pull(self, local_offering):
+        resources = list(self.get_resources(local_offering))
+        if not resources:
+            return
+        client = get_client_for_offering(local_offering)
+        try:
+            remote_objects = self.list_remote_objects(client, local_offering)
+        except WaldurClientException as e:
+            logger.warning(
+                'Unable to pull %s for resources of offering %s in batch, '
+                'falling back to per-resource pull. Error: %s',
+                self.name,
+                local_offering,
+                e,
+            )
+            for resource in resources:
+                self.resource_pull_task().delay(serialize_instance(resource))
+            return
+
+        for resource in resources:
+            try:
+                self.sync_resource(client, resource, remote_objects)
+            except Exception:
+                logger.exception(
+                    'Unable to synchronize resource %s of offering %s.',
+                    resource,
+                    local_offering,
+                )
+
+    def on_pull_fail(self, local_offering, error):
+        # Task is scheduled for offering, so state of resources is not changed here.
+        logger.warning(
+            'Unable to pull %s for resources of offering %s. Error: %s',
+            self.name,
+            local_offering,
+            error,
+        )
+
+    def on_pull_success(self, local_offering):
+        pass
+
+    def list_remote_objects(self, client, local_offering):
+        raise NotImplementedError
+
+    def sync_resource(self, client, local_resource, remote_objects):
+        raise NotImplementedError
+
+
+class OfferingResourcesPullTask(OfferingBatchPullTask):
+    resource_pull_task = ResourcePullTask
+
+    def list_remote_objects(self, client, local_offering):
+        return {
+            utils.normalize_uuid(remote_resource['uuid']): remote_resource
+            for remote_resource in client.list_marketplace_resources(
+                offering_uuid=local_offering.backend_id
+            )
+        }
+
+    def sync_resource(self, client, local_resource, remote_resources):
+        remote_resource = remote_resources.get(
+            utils.normalize_uuid(local_resource.backend_id)
+        )
+        if remote_resource is None:
+            # Resource is not listed for offering, so it is pulled separately.
+            ResourcePullTask().delay(serialize_instance(local_resource))
+            return
+        ResourcePullTask().sync_resource(client, local_resource, remote_resource)
+
+
+def get_remote_offerings_with_resources(resources):
+    return models.Offering.objects.filter(
+        type=PLUGIN_NAME,
+        id__in=resources.values('offering_id'),
+    )
 
 
 class ResourceListPullTask(BackgroundListPullTask):
     name = 'waldur_mastermind.marketplace_remote.pull_resources'
-    pull_task = ResourcePullTask
+    pull_task = OfferingResourcesPullTask
 
     def get_pulled_objects(self):
-        return models.Resource.objects.filter(offering__type=PLUGIN_NAME).exclude(
-            backend_id=''
+        return get_remote_offerings_with_resources(
+            models.Resource.objects.exclude(backend_id='')
         )
 
 
 @shared_task
 def pull_offering_resources(serialized_offering):
-    offering = deserialize_instance(serialized_offering)
-    resources = models.Resource.objects.filter(offering=offering)
-    for resource in resources:
-        ResourcePullTask().delay(serialize_instance(resource))
+    OfferingResourcesPullTask().delay(serialized_offering)
 
 
 class OrderItemPullTask(BackgroundPullTask):
@@ -410,55 +502,100 @@ def pull_offering_order_items(serialized_offering):
         OrderItemPullTask().delay(serialize_instance(order_item))
 
 
+def get_usage_pull_start_date():
+    today = datetime.today()
+    four_months_ago = month_start(today - relativedelta(months=4))
+    return four_months_ago.strftime('%Y-%m-%d')
+
+
 class UsagePullTask(BackgroundPullTask):
     def pull(self, local_resource: models.Resource):
         client = get_client_for_offering(local_resource.offering)
-
-        today = datetime.today()
-        four_months_ago = month_start(today - relativedelta(months=4))
-        four_months_ago_str = four_months_ago.strftime('%Y-%m-%d')
-
         remote_usages = client.list_component_usages(
             local_resource.backend_id,
-            date_after=four_months_ago_str,
+            date_after=get_usage_pull_start_date(),
         )
+        self.sync_usages(local_resource, remote_usages)
 
-        for remote_usage in remote_usages:
-            try:
-                offering_component = models.OfferingComponent.objects.get(
-                    offering=local_resource.offering, type=remote_usage['type']
-                )
-            except ObjectDoesNotExist:
-                continue
-            defaults = {
-                'usage': remote_usage['usage'],
+    def sync_usages(self, local_resource: models.Resource, remote_usages):
+        components = {
+            component.type: component
+            for component in models.OfferingComponent.objects.filter(
+                offering=local_resource.offering
+            )
+        }
+        remote_usages = {
+            utils.normalize_uuid(remote_usage['uuid']): remote_usage
+            for remote_usage in remote_usages
+            if remote_usage['type'] in components
+        }
+        local_usages = {
+            utils.normalize_uuid(usage.backend_id): usage
+            for usage in models.ComponentUsage.objects.filter(
+                resource=local_resource,
+                backend_id__in=[
+                    remote_usage['uuid'] for remote_usage in remote_usages.values()
+                ],
+            )
+        }
+
+        def get_values(remote_usage):
+            return {
+                'component': components[remote_usage['type']],
+                'usage': Decimal(str(remote_usage['usage'])),
                 'description': remote_usage['description'],
-                'created': remote_usage['created'],
-                'date': remote_usage['date'],
-                'billing_period': remote_usage['billing_period'],
+                'created': dateparse.parse_datetime(remote_usage['created']),
+                'date': dateparse.parse_datetime(remote_usage['date']),
+                'billing_period': dateparse.parse_date(remote_usage['billing_period']),
             }
-            models.ComponentUsage.objects.update_or_create(
+
+        return utils.sync_remote_objects(
+            models.ComponentUsage,
+            local_usages,
+            remote_usages,
+            build=lambda remote_usage: models.ComponentUsage(
                 resource=local_resource,
                 backend_id=remote_usage['uuid'],
-                component=offering_component,
-                defaults=defaults,
+                **get_values(remote_usage),
+            ),
+            update=lambda local_usage, remote_usage: utils.pull_values(
+                local_usage, get_values(remote_usage)
+            ),
+        )
+
+
+class OfferingUsagePullTask(OfferingBatchPullTask):
+    resource_pull_task = UsagePullTask
+
+    def list_remote_objects(self, client, local_offering):
+        return utils.group_by_resource(
+            utils.list_offering_component_usages(
+                client,
+                local_offering.backend_id,
+                date_after=get_usage_pull_start_date(),
             )
+        )
+
+    def sync_resource(self, client, local_resource, remote_usages):
+        UsagePullTask().sync_usages(
+            local_resource,
+            remote_usages.get(utils.normalize_uuid(local_resource.backend_id), []),
+        )
 
 
 class UsageListPullTask(BackgroundListPullTask):
     name = 'waldur_mastermind.marketplace_remote.pull_usage'
-    pull_task = UsagePullTask
+    pull_task = OfferingUsagePullTask
 
     def get_pulled_objects(self):
-        return models.Resource.objects.filter(offering__type=PLUGIN_NAME)
+        return get_remote_offerings_with_resources(
+            models.Resource.objects.exclude(backend_id='')
+        )
 
 
 @shared_task
 def pull_offering_usage(serialized_offering):
-    offering = deserialize_instance(serialized_offering)
-    resources = models.Resource.objects.filter(offering=offering)
-    for resource in resources:
-        UsagePullTask().delay(serialize_instance(resource))
+    OfferingUsagePullTask().delay(serialized_offering)
 
 
 class ResourceInvoicePullTask(BackgroundPullTask):
@@ -468,7 +605,6 @@ class ResourceInvoicePullTask(BackgroundPullTask):
 
     def pull_date(self, date, local_resource):
         client = get_client_for_offering(local_resource.offering)
-        local_customer = local_resource.project.customer
         try:
             remote_invoice_items = client.list_invoice_items(
                 {
@@ -482,82 +618,100 @@ class ResourceInvoicePullTask(BackgroundPullTask):
                 f'Unable to get remote invoice items for resource [id={local_resource.backend_id}]: {e}'
             )
             return
+        self.sync_invoice_items(date, local_resource, remote_invoice_items)
 
+    def sync_invoice_items(self, date, local_resource, remote_invoice_items):
+        local_customer = local_resource.project.customer
         local_invoice, _ = RegistrationManager.get_or_create_invoice(
             local_customer, date
         )
         local_invoice_items = local_invoice.items.filter(resource=local_resource)
         local_invoice_items.filter(backend_uuid=None).delete()
+        project = local_resource.project
+
+        def get_values(item):
+            return {
+                'start': dateparse.parse_datetime(item['start']),
+                'end': dateparse.parse_datetime(item['end']),
+                'measured_unit': item['measured_unit'],
+                'details': item['details'],
+                'quantity': Decimal(str(item['quantity'])),
+                'article_code': item['article_code'],
+                'unit_price': Decimal(str(item['unit_price'])),
+                'unit': item['unit'],
+            }
 
-        local_item_ids = {item.backend_uuid.hex for item in local_invoice_items}
-        remote_item_ids = {item['uuid'] for item in remote_invoice_items}
-
-        new_item_ids = remote_item_ids - local_item_ids
-        stale_item_ids = local_item_ids - remote_item_ids
-        existing_item_ids = local_item_ids & remote_item_ids
-
-        if len(stale_item_ids) > 0:
-            invoice_models.InvoiceItem.objects.filter(name__in=stale_item_ids).delete()
-            logger.info(
-                f'The following invoice items for resource [uuid={local_resource.uuid}] have been deleted: {stale_item_ids}'
-            )
-
-        new_invoice_items = [
-            item for item in remote_invoice_items if item['uuid'] in new_item_ids
-        ]
-        for item in new_invoice_items:
-            invoice_models.InvoiceItem.objects.create(
+        result = utils.sync_remote_objects(
+            invoice_models.InvoiceItem,
+            {item.backend_uuid.hex: item for item in local_invoice_items},
+            {utils.normalize_uuid(item['uuid']): item for item in remote_invoice_items},
+            build=lambda item: invoice_models.InvoiceItem(
                 backend_uuid=item['uuid'],
                 resource=local_resource,
                 invoice=local_invoice,
-                start=dateparse.parse_datetime(item['start']),
-                end=dateparse.parse_datetime(item['end']),
                 name=item['name'],
-                project=local_resource.project,
-                unit=item['unit'],
-                measured_unit=item['measured_unit'],
-                article_code=item['article_code'],
-                unit_price=item['unit_price'],
-                details=item['details'],
-                quantity=item['quantity'],
+                project=project,
+                project_name=project.name,
+                project_uuid=project.uuid.hex,
+                **get_values(item),
+            ),
+            update=lambda local_item, item: utils.pull_values(
+                local_item, get_values(item)
+            ),
+        )
+        if result.deleted:
+            logger.info(
+                '%s invoice items for resource [uuid=%s] have been deleted.',
+                result.deleted,
+                local_resource.uuid,
             )
+        return result
 
-        existing_invoice_items = [
-            item for item in remote_invoice_items if item['uuid'] in existing_item_ids
-        ]
-        for item in existing_invoice_items:
-            local_item = local_invoice_items.get(
-                backend_uuid=item['uuid'],
+
+class OfferingInvoicePullTask(OfferingBatchPullTask):
+    resource_pull_task = ResourceInvoicePullTask
+
+    def get_resources(self, local_offering):
+        return (
+            super()
+            .get_resources(local_offering)
+            .exclude(state=models.Resource.States.TERMINATED)
+        )
+
+    def list_remote_objects(self, client, local_offering):
+        return [
+            (
+                date,
+                utils.group_by_resource(
+                    client.list_invoice_items(
+                        {
+                            'offering_uuid': local_offering.backend_id,
+                            'year': date.year,
+                            'month': date.month,
+                        }
+                    )
+                ),
             )
-            local_item.start = dateparse.parse_datetime(item['start'])
-            local_item.end = dateparse.parse_datetime(item['end'])
-            local_item.measured_unit = item['measured_unit']
-            local_item.details = item['details']
-            local_item.quantity = item['quantity']
-            local_item.article_code = item['article_code']
-            local_item.unit_price = item['unit_price']
-            local_item.unit = item['unit']
-            local_item.save(
-                update_fields=[
-                    'start',
-                    'end',
-                    'measured_unit',
-                    'details',
-                    'quantity',
-                    'article_code',
-                    'unit_price',
-                    'unit',
-                ]
+            for date in (get_previous_month(), timezone.now())
+        ]
+
+    def sync_resource(self, client, local_resource, remote_items_per_date):
+        key = utils.normalize_uuid(local_resource.backend_id)
+        for date, remote_items in remote_items_per_date:
+            ResourceInvoicePullTask().sync_invoice_items(
+                date, local_resource, remote_items.get(key, [])
             )
 
 
 class ResourceInvoiceListPullTask(BackgroundListPullTask):
     name = 'waldur_mastermind.marketplace_remote.pull_invoices'
-    pull_task = ResourceInvoicePullTask
+    pull_task = OfferingInvoicePullTask
 
     def get_pulled_objects(self):
-        return models.Resource.objects.filter(offering__type=PLUGIN_NAME).exclude(
-            state=models.Resource.States.TERMINATED
+        return get_remote_offerings_with_resources(
+            models.Resource.objects.exclude(backend_id='').exclude(
+                state=models.Resource.States.TERMINATED
+            )
         )
 
 
@@ -567,6 +721,9 @@ class ResourceRobotAccountPullTask(BackgroundPullTask):
         remote_accounts = client.list_robot_account(
             {'resource_uuid': local_resource.backend_id}
         )
+        self.sync_robot_accounts(local_resource, remote_accounts)
+
+    def sync_robot_accounts(self, local_resource: models.Resource, remote_accounts):
         local_accounts = models.RobotAccount.objects.filter(resource=local_resource)
 
         local_ids = {item.backend_id for item in local_accounts}
@@ -615,34 +772,48 @@ class ResourceRobotAccountPullTask(BackgroundPullTask):
                 local_account.save(update_fields=modified)
 
 
+class OfferingRobotAccountPullTask(OfferingBatchPullTask):
+    resource_pull_task = ResourceRobotAccountPullTask
+
+    def get_resources(self, local_offering):
+        return (
+            super()
+            .get_resources(local_offering)
+            .exclude(state=models.Resource.States.TERMINATED)
+        )
+
+    def list_remote_objects(self, client, local_offering):
+        return utils.group_by_resource(
+            client.list_robot_account({'offering_uuid': local_offering.backend_id})
+        )
+
+    def sync_resource(self, client, local_resource, remote_accounts):
+        ResourceRobotAccountPullTask().sync_robot_accounts(
+            local_resource,
+            remote_accounts.get(utils.normalize_uuid(local_resource.backend_id), []),
+        )
+
+
 class ResourceRobotAccountListPullTask(BackgroundListPullTask):
     name = 'waldur_mastermind.marketplace_remote.pull_robot_accounts'
-    pull_task = ResourceRobotAccountPullTask
+    pull_task = OfferingRobotAccountPullTask
 
     def get_pulled_objects(self):
-        return models.Resource.objects.filter(offering__type=PLUGIN_NAME).exclude(
-            state=models.Resource.States.TERMINATED
+        return get_remote_offerings_with_resources(
+            models.Resource.objects.exclude(backend_id='').exclude(
+                state=models.Resource.States.TERMINATED
+            )
         )
 
 
 @shared_task
 def pull_offering_robot_accounts(serialized_offering):
-    offering = deserialize_instance(serialized_offering)
-    resources = models.Resource.objects.filter(offering=offering).exclude(
-        state=models.Resource.States.TERMINATED
-    )
-    for resource in resources:
-        ResourceRobotAccountPullTask().delay(serialize_instance(resource))
+    OfferingRobotAccountPullTask().delay(serialized_offering)
 
 
 @shared_task
 def pull_offering_invoices(serialized_offering):
-    offering = deserialize_instance(serialized_offering)
-    resources = models.Resource.objects.filter(offering=offering).exclude(
-        state=models.Resource.States.TERMINATED
-    )
-    for resource in resources:
-        ResourceInvoicePullTask().delay(serialize_instance(resource))
+    OfferingInvoicePullTask().delay(serialized_offering)
 
 
 @shared_task(
@@ -695,142 +866,16 @@ def sync_remote_project_permissions():
     if not settings.WALDUR_AUTH_SOCIAL['ENABLE_EDUTEAMS_SYNC']:
         return
 
-    for project, offerings in utils.get_projects_with_remote_offerings().items():
-        for offering in offerings:
-            local_permissions = utils.collect_local_permissions(offering, project)
-            client = utils.get_client_for_offering(offering)
-
-            try:
-                remote_project = utils.get_remote_project(offering, project, client)
-                if not remote_project:
-                    if not local_permissions:
-                        logger.info(
-                            f'Skipping remote project {project} synchronization in '
-                            'offering {offering} because there are no users to be synced.'
-                        )
-                    else:
-                        remote_project = utils.create_remote_project(
-                            offering, project, client
-                        )
-                        utils.push_project_users(
-                            offering, project, remote_project['uuid']
-                        )
-                    continue
-            except rf_exceptions.ValidationError as e:
-                logger.warning(
-                    f'Unable to fetch remote project {project} in offering {offering}: {e}'
-                )
-                continue
-            except WaldurClientException as e:
-                logger.warning(
-                    f'Unable to create remote project {project} in offering {offering}: {e}'
-                )
-                continue
-            else:
-                remote_project_uuid = remote_project['uuid']
-
-            try:
-                remote_permissions = client.get_project_permissions(remote_project_uuid)
-            except WaldurClientException as e:
-                logger.warning(
-                    f'Unable to get project permissions for project {project} in offering {offering}: {e}'
-                )
-                continue
-
-            remote_user_roles = collections.defaultdict()
-            for remote_permission in remote_permissions:
-                remote_expiration_time = remote_permission['expiration_time']
-                remote_user_roles[remote_permission['user_username']] = (
-                    remote_permission['role_name'],
-                    dateparse.parse_datetime(remote_expiration_time)
-                    if remote_expiration_time
-                    else remote_expiration_time,
-                    remote_permission['user_uuid'],
-                )
-
-            for username, (new_role, new_expiration_time) in local_permissions.items():
-                try:
-                    remote_user_uuid = client.get_remote_eduteams_user(username)['uuid']
-                except WaldurClientException as e:
-                    logger.warning(
-                        f'Unable to fetch remote user {username} in offering {offering}: {e}'
-                    )
-                    continue
-
-                if username not in remote_user_roles:
-                    try:
-                        client.create_project_permission(
-                            remote_project_uuid,
-                            remote_user_uuid,
-                            new_role,
-                            new_expiration_time.isoformat()
-                            if new_expiration_time
-                            else new_expiration_time,
-                        )
-                    except WaldurClientException as e:
-                        logger.warning(
-                            f'Unable to create permission for user [{remote_user_uuid}] with role {new_role} (until {new_expiration_time}) '
-                            f'and project [{remote_project_uuid}] in offering [{offering}]: {e}'
-                        )
-                    continue
-
-                old_role, old_expiration_time, _ = remote_user_roles[username]
-
-                if old_role != new_role:
-                    try:
-                        client.remove_project_permission(
-                            remote_project_uuid, remote_user_uuid, old_role
-                        )
-                    except WaldurClientException as e:
-                        logger.warning(
-                            f'Unable to remove permission for user [{remote_user_uuid}] with role {old_role} '
-                            f'and project [{remote_project_uuid}] in offering [{offering}]: {e}'
-                        )
-                    try:
-                        client.create_project_permission(
-                            remote_project_uuid,
-                            remote_user_uuid,
-                            new_role,
-                            new_expiration_time.isoformat()
-                            if new_expiration_time
-                            else new_expiration_time,
-                        )
-                    except WaldurClientException as e:
-                        logger.warning(
-                            f'Unable to create permission for user [{remote_user_uuid}] with role {new_role} (until {new_expiration_time}) '
-                            f'and project [{remote_project_uuid}] in offering [{offering}]: {e}'
-                        )
-                    continue
-
-                if old_expiration_time != new_expiration_time:
-                    try:
-                        client.update_project_permission(
-                            remote_project_uuid,
-                            remote_user_uuid,
-                            new_role,
-                            new_expiration_time.isoformat()
-                            if new_expiration_time
-                            else new_expiration_time,
-                        )
-                    except WaldurClientException as e:
-                        logger.warning(
-                            f'Unable to update permission for user [{remote_user_uuid}] with role {old_role} (until {new_expiration_time}) '
-                            f'and project [{remote_project_uuid}] in offering [{offering}]: {e}'
-                        )
-
-            stale_usernames = set(remote_user_roles.keys()) - set(
-                local_permissions.keys()
-            )
-            for username in stale_usernames:
-                role_name, _, remote_user_uuid = remote_user_roles[username]
-                try:
-                    client.remove_project_permission(
-                        remote_project_uuid, remote_user_uuid, role_name
-                    )
-                except WaldurClientException as e:
-                    logger.warning(
-                        f'Unable to remove permission [{role_name}] for user [{username}] in offering [{offering}]: {e}'
-                    )
+    summary = utils.sync_remote_project_permissions()
+    logger.info(
+        'Remote project permissions have been synchronized. '
+        'Created: %s, updated: %s, removed: %s, failed: %s.',
+        summary['created'],
+        summary['updated'],
+        summary['removed'],
+        summary['failed'],
+    )
+    return dict(summary)
 
 
 @shared_task
@@ -5,6 +5,7 @@ from unittest import mock
 from django.utils import timezone
 from freezegun import freeze_time
 from rest_framework import test
+from waldur_client import WaldurClientException
 
 from waldur_core.core.utils import month_end, month_start, serialize_instance
 from waldur_core.structure.tests.fixtures import ProjectFixture
@@ -18,7 +19,10 @@ from waldur_mastermind.marketplace.tests.factories import (
     ResourceFactory,
 )
 from waldur_mastermind.marketplace_remote import PLUGIN_NAME
-from waldur_mastermind.marketplace_remote.tasks import ResourceInvoicePullTask
+from waldur_mastermind.marketplace_remote.tasks import (
+    OfferingInvoicePullTask,
+    ResourceInvoicePullTask,
+)
 
 
 class InvoiceItemPullTest(test.APITransactionTestCase):
@@ -36,6 +40,7 @@ class InvoiceItemPullTest(test.APITransactionTestCase):
             },
         )
         self.customer = self.fixture.customer
+        self.offering = offering
         self.resource = ResourceFactory(project=self.fixture.project, offering=offering)
         self.resource.backend_id = 'valid-backend-id'
         self.resource.save()
@@ -152,3 +157,45 @@ class InvoiceItemPullTest(test.APITransactionTestCase):
         item.refresh_from_db()
         self.assertEqual(new_quantity, item.quantity)
         self.assertEqual(new_month_end, item.end)
+
+    def test_invoice_items_of_offering_are_pulled_in_batch(self):
+        item_data = self.get_common_data()
+        other_item_data = self.get_common_data()
+        self.client_mock().list_invoice_items.return_value = [
+            {'resource_uuid': self.resource.backend_id, **item_data},
+            {'resource_uuid': uuid.uuid4().hex, **other_item_data},
+        ]
+
+        OfferingInvoicePullTask().run(serialize_instance(self.offering))
+
+        self.client_mock().list_invoice_items.assert_called_with(
+            {
+                'offering_uuid': self.offering.backend_id,
+                'year': mock.ANY,
+                'month': mock.ANY,
+            }
+        )
+        self.assertEqual(
+            [item_data['uuid']],
+            [
+                item.backend_uuid.hex
+                for item in InvoiceItem.objects.filter(
+                    resource=self.resource,
+                    invoice__year=timezone.now().year,
+                    invoice__month=timezone.now().month,
+                )
+            ],
+        )
+        self.assertFalse(
+            InvoiceItem.objects.filter(backend_uuid=other_item_data['uuid']).exists()
+        )
+
+    @mock.patch(
+        'waldur_mastermind.marketplace_remote.tasks.ResourceInvoicePullTask.delay'
+    )
+    def test_resources_are_pulled_separately_if_batch_pull_fails(self, delay_mock):
+        self.client_mock().list_invoice_items.side_effect = WaldurClientException()
+
+        OfferingInvoicePullTask().run(serialize_instance(self.offering))
+
+        delay_mock.assert_called_once_with(serialize_instance(self.resource))
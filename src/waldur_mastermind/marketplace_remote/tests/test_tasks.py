@@ -1,16 +1,19 @@
 import uuid
 from unittest import mock
 
+import responses
 from django.core import mail
 from django.core.exceptions import ObjectDoesNotExist
 from django.test import override_settings
 from django.utils import timezone
 from rest_framework import test
+from waldur_client import WaldurClientException
 
 from waldur_auth_social.models import ProviderChoices
 from waldur_core.core.utils import format_text, serialize_instance
 from waldur_core.permissions.enums import RoleEnum
 from waldur_core.permissions.fixtures import CustomerRole
+from waldur_core.structure.exceptions import ServiceBackendError
 from waldur_core.structure.tests.factories import (
     NotificationFactory,
     ProjectFactory,
@@ -281,6 +284,27 @@ class SyncRemoteProjectPermissionsTest(test.APITransactionTestCase):
             self.remote_project_uuid, self.remote_user_uuid, RoleEnum.PROJECT_ADMIN
         )
 
+    def test_remote_user_lookup_is_reused_between_runs(self):
+        # Arrange
+        self.fixture.manager.registration_method = ProviderChoices.EDUTEAMS
+        self.fixture.manager.save()
+
+        self.client.list_projects.return_value = [{'uuid': self.remote_project_uuid}]
+        self.client.get_remote_eduteams_user.return_value = {
+            'uuid': self.remote_user_uuid
+        }
+        self.client.get_project_permissions.return_value = []
+
+        # Act
+        summary = tasks.sync_remote_project_permissions()
+        tasks.sync_remote_project_permissions()
+
+        # Assert
+        self.assertEqual(
+            summary, {'created': 1, 'updated': 0, 'removed': 0, 'failed': 0}
+        )
+        self.assertEqual(self.client.get_remote_eduteams_user.call_count, 1)
+
 
 class DeleteRemoteProjectsTest(test.APITransactionTestCase):
     def setUp(self):
@@ -478,6 +502,114 @@ class ResourceOrderItemImportTest(test.APITransactionTestCase):
         self.assertEqual(self.fixture.resource.attributes, {'sample_attr': 1})
 
 
+class UsagePullTest(test.APITransactionTestCase):
+    def setUp(self):
+        patcher = mock.patch("waldur_mastermind.marketplace_remote.utils.WaldurClient")
+        self.client = patcher.start()()
+
+        self.fixture = fixtures.MarketplaceFixture()
+        self.resource = self.fixture.resource
+        self.resource.backend_id = uuid.uuid4().hex
+        self.resource.save()
+        self.resource.offering.type = PLUGIN_NAME
+        self.resource.offering.secret_options = {
+            'api_url': 'https://example.com/',
+            'token': uuid.uuid4().hex,
+        }
+        self.resource.offering.save()
+        self.component = self.fixture.offering_component
+
+    def tearDown(self):
+        super().tearDown()
+        mock.patch.stopall()
+
+    def get_remote_usage(self, component_type='cpu', usage='10.00'):
+        return {
+            'uuid': uuid.uuid4().hex,
+            'type': component_type,
+            'usage': usage,
+            'description': '',
+            'created': '2021-12-12T01:01:01Z',
+            'date': '2021-12-12T01:01:01Z',
+            'billing_period': '2021-12-01',
+        }
+
+    def test_usages_are_created_and_updated(self):
+        remote_usage = self.get_remote_usage()
+        self.client.list_component_usages.return_value = [
+            remote_usage,
+            self.get_remote_usage(component_type='unknown'),
+        ]
+        tasks.UsagePullTask().pull(self.resource)
+
+        usage = models.ComponentUsage.objects.get(resource=self.resource)
+        self.assertEqual(usage.backend_id, remote_usage['uuid'])
+        self.assertEqual(usage.component, self.component)
+        self.assertEqual(usage.usage, 10)
+
+        remote_usage['usage'] = '20.00'
+        result = tasks.UsagePullTask().sync_usages(self.resource, [remote_usage])
+        self.assertEqual(result, utils.RemoteSyncResult(0, 1, 0))
+        usage.refresh_from_db()
+        self.assertEqual(usage.usage, 20)
+
+        result = tasks.UsagePullTask().sync_usages(self.resource, [remote_usage])
+        self.assertEqual(result, utils.RemoteSyncResult(0, 0, 0))
+
+    @responses.activate
+    def test_offering_usages_are_listed_page_by_page(self):
+        self.client.api_url = 'https://example.com/api/'
+        self.client.headers = {}
+        url = 'https://example.com/api/marketplace-component-usages/'
+        first_usage = self.get_remote_usage()
+        second_usage = self.get_remote_usage(component_type='ram')
+        for usage in (first_usage, second_usage):
+            usage['resource_uuid'] = self.resource.backend_id
+        responses.add(
+            responses.GET,
+            url,
+            json=[first_usage],
+            headers={'Link': f'<{url}?offering_uuid=abc&page=2>; rel="next"'},
+        )
+        responses.add(responses.GET, url, json=[second_usage])
+
+        usages = utils.list_offering_component_usages(self.client, 'abc')
+
+        self.assertEqual(usages, [first_usage, second_usage])
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(
+            responses.calls[0].request.url, f'{url}?offering_uuid=abc&page_size=200'
+        )
+        self.assertEqual(
+            responses.calls[1].request.url, f'{url}?offering_uuid=abc&page=2'
+        )
+        self.client.list_component_usages.assert_not_called()
+
+    @responses.activate
+    def test_offering_usages_listing_error_is_raised(self):
+        self.client.api_url = 'https://example.com/api/'
+        self.client.headers = {}
+        responses.add(
+            responses.GET,
+            'https://example.com/api/marketplace-component-usages/',
+            status=500,
+        )
+        with self.assertRaises(WaldurClientException):
+            utils.list_offering_component_usages(self.client, 'abc')
+
+    def test_offering_is_not_changed_if_batch_pull_fails(self):
+        offering = self.resource.offering
+        with mock.patch.object(
+            tasks.OfferingUsagePullTask,
+            'pull',
+            side_effect=ServiceBackendError('Remote API is not available.'),
+        ):
+            tasks.OfferingUsagePullTask().run(serialize_instance(offering))
+
+        offering.refresh_from_db()
+        self.assertEqual(offering.state, models.Offering.States.ACTIVE)
+
+
 class NotificationAboutPendingProjectUpdatesTest(test.APITransactionTestCase):
     def setUp(self):
         from datetime import datetime, timedelta
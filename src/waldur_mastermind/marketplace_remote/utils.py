@@ -1,19 +1,34 @@
+import hashlib
 import io
 import logging
-from collections import defaultdict
+import uuid
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
 
 import requests
 import urllib3
+from django import db
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import signals
 from django.utils import dateparse
 from django.utils.dateparse import parse_datetime
+from rest_framework import status
 from rest_framework.exceptions import ValidationError
-from waldur_client import WaldurClient, WaldurClientException
+from waldur_client import (
+    WaldurClient,
+    WaldurClientException,
+    requests_timeout,
+    verify_ssl,
+)
 
 from waldur_auth_social.models import ProviderChoices
 from waldur_core.core.utils import get_system_robot
 from waldur_core.permissions.enums import RoleEnum
 from waldur_core.permissions.utils import get_permissions
 from waldur_core.structure import models as structure_models
+from waldur_core.structure import utils as structure_utils
 from waldur_mastermind.marketplace import models as marketplace_models
 from waldur_mastermind.marketplace_remote.constants import (
     OFFERING_COMPONENT_FIELDS,
@@ -24,6 +39,8 @@ from . import PLUGIN_NAME
 
 logger = logging.getLogger(__name__)
 
+COMPONENT_USAGES_PAGE_SIZE = 200
+
 INVALID_RESOURCE_STATES = (
     marketplace_models.Resource.States.CREATING,
     marketplace_models.Resource.States.TERMINATED,
@@ -37,6 +54,129 @@ def get_client_for_offering(offering):
     return WaldurClient(api_url, token)
 
 
+def normalize_uuid(value):
+    # Remote API renders UUIDs with dashes, but backend IDs are stored in hex format.
+    try:
+        return uuid.UUID(str(value)).hex
+    except ValueError:
+        return str(value)
+
+
+def group_by_resource(remote_objects):
+    """
+    Group remote objects listed for the whole offering by remote resource UUID.
+    """
+    result = defaultdict(list)
+    for remote_object in remote_objects:
+        result[normalize_uuid(remote_object['resource_uuid'])].append(remote_object)
+    return result
+
+
+def list_offering_component_usages(client, offering_uuid, date_after=None):
+    """
+    List component usages of remote offering page by page.
+
+    Python client does not allow to filter component usages by offering yet,
+    so the endpoint is called directly with URL and headers of the client.
+    """
+    url = urljoin(client.api_url, 'marketplace-component-usages/')
+    params = {
+        'offering_uuid': offering_uuid,
+        'date_after': date_after,
+        'page_size': COMPONENT_USAGES_PAGE_SIZE,
+    }
+    usages = []
+    while url:
+        try:
+            response = requests.get(
+                url,
+                params=params,
+                headers=client.headers,
+                verify=verify_ssl,
+                timeout=requests_timeout,
+            )
+        except requests.exceptions.RequestException as e:
+            raise WaldurClientException(str(e))
+        if response.status_code != status.HTTP_200_OK:
+            raise WaldurClientException(
+                f'Unable to list component usages of offering {offering_uuid}. '
+                f'Status: {response.status_code}, body: {response.text}'
+            )
+        usages.extend(response.json())
+        # Link to the next page already contains all query parameters.
+        url = response.links.get('next', {}).get('url')
+        params = None
+    return usages
+
+
+RemoteSyncResult = namedtuple('RemoteSyncResult', ('created', 'updated', 'deleted'))
+
+
+def pull_values(local_object, values):
+    """
+    Set values on local object and return names of changed fields.
+    Unlike pull_fields, object is not saved.
+    """
+    changed_fields = set()
+    for field, value in values.items():
+        if getattr(local_object, field) != value:
+            setattr(local_object, field, value)
+            changed_fields.add(field)
+    return changed_fields
+
+
+def sync_remote_objects(model, local_objects, remote_objects, build, update):
+    """
+    Mirror remote objects in local database.
+
+    Local and remote objects are dictionaries keyed by remote UUID.
+    Function "build" returns unsaved local object for remote object
+    or None if remote object should be skipped.
+    Function "update" applies values of remote object to local object
+    and returns names of changed fields.
+
+    Diff is computed in memory and applied using bulk queries.
+    Post save signal is sent for created and updated objects
+    so that their handlers keep working.
+    """
+    new_objects = [
+        build(remote_object)
+        for key, remote_object in remote_objects.items()
+        if key not in local_objects
+    ]
+    new_objects = [local_object for local_object in new_objects if local_object]
+    changes = [
+        (local_object, update(local_object, remote_objects[key]))
+        for key, local_object in local_objects.items()
+        if key in remote_objects
+    ]
+    stale_ids = [
+        local_object.pk
+        for key, local_object in local_objects.items()
+        if key not in remote_objects
+    ]
+
+    with transaction.atomic():
+        if stale_ids:
+            model.objects.filter(pk__in=stale_ids).delete()
+        for local_object in model.objects.bulk_create(new_objects):
+            signals.post_save.send(
+                sender=model,
+                instance=local_object,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=local_object._state.db,
+            )
+        structure_utils.bulk_save_changes(model, changes)
+
+    return RemoteSyncResult(
+        len(new_objects),
+        len([fields for _, fields in changes if fields]),
+        len(stale_ids),
+    )
+
+
 def get_project_backend_id(project):
     return f'{project.customer.uuid}_{project.uuid}'
 
@@ -286,6 +426,287 @@ def push_project_users(offering, project, remote_project_uuid):
             )
 
 
+# Number of remote Waldur deployments which project permissions are synchronized concurrently.
+SYNC_PERMISSIONS_MAX_WORKERS = 4
+
+# Remote user UUIDs are looked up by username and reused across synchronization runs.
+REMOTE_USER_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+class RemoteUserCache:
+    """
+    UUIDs of remote users looked up by username in remote Waldur.
+    Lookups are kept in memory during synchronization run, successful
+    ones are also shared between runs via cache.
+    """
+
+    def __init__(self, api_url):
+        api_url_hash = hashlib.sha256(api_url.encode()).hexdigest()
+        self.prefix = f'marketplace_remote:remote_user:{api_url_hash}'
+        self.users = {}
+
+    def get_cache_key(self, username):
+        return f'{self.prefix}:{hashlib.sha256(username.encode()).hexdigest()}'
+
+    def get(self, client, username):
+        if username not in self.users:
+            remote_user_uuid = cache.get(self.get_cache_key(username))
+            if remote_user_uuid is None:
+                try:
+                    remote_user_uuid = client.get_remote_eduteams_user(username)['uuid']
+                except WaldurClientException as e:
+                    self.users[username] = e
+                    raise
+                cache.set(
+                    self.get_cache_key(username),
+                    remote_user_uuid,
+                    REMOTE_USER_CACHE_TIMEOUT,
+                )
+            self.users[username] = remote_user_uuid
+
+        result = self.users[username]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def invalidate(self, username):
+        self.users.pop(username, None)
+        cache.delete(self.get_cache_key(username))
+
+
+def format_expiration_time(expiration_time):
+    return expiration_time.isoformat() if expiration_time else expiration_time
+
+
+def create_remote_project_permission(
+    client, user_cache, username, remote_project_uuid, remote_user_uuid, role, until
+):
+    try:
+        client.create_project_permission(
+            remote_project_uuid,
+            remote_user_uuid,
+            role,
+            format_expiration_time(until),
+        )
+    except WaldurClientException as e:
+        # Remote user may have been removed, so it is looked up again next time.
+        user_cache.invalidate(username)
+        logger.warning(
+            f'Unable to create permission for user [{remote_user_uuid}] with role {role} (until {until}) '
+            f'and project [{remote_project_uuid}] in remote Waldur: {e}'
+        )
+        return False
+    return True
+
+
+def sync_project_permissions_in_offering(
+    client, user_cache, offering, project, local_permissions, summary
+):
+    try:
+        remote_project = get_remote_project(offering, project, client)
+        if not remote_project:
+            if not local_permissions:
+                logger.info(
+                    f'Skipping remote project {project} synchronization in '
+                    f'offering {offering} because there are no users to be synced.'
+                )
+                return
+            remote_project = create_remote_project(offering, project, client)
+            remote_user_roles = {}
+        else:
+            remote_user_roles = None
+    except ValidationError as e:
+        logger.warning(
+            f'Unable to fetch remote project {project} in offering {offering}: {e}'
+        )
+        summary['failed'] += 1
+        return
+    except WaldurClientException as e:
+        logger.warning(
+            f'Unable to create remote project {project} in offering {offering}: {e}'
+        )
+        summary['failed'] += 1
+        return
+
+    remote_project_uuid = remote_project['uuid']
+    if remote_user_roles is None:
+        try:
+            remote_permissions = client.get_project_permissions(remote_project_uuid)
+        except WaldurClientException as e:
+            logger.warning(
+                f'Unable to get project permissions for project {project} in offering {offering}: {e}'
+            )
+            summary['failed'] += 1
+            return
+
+        remote_user_roles = {}
+        for remote_permission in remote_permissions:
+            remote_expiration_time = remote_permission['expiration_time']
+            remote_user_roles[remote_permission['user_username']] = (
+                remote_permission['role_name'],
+                dateparse.parse_datetime(remote_expiration_time)
+                if remote_expiration_time
+                else remote_expiration_time,
+                remote_permission['user_uuid'],
+            )
+
+    for username, (new_role, new_expiration_time) in local_permissions.items():
+        try:
+            remote_user_uuid = user_cache.get(client, username)
+        except WaldurClientException as e:
+            logger.warning(
+                f'Unable to fetch remote user {username} in offering {offering}: {e}'
+            )
+            summary['failed'] += 1
+            continue
+
+        if username not in remote_user_roles:
+            if create_remote_project_permission(
+                client,
+                user_cache,
+                username,
+                remote_project_uuid,
+                remote_user_uuid,
+                new_role,
+                new_expiration_time,
+            ):
+                summary['created'] += 1
+            else:
+                summary['failed'] += 1
+            continue
+
+        old_role, old_expiration_time, _ = remote_user_roles[username]
+
+        if old_role != new_role:
+            try:
+                client.remove_project_permission(
+                    remote_project_uuid, remote_user_uuid, old_role
+                )
+            except WaldurClientException as e:
+                logger.warning(
+                    f'Unable to remove permission for user [{remote_user_uuid}] with role {old_role} '
+                    f'and project [{remote_project_uuid}] in offering [{offering}]: {e}'
+                )
+            if create_remote_project_permission(
+                client,
+                user_cache,
+                username,
+                remote_project_uuid,
+                remote_user_uuid,
+                new_role,
+                new_expiration_time,
+            ):
+                summary['updated'] += 1
+            else:
+                summary['failed'] += 1
+            continue
+
+        if old_expiration_time != new_expiration_time:
+            try:
+                client.update_project_permission(
+                    remote_project_uuid,
+                    remote_user_uuid,
+                    new_role,
+                    format_expiration_time(new_expiration_time),
+                )
+            except WaldurClientException as e:
+                logger.warning(
+                    f'Unable to update permission for user [{remote_user_uuid}] with role {old_role} (until {new_expiration_time}) '
+                    f'and project [{remote_project_uuid}] in offering [{offering}]: {e}'
+                )
+                summary['failed'] += 1
+            else:
+                summary['updated'] += 1
+
+    stale_usernames = set(remote_user_roles.keys()) - set(local_permissions.keys())
+    for username in stale_usernames:
+        role_name, _, remote_user_uuid = remote_user_roles[username]
+        try:
+            client.remove_project_permission(
+                remote_project_uuid, remote_user_uuid, role_name
+            )
+        except WaldurClientException as e:
+            logger.warning(
+                f'Unable to remove permission [{role_name}] for user [{username}] in offering [{offering}]: {e}'
+            )
+            summary['failed'] += 1
+        else:
+            summary['removed'] += 1
+
+
+def sync_remote_endpoint_permissions(api_url, items):
+    """
+    Synchronize project permissions in single remote Waldur.
+    Items are (offering, project, local_permissions) triples.
+    Database is not accessed here, so this function is safe to run in thread.
+    """
+    summary = Counter()
+    user_cache = RemoteUserCache(api_url)
+    clients = {}
+    for offering, project, local_permissions in items:
+        token = offering.secret_options['token']
+        if token not in clients:
+            clients[token] = get_client_for_offering(offering)
+        try:
+            sync_project_permissions_in_offering(
+                clients[token],
+                user_cache,
+                offering,
+                project,
+                local_permissions,
+                summary,
+            )
+        except Exception:
+            logger.exception(
+                f'Unable to synchronize permissions of project {project} in offering {offering}.'
+            )
+            summary['failed'] += 1
+    return summary
+
+
+def sync_remote_project_permissions():
+    """
+    Synchronize permissions of projects in all remote Waldur deployments.
+    Local permissions are collected in advance, then remote deployments
+    are processed concurrently. Returns summary of changed permissions.
+    """
+    items_per_endpoint = defaultdict(list)
+    for project, offerings in get_projects_with_remote_offerings().items():
+        # Related objects are loaded before work is handed over to threads.
+        project.customer
+        project.type
+        for offering in offerings:
+            items_per_endpoint[offering.secret_options['api_url']].append(
+                (offering, project, collect_local_permissions(offering, project))
+            )
+
+    summary = Counter(created=0, updated=0, removed=0, failed=0)
+    if not items_per_endpoint:
+        return summary
+
+    def run(api_url, items):
+        try:
+            return sync_remote_endpoint_permissions(api_url, items)
+        finally:
+            db.connections.close_all()
+
+    max_workers = min(SYNC_PERMISSIONS_MAX_WORKERS, len(items_per_endpoint))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run, api_url, items): api_url
+            for api_url, items in items_per_endpoint.items()
+        }
+        for future in as_completed(futures):
+            try:
+                summary.update(future.result())
+            except Exception:
+                logger.exception(
+                    'Unable to synchronize project permissions in remote Waldur %s.',
+                    futures[future],
+                )
+    return summary
+
+
 def collect_local_permissions(
     offering: marketplace_models.Offering, project: structure_models.Project
 ):
@@ -381,10 +802,10 @@ def get_new_order_ids(client, backend_id):
     return remote_order_ids - local_order_ids
 
 
-def import_resource_order_items(resource):
+def import_resource_order_items(resource, client=None):
     if not resource.backend_id:
         return []
-    client = get_client_for_offering(resource.offering)
+    client = client or get_client_for_offering(resource.offering)
     new_order_ids = get_new_order_ids(client, resource.backend_id)
     imported_order_items = []
     for order_id in new_order_ids:
@@ -3,6 +3,7 @@ from decimal import Decimal
 
 from ddt import data, ddt
 from django.db.models import Q
+from django.test import override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 from rest_framework import test
@@ -163,6 +164,7 @@ class InvoicesTest(InvoicesBaseTest):
 
 
 @ddt
+@override_settings(task_always_eager=True)
 class UsagesTest(InvoicesBaseTest):
     def setUp(self):
         super().setUp()
@@ -1,6 +1,7 @@
 import logging
 import re
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
 from cinderclient import exceptions as cinder_exceptions
@@ -44,6 +45,7 @@ class OpenStackBackend(BaseOpenStackBackend):
     DEFAULTS = {
         'tenant_name': 'admin',
         'verify_ssl': False,
+        'max_concurrent_pull_subresources': 1,
     }
 
     def validate_settings(self):
@@ -70,6 +72,11 @@ class OpenStackBackend(BaseOpenStackBackend):
         self.pull_tenants()
 
     def pull_subresources(self):
+        max_workers = self.settings.get_option('max_concurrent_pull_subresources')
+        if max_workers and max_workers > 1:
+            self._pull_subresources_concurrently(max_workers)
+            return
+
         self.pull_security_groups()
         self.pull_server_groups()
         self.pull_floating_ips()
@@ -78,6 +85,53 @@ class OpenStackBackend(BaseOpenStackBackend):
         self.pull_routers()
         self.pull_ports()
 
+    def _pull_subresources_concurrently(self, max_workers):
+        """
+        Backend listings are fetched in thread pool, whereas database
+        is updated sequentially in the same order as in pull_subresources.
+        """
+        tenants = list(
+            models.Tenant.objects.filter(
+                state=models.Tenant.States.OK,
+                service_settings=self.settings,
+            )
+        )
+        network_tenants = list(self._get_network_tenants())
+        tenant_ids = [tenant.backend_id for tenant in tenants]
+        network_tenant_ids = [tenant.backend_id for tenant in network_tenants]
+
+        # Authenticate before fetching so that all threads share the same session.
+        self.get_client(admin=True)
+
+        fetchers = {
+            'security_groups': (self.list_security_groups, tenant_ids),
+            'server_groups': (self.list_server_groups, tenant_ids),
+            'floating_ips': (self.list_floatingips, tenant_ids),
+            'networks': (self.list_networks, network_tenant_ids),
+            'subnets': (self._list_subnets,),
+        }
+        for tenant_id in tenant_ids:
+            fetchers[('routers', tenant_id)] = (self._list_tenant_routers, tenant_id)
+            fetchers[('ports', tenant_id)] = (self._list_tenant_ports, tenant_id)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                key: executor.submit(*fetcher) for key, fetcher in fetchers.items()
+            }
+        listings = {key: future.result() for key, future in futures.items()}
+
+        self.pull_security_groups(tenants, listings['security_groups'])
+        self.pull_server_groups(tenants, listings['server_groups'])
+        self.pull_floating_ips(tenants, listings['floating_ips'])
+        self._pull_networks(network_tenants, listings['networks'])
+        self.pull_subnets(backend_subnets=listings['subnets'])
+        for tenant in tenants:
+            self._update_tenant_routers(
+                tenant, listings[('routers', tenant.backend_id)]
+            )
+        for tenant in tenants:
+            self._update_tenant_ports(tenant, listings[('ports', tenant.backend_id)])
+
     def pull_tenants(self):
         keystone = self.keystone_admin_client
 
@@ -158,65 +212,50 @@ class OpenStackBackend(BaseOpenStackBackend):
         name_pattern = (
             re.compile(flavor_exclude_regex) if flavor_exclude_regex else None
         )
-        with transaction.atomic():
-            cur_flavors = self._get_current_properties(models.Flavor)
-            for backend_flavor in flavors:
-                if (
-                    name_pattern is not None
-                    and name_pattern.match(backend_flavor.name) is not None
-                ):
-                    logger.debug(
-                        'Skipping pull of %s flavor as it matches %s regex pattern.',
-                        backend_flavor.name,
-                        flavor_exclude_regex,
-                    )
-                    continue
-
-                cur_flavors.pop(backend_flavor.id, None)
-                models.Flavor.objects.update_or_create(
-                    settings=self.settings,
-                    backend_id=backend_flavor.id,
-                    defaults={
-                        'name': backend_flavor.name,
-                        'cores': backend_flavor.vcpus,
-                        'ram': backend_flavor.ram,
-                        'disk': self.gb2mb(backend_flavor.disk),
-                        'state': models.Flavor.States.OK,
-                    },
+        backend_flavors = {}
+        for backend_flavor in flavors:
+            if (
+                name_pattern is not None
+                and name_pattern.match(backend_flavor.name) is not None
+            ):
+                logger.debug(
+                    'Skipping pull of %s flavor as it matches %s regex pattern.',
+                    backend_flavor.name,
+                    flavor_exclude_regex,
                 )
+                continue
+
+            backend_flavors[backend_flavor.id] = {
+                'name': backend_flavor.name,
+                'cores': backend_flavor.vcpus,
+                'ram': backend_flavor.ram,
+                'disk': self.gb2mb(backend_flavor.disk),
+                'state': models.Flavor.States.OK,
+            }
 
-            models.Flavor.objects.filter(backend_id__in=cur_flavors.keys()).delete()
+        return self._sync_properties(models.Flavor, backend_flavors)
 
     def pull_images(self):
-        self._pull_images(
+        return self._pull_images(
             models.Image, lambda image: image['visibility'] == 'public', admin=True
         )
 
-    def _get_current_volume_types(self):
-        return self._get_current_properties(models.VolumeType)
-
     def pull_volume_types(self):
         try:
             volume_types = self.cinder_admin_client.volume_types.list(is_public=True)
         except cinder_exceptions.ClientException as e:
             raise OpenStackBackendError(e)
 
-        with transaction.atomic():
-            cur_volume_types = self._get_current_volume_types()
-            for backend_type in volume_types:
-                cur_volume_types.pop(backend_type.id, None)
-                models.VolumeType.objects.update_or_create(
-                    settings=self.settings,
-                    backend_id=backend_type.id,
-                    defaults={
-                        'name': backend_type.name,
-                        'description': backend_type.description or '',
-                    },
-                )
-
-            models.VolumeType.objects.filter(
-                backend_id__in=cur_volume_types.keys(), settings=self.settings
-            ).delete()
+        return self._sync_properties(
+            models.VolumeType,
+            {
+                backend_type.id: {
+                    'name': backend_type.name,
+                    'description': backend_type.description or '',
+                }
+                for backend_type in volume_types
+            },
+        )
 
     @log_backend_action('push quotas for tenant')
     def push_tenant_quotas(self, tenant, quotas: Dict[str, int]):
@@ -276,7 +315,7 @@ class OpenStackBackend(BaseOpenStackBackend):
         ):
             self.pull_tenant_quotas(tenant)
 
-    def pull_floating_ips(self, tenants=None):
+    def pull_floating_ips(self, tenants=None, backend_floating_ips=None):
         if tenants is None:
             tenants = models.Tenant.objects.filter(
                 state=models.Tenant.States.OK,
@@ -286,7 +325,8 @@ class OpenStackBackend(BaseOpenStackBackend):
         if not tenant_mappings:
             return
 
-        backend_floating_ips = self.list_floatingips(list(tenant_mappings.keys()))
+        if backend_floating_ips is None:
+            backend_floating_ips = self.list_floatingips(list(tenant_mappings.keys()))
 
         tenant_floating_ips = defaultdict(list)
         for floating_ip in backend_floating_ips:
@@ -386,7 +426,7 @@ class OpenStackBackend(BaseOpenStackBackend):
 
         return floating_ip
 
-    def pull_security_groups(self, tenants=None):
+    def pull_security_groups(self, tenants=None, backend_security_groups=None):
         if tenants is None:
             tenants = models.Tenant.objects.filter(
                 state=models.Tenant.States.OK,
@@ -396,9 +436,10 @@ class OpenStackBackend(BaseOpenStackBackend):
         if not tenant_mappings:
             return
 
-        backend_security_groups = self.list_security_groups(
-            list(tenant_mappings.keys())
-        )
+        if backend_security_groups is None:
+            backend_security_groups = self.list_security_groups(
+                list(tenant_mappings.keys())
+            )
 
         tenant_security_groups = defaultdict(list)
         for security_group in backend_security_groups:
@@ -600,15 +641,23 @@ class OpenStackBackend(BaseOpenStackBackend):
             self.pull_tenant_routers(tenant)
 
     def pull_tenant_routers(self, tenant):
+        backend_routers = self._list_tenant_routers(tenant.backend_id)
+        self._update_tenant_routers(tenant, backend_routers)
+
+    def _list_tenant_routers(self, tenant_backend_id):
+        """
+        Returns list of pairs of backend router and its fixed IPs.
+        """
         neutron = self.neutron_admin_client
 
         try:
-            backend_routers = neutron.list_routers(tenant_id=tenant.backend_id)[
+            backend_routers = neutron.list_routers(tenant_id=tenant_backend_id)[
                 'routers'
             ]
         except neutron_exceptions.NeutronClientException as e:
             raise OpenStackBackendError(e)
 
+        result = []
         for backend_router in backend_routers:
             backend_id = backend_router['id']
             try:
@@ -624,7 +673,12 @@ class OpenStackBackend(BaseOpenStackBackend):
                         fixed_ips.append(fixed_ip['ip_address'])
             except neutron_exceptions.NeutronClientException as e:
                 raise OpenStackBackendError(e)
+            result.append((backend_router, fixed_ips))
+        return result
 
+    def _update_tenant_routers(self, tenant, backend_routers):
+        for backend_router, fixed_ips in backend_routers:
+            backend_id = backend_router['id']
             defaults = {
                 'name': backend_router['name'],
                 'description': backend_router['description'],
@@ -646,7 +700,7 @@ class OpenStackBackend(BaseOpenStackBackend):
                     tenant,
                 )
 
-        remote_ids = {ip['id'] for ip in backend_routers}
+        remote_ids = {router['id'] for router, _ in backend_routers}
         stale_routers = models.Router.objects.filter(tenant=tenant).exclude(
             backend_id__in=remote_ids
         )
@@ -660,13 +714,18 @@ class OpenStackBackend(BaseOpenStackBackend):
             self.pull_tenant_ports(tenant)
 
     def pull_tenant_ports(self, tenant):
+        backend_ports = self._list_tenant_ports(tenant.backend_id)
+        self._update_tenant_ports(tenant, backend_ports)
+
+    def _list_tenant_ports(self, tenant_backend_id):
         neutron = self.neutron_admin_client
 
         try:
-            backend_ports = neutron.list_ports(tenant_id=tenant.backend_id)['ports']
+            return neutron.list_ports(tenant_id=tenant_backend_id)['ports']
         except neutron_exceptions.NeutronClientException as e:
             raise OpenStackBackendError(e)
 
+    def _update_tenant_ports(self, tenant, backend_ports):
         networks = models.Network.objects.filter(tenant=tenant)
         network_mappings = {network.backend_id: network for network in networks}
 
@@ -726,8 +785,8 @@ class OpenStackBackend(BaseOpenStackBackend):
         )
         stale_ports.delete()
 
-    def pull_networks(self):
-        tenants = (
+    def _get_network_tenants(self):
+        return (
             models.Tenant.objects.exclude(backend_id='')
             .filter(
                 state__in=[models.Tenant.States.OK, models.Tenant.States.UPDATING],
@@ -736,14 +795,16 @@ class OpenStackBackend(BaseOpenStackBackend):
             .prefetch_related('networks')
         )
 
-        self._pull_networks(tenants)
+    def pull_networks(self):
+        self._pull_networks(self._get_network_tenants())
 
     def pull_tenant_networks(self, tenant):
         self._pull_networks([tenant])
 
-    def _pull_networks(self, tenants):
+    def _pull_networks(self, tenants, backend_networks=None):
         tenant_mappings = {tenant.backend_id: tenant for tenant in tenants}
-        backend_networks = self.list_networks(list(tenant_mappings.keys()))
+        if backend_networks is None:
+            backend_networks = self.list_networks(list(tenant_mappings.keys()))
 
         networks = []
         with transaction.atomic():
@@ -839,9 +900,14 @@ class OpenStackBackend(BaseOpenStackBackend):
 
         return network
 
-    def pull_subnets(self, tenant=None, network=None):
-        neutron = self.neutron_admin_client
+    def _list_subnets(self):
+        try:
+            # We can't filter subnets by network IDs because it exceeds maximum request length
+            return self.neutron_admin_client.list_subnets()['subnets']
+        except neutron_exceptions.NeutronClientException as e:
+            raise OpenStackBackendError(e)
 
+    def pull_subnets(self, tenant=None, network=None, backend_subnets=None):
         if tenant:
             networks = tenant.networks.all()
         elif network:
@@ -855,20 +921,21 @@ class OpenStackBackend(BaseOpenStackBackend):
         if not network_mappings:
             return
 
-        try:
-            if tenant:
-                backend_subnets = neutron.list_subnets(tenant_id=tenant.backend_id)[
-                    'subnets'
-                ]
-            elif network:
-                backend_subnets = neutron.list_subnets(network_id=network.backend_id)[
-                    'subnets'
-                ]
-            else:
-                # We can't filter subnets by network IDs because it exceeds maximum request length
-                backend_subnets = neutron.list_subnets()['subnets']
-        except neutron_exceptions.NeutronClientException as e:
-            raise OpenStackBackendError(e)
+        if backend_subnets is None:
+            neutron = self.neutron_admin_client
+            try:
+                if tenant:
+                    backend_subnets = neutron.list_subnets(tenant_id=tenant.backend_id)[
+                        'subnets'
+                    ]
+                elif network:
+                    backend_subnets = neutron.list_subnets(
+                        network_id=network.backend_id
+                    )['subnets']
+                else:
+                    backend_subnets = self._list_subnets()
+            except neutron_exceptions.NeutronClientException as e:
+                raise OpenStackBackendError(e)
 
         subnet_uuids = []
         with transaction.atomic():
@@ -2614,7 +2681,7 @@ class OpenStackBackend(BaseOpenStackBackend):
         except nova_exceptions.ClientException as e:
             raise OpenStackBackendError(e)
 
-    def pull_server_groups(self, tenants=None):
+    def pull_server_groups(self, tenants=None, backend_server_groups=None):
         if tenants is None:
             tenants = models.Tenant.objects.filter(
                 state=models.Tenant.States.OK,
@@ -2624,7 +2691,10 @@ class OpenStackBackend(BaseOpenStackBackend):
         if not tenant_mappings:
             return
 
-        backend_server_groups = self.list_server_groups(list(tenant_mappings.keys()))
+        if backend_server_groups is None:
+            backend_server_groups = self.list_server_groups(
+                list(tenant_mappings.keys())
+            )
         tenant_server_groups = defaultdict(list)
         for server_group in backend_server_groups:
             tenant_id = server_group.project_id
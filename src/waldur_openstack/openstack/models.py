@@ -86,12 +86,13 @@ class SecurityGroup(structure_models.SubResource):
         return 'openstack-sgp'
 
     def increase_backend_quotas_usage(self, validate=False):
-        self.tenant.add_quota_usage('security_group_count', 1, validate=validate)
-        self.tenant.add_quota_usage(
-            'security_group_rule_count',
-            self.rules.count(),
-            validate=validate,
-        )
+        quota_deltas = {
+            'security_group_count': 1,
+            'security_group_rule_count': self.rules.count(),
+        }
+        if validate:
+            self.tenant.validate_quota_change(quota_deltas)
+        self.tenant.apply_quota_usage(quota_deltas)
 
     def decrease_backend_quotas_usage(self):
         self.tenant.add_quota_usage('security_group_count', -1)
@@ -126,6 +126,15 @@ class OpenStackServiceSerializer(BaseOpenStackServiceSerializer):
         required=False,
     )
 
+    max_concurrent_pull_subresources = serializers.IntegerField(
+        source='options.max_concurrent_pull_subresources',
+        help_text=_(
+            'Maximum parallel requests used to fetch tenant subresources from backend.'
+        ),
+        min_value=1,
+        required=False,
+    )
+
 
 class FlavorSerializer(BaseFlavorSerializer):
     display_name = serializers.SerializerMethodField()
@@ -650,6 +659,7 @@ class TenantSerializer(structure_serializers.BaseResourceSerializer):
             'default_volume_type_name',
             'child_settings',
         )
+        list_serializer_class = structure_serializers.QuotaListSerializer
         read_only_fields = (
             structure_serializers.BaseResourceSerializer.Meta.read_only_fields
             + (
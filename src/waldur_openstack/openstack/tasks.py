@@ -40,9 +40,6 @@ class TenantCreateSuccessTask(core_tasks.StateTransitionTask):
 class TenantPullQuotas(core_tasks.BackgroundTask):
     name = 'openstack.TenantPullQuotas'
 
-    def is_equal(self, other_task):
-        return self.name == other_task.get('name')
-
     def run(self):
         from . import executors
 
@@ -676,6 +676,36 @@ class PullImagesTest(BaseBackendTestCase):
         self.assertEqual(models.Image.objects.count(), 1)
         self.assertEqual(models.Image.objects.get(backend_id='1').min_ram, 1024)
 
+    def test_counts_of_synchronized_images_are_reported(self):
+        self.mocked_glance().images.list.return_value.append(
+            {
+                'status': 'active',
+                'id': '3',
+                'name': 'Ubuntu 22.04',
+                'min_ram': 1024,
+                'min_disk': 10,
+                'visibility': 'public',
+            }
+        )
+        models.Image.objects.create(
+            backend_id='1',
+            name='CentOS 7',
+            min_ram=1024,
+            min_disk=10240,
+            settings=self.fixture.openstack_service_settings,
+        )
+        models.Image.objects.create(
+            backend_id='2',
+            name='CentOS 6',
+            min_ram=2048,
+            min_disk=10240,
+            settings=self.fixture.openstack_service_settings,
+        )
+
+        result = self.backend.pull_images()
+
+        self.assertEqual((result.created, result.updated, result.deleted), (1, 0, 1))
+
     def test_private_images_are_filtered_out(self):
         self.mocked_glance().images.list.return_value[0]['visibility'] = 'private'
         self.backend.pull_images()
@@ -866,3 +896,48 @@ class PullServerGroupsTest(BaseBackendTestCase):
         self.call_backend(is_admin)
 
         self.assertRaises(models.ServerGroup.DoesNotExist, server_group.refresh_from_db)
+
+
+@ddt
+class PullSubresourcesTest(BaseBackendTestCase):
+    def setUp(self):
+        super().setUp()
+        self.mocked_neutron().list_security_groups.return_value = {
+            'security_groups': []
+        }
+        self.mocked_neutron().list_floatingips.return_value = {'floatingips': []}
+        self.mocked_neutron().list_networks.return_value = {
+            'networks': [
+                {
+                    'tenant_id': self.tenant.backend_id,
+                    'id': 'backend_id',
+                    'name': 'Private',
+                    'description': 'Internal network',
+                    'router:external': False,
+                    'status': 'DOWN',
+                }
+            ]
+        }
+        self.mocked_neutron().list_subnets.return_value = {'subnets': []}
+        self.mocked_neutron().list_routers.return_value = {'routers': []}
+        self.mocked_neutron().list_ports.return_value = {'ports': []}
+        self.mocked_nova().server_groups.list.return_value = []
+
+    @data(1, 4)
+    def test_subresources_are_pulled(self, max_workers):
+        settings = self.fixture.openstack_service_settings
+        settings.options['max_concurrent_pull_subresources'] = max_workers
+        settings.save()
+        port = self.fixture.port
+
+        self.backend.pull_subresources()
+
+        self.assertTrue(
+            models.Network.objects.filter(
+                tenant=self.tenant, backend_id='backend_id'
+            ).exists()
+        )
+        self.assertFalse(models.Port.objects.filter(id=port.id).exists())
+        self.mocked_neutron().list_ports.assert_called_once_with(
+            tenant_id=self.tenant.backend_id
+        )
@@ -1,3 +1,4 @@
+import collections
 import datetime
 import hashlib
 import json
@@ -5,11 +6,16 @@ import logging
 import os.path
 import re
 import tempfile
+import threading
+import time
 
+import requests
 from cinderclient import exceptions as cinder_exceptions
 from cinderclient.v3 import client as cinder_client
+from django.conf import settings
 from django.core.cache import cache
 from django.db import transaction
+from django.db.models import signals
 from django.utils import timezone
 from glanceclient import exc as glance_exceptions
 from glanceclient.v2 import client as glance_client
@@ -32,6 +38,16 @@ logger = logging.getLogger(__name__)
 VALID_VOLUME_TYPE_NAME_PATTERN = re.compile(r'^gigabytes_[a-z]+[-_a-z]+$')
 
 
+SESSION_EXPIRATION_MARGIN = datetime.timedelta(minutes=10)
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+CLIENT_POOL_STATS_INTERVAL = 5 * 60
+
+PropertiesSyncResult = collections.namedtuple(
+    'PropertiesSyncResult', ('created', 'updated', 'deleted')
+)
+
+
 def is_valid_volume_type_name(name):
     return re.match(VALID_VOLUME_TYPE_NAME_PATTERN, name)
 
@@ -55,12 +71,10 @@ class OpenStackSession(dict):
         self.keystone_session = ks_session
         if not self.keystone_session:
             auth_plugin = v3.Password(**credentials)
-            session = None
-            if not verify_ssl:
-                session = QuietSession()
-                session.verify = False
             self.keystone_session = keystone_session.Session(
-                auth=auth_plugin, verify=verify_ssl, session=session
+                auth=auth_plugin,
+                verify=verify_ssl,
+                session=create_http_session(verify_ssl),
             )
 
         try:
@@ -103,15 +117,31 @@ class OpenStackSession(dict):
         }
         auth_state = json.dumps(auth_data)
         auth_method.set_auth_state(auth_state)
-        ks_session = keystone_session.Session(auth=auth_method, verify=verify_ssl)
+        ks_session = keystone_session.Session(
+            auth=auth_method,
+            verify=verify_ssl,
+            session=create_http_session(verify_ssl),
+        )
         return cls(ks_session=ks_session)
 
     def validate(self):
-        if self.auth.auth_ref.expires > timezone.now() + datetime.timedelta(minutes=10):
+        if self.auth.auth_ref.expires > timezone.now() + SESSION_EXPIRATION_MARGIN:
             return True
 
         raise OpenStackSessionExpired('OpenStack session is expired')
 
+    def is_expiring(self):
+        """
+        Check if token of session expires soon. If expiration time
+        is not known, session is considered valid, because password
+        based authentication plugin renews token on its own.
+        """
+        auth_ref = getattr(self.auth, 'auth_ref', None)
+        expires = getattr(auth_ref, 'expires', None)
+        if not isinstance(expires, datetime.datetime):
+            return False
+        return expires <= timezone.now() + SESSION_EXPIRATION_MARGIN
+
     def __str__(self):
         return str({k: v if k != 'password' else '***' for k, v in self.items()})
 
@@ -196,6 +226,130 @@ def get_certificate_filename(data):
     return os.path.join(tempfile.gettempdir(), f'waldur-certificate-{cert_hash}.pem')
 
 
+_certificate_files = set()
+
+
+def get_certificate_file(data):
+    """
+    Store client certificate in temporary file and return its path.
+    File is written only once per process, atomic rename is used
+    so that concurrent processes never read partially written file.
+    """
+    file_path = get_certificate_filename(data)
+    if file_path in _certificate_files:
+        return file_path
+    if not os.path.isfile(file_path):
+        with tempfile.NamedTemporaryFile(
+            'w', dir=os.path.dirname(file_path), delete=False
+        ) as fh:
+            fh.write(data)
+        os.replace(fh.name, file_path)
+    _certificate_files.add(file_path)
+    return file_path
+
+
+def create_http_session(verify_ssl):
+    """
+    Create HTTP session with keep-alive connection pool
+    which is used by all OpenStack clients sharing the same keystone session.
+    """
+    session = requests.Session() if verify_ssl else QuietSession()
+    session.verify = verify_ssl
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class OpenStackClientPool:
+    """
+    Process-wide pool of OpenStack clients.
+    Pooled clients keep their keystone session and HTTP connections alive,
+    so that backends created by subsequent tasks in the same process
+    do not need to authenticate and establish TLS connections again.
+    Clients with token which expires soon are dropped from the pool.
+    When pool is full, least recently used client is evicted.
+    Statistics of the pool are logged periodically.
+    """
+
+    def __init__(self):
+        self._clients = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self._reported_at = time.monotonic()
+
+    @property
+    def max_size(self):
+        return settings.WALDUR_OPENSTACK['CLIENT_POOL_SIZE']
+
+    def get(self, key):
+        self._report_stats()
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                self.misses += 1
+                return None
+            if client.session.is_expiring():
+                del self._clients[key]
+                self.refreshes += 1
+                return None
+            self._clients.move_to_end(key)
+            self.hits += 1
+            return client
+
+    def put(self, key, client):
+        max_size = self.max_size
+        if max_size <= 0:
+            return
+        with self._lock:
+            self._clients[key] = client
+            self._clients.move_to_end(key)
+            while len(self._clients) > max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'size': len(self._clients),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'evictions': self.evictions,
+            }
+
+    def _report_stats(self):
+        now = time.monotonic()
+        if now - self._reported_at < CLIENT_POOL_STATS_INTERVAL:
+            return
+        self._reported_at = now
+        logger.info('OpenStack client pool statistics: %s', self.get_stats())
+
+
+client_pool = OpenStackClientPool()
+
+
+def get_client_pool_key(session_key, credentials):
+    """
+    Pool key includes all credentials, so that client is not reused
+    after settings which are not part of cached session key have been changed.
+    """
+    fingerprint = hashlib.sha256(
+        json.dumps(credentials, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+    return f'{session_key}_{fingerprint}'
+
+
 class BaseOpenStackBackend(ServiceBackend):
     def __init__(self, settings, tenant_id=None):
         self.settings = settings
@@ -206,11 +360,7 @@ class BaseOpenStackBackend(ServiceBackend):
         verify_ssl = self.settings.get_option('verify_ssl')
         client_cert = self.settings.get_option('certificate')
         if client_cert:
-            file_path = get_certificate_filename(client_cert)
-            if not os.path.isfile(file_path):
-                with open(file_path, 'w') as fh:
-                    fh.write(client_cert)
-            verify_ssl = file_path
+            verify_ssl = get_certificate_file(client_cert)
         credentials = {
             'auth_url': self.settings.backend_url,
             'username': self.settings.username,
@@ -228,24 +378,33 @@ class BaseOpenStackBackend(ServiceBackend):
         if not self.settings.uuid:
             return OpenStackClient(**credentials)
 
-        client = None
         attr_name = 'admin_session' if admin else 'session'
-        key = get_cached_session_key(self.settings, admin, self.tenant_id)
-        if hasattr(self, attr_name):  # try to get client from object
-            client = getattr(self, attr_name)
-        elif key in cache:  # try to get session from cache
-            session = cache.get(key)
-            # Cache miss is signified by a return value of None
-            if session is not None:
-                try:
-                    client = OpenStackClient(session=session, verify_ssl=verify_ssl)
-                except OpenStackBackendError:
-                    client = None
-
-        if client is None:  # create new token if session is not cached or expired
-            client = OpenStackClient(**credentials)
+        client = getattr(self, attr_name, None)  # try to get client from object
+
+        if client is None:
+            key = get_cached_session_key(self.settings, admin, self.tenant_id)
+            pool_key = get_client_pool_key(key, credentials)
+            client = client_pool.get(pool_key)  # try to get client from process pool
+
+            if client is None and key in cache:  # try to get session from cache
+                session = cache.get(key)
+                # Cache miss is signified by a return value of None
+                if session is not None:
+                    try:
+                        client = OpenStackClient(session=session, verify_ssl=verify_ssl)
+                    except OpenStackBackendError:
+                        client = None
+                if client is not None:
+                    client_pool.put(pool_key, client)
+
+            if client is None:  # create new token if session is not cached or expired
+                client = OpenStackClient(**credentials)
+                cache.set(
+                    key, dict(client.session), 10 * 60 * 60
+                )  # Add session to cache
+                client_pool.put(pool_key, client)
+
             setattr(self, attr_name, client)  # Cache client in the object
-            cache.set(key, dict(client.session), 10 * 60 * 60)  # Add session to cache
 
         if name:
             return getattr(client, name)
@@ -440,6 +599,78 @@ class BaseOpenStackBackend(ServiceBackend):
     def _get_current_properties(self, model):
         return {p.backend_id: p for p in model.objects.filter(settings=self.settings)}
 
+    def _sync_properties(self, model, backend_properties):
+        """
+        Synchronize service properties, such as flavors, images and volume types.
+        backend_properties is a dictionary where key is backend ID
+        and value is dictionary of field values.
+        Current rows are loaded using single query, only changed rows are updated
+        using bulk update, missing rows are created using bulk insert
+        and stale rows are deleted.
+        """
+        with transaction.atomic():
+            cur_properties = self._get_current_properties(model)
+            new_properties = []
+            changed_properties = []
+            changed_fields = set()
+
+            for backend_id, values in backend_properties.items():
+                prop = cur_properties.pop(backend_id, None)
+                if prop is None:
+                    new_properties.append(
+                        model(settings=self.settings, backend_id=backend_id, **values)
+                    )
+                    continue
+
+                fields = [
+                    field
+                    for field, value in values.items()
+                    if getattr(prop, field) != value
+                ]
+                if fields:
+                    for field in fields:
+                        setattr(prop, field, values[field])
+                    changed_properties.append(prop)
+                    changed_fields.update(fields)
+
+            if changed_properties:
+                model.objects.bulk_update(changed_properties, sorted(changed_fields))
+            if new_properties:
+                new_properties = model.objects.bulk_create(new_properties)
+            if cur_properties:
+                model.objects.filter(
+                    backend_id__in=cur_properties.keys(), settings=self.settings
+                ).delete()
+
+            # Bulk operations do not send signals, therefore they are sent explicitly.
+            for prop, created in [(prop, True) for prop in new_properties] + [
+                (prop, False) for prop in changed_properties
+            ]:
+                signals.post_save.send(
+                    sender=model,
+                    instance=prop,
+                    created=created,
+                    update_fields=None,
+                    raw=False,
+                    using=prop._state.db,
+                )
+
+        result = PropertiesSyncResult(
+            created=len(new_properties),
+            updated=len(changed_properties),
+            deleted=len(cur_properties),
+        )
+        logger.info(
+            'Pull of %s for service settings %s is completed. '
+            'Created: %s, updated: %s, deleted: %s.',
+            model._meta.verbose_name_plural,
+            self.settings,
+            result.created,
+            result.updated,
+            result.deleted,
+        )
+        return result
+
     def _pull_images(self, model_class, filter_function=None, admin=False):
         glance = self.get_client('glance', admin)
         try:
@@ -451,22 +682,17 @@ class BaseOpenStackBackend(ServiceBackend):
         if filter_function:
             images = list(filter(filter_function, images))
 
-        with transaction.atomic():
-            cur_images = self._get_current_properties(model_class)
-            for backend_image in images:
-                cur_images.pop(backend_image['id'], None)
-                model_class.objects.update_or_create(
-                    settings=self.settings,
-                    backend_id=backend_image['id'],
-                    defaults={
-                        'name': backend_image['name'],
-                        'min_ram': backend_image['min_ram'],
-                        'min_disk': self.gb2mb(backend_image['min_disk']),
-                    },
-                )
-            model_class.objects.filter(
-                backend_id__in=cur_images.keys(), settings=self.settings
-            ).delete()
+        return self._sync_properties(
+            model_class,
+            {
+                backend_image['id']: {
+                    'name': backend_image['name'],
+                    'min_ram': backend_image['min_ram'],
+                    'min_disk': self.gb2mb(backend_image['min_disk']),
+                }
+                for backend_image in images
+            },
+        )
 
     def _delete_backend_floating_ip(self, backend_id, tenant_backend_id):
         neutron = self.neutron_client
@@ -1,5 +1,5 @@
 import pickle  # noqa: S403
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from cinderclient import exceptions as cinder_exceptions
 from ddt import data, ddt
@@ -8,7 +8,10 @@ from keystoneclient import exceptions as keystone_exceptions
 from neutronclient.client import exceptions as neutron_exceptions
 from novaclient import exceptions as nova_exceptions
 
-from waldur_openstack.openstack_base.backend import OpenStackBackendError
+from waldur_openstack.openstack_base.backend import (
+    OpenStackBackendError,
+    OpenStackClientPool,
+)
 
 
 @ddt
@@ -36,3 +39,41 @@ class TestOpenStackBackendError(TestCase):
             pickle.loads(pickle.dumps(exc))  # noqa: S301
         except Exception as e:
             self.fail('Reraised exception is not serializable: %s' % str(e))
+
+
+@mock.patch.object(
+    OpenStackClientPool, 'max_size', new_callable=mock.PropertyMock, return_value=2
+)
+class OpenStackClientPoolTest(TestCase):
+    def setUp(self):
+        self.pool = OpenStackClientPool()
+
+    def get_client(self, is_expiring=False):
+        return mock.Mock(session=mock.Mock(is_expiring=lambda: is_expiring))
+
+    def test_pooled_client_is_reused(self, max_size):
+        client = self.get_client()
+        self.assertIsNone(self.pool.get('key'))
+        self.pool.put('key', client)
+
+        self.assertEqual(self.pool.get('key'), client)
+        self.assertEqual(self.pool.get_stats()['hits'], 1)
+        self.assertEqual(self.pool.get_stats()['misses'], 1)
+
+    def test_least_recently_used_client_is_evicted(self, max_size):
+        self.pool.put('first', self.get_client())
+        self.pool.put('second', self.get_client())
+        self.pool.get('first')
+        self.pool.put('third', self.get_client())
+
+        self.assertIsNone(self.pool.get('second'))
+        self.assertIsNotNone(self.pool.get('first'))
+        self.assertEqual(self.pool.get_stats()['evictions'], 1)
+        self.assertEqual(self.pool.get_stats()['size'], 2)
+
+    def test_client_with_expiring_token_is_refreshed(self, max_size):
+        self.pool.put('key', self.get_client(is_expiring=True))
+
+        self.assertIsNone(self.pool.get('key'))
+        self.assertEqual(self.pool.get_stats()['refreshes'], 1)
+        self.assertEqual(self.pool.get_stats()['size'], 0)
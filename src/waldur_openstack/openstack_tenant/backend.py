@@ -1,3 +1,4 @@
+import collections
 import logging
 import re
 
@@ -13,11 +14,7 @@ from novaclient import exceptions as nova_exceptions
 
 from waldur_core.structure.backend import log_backend_action
 from waldur_core.structure.registry import get_resource_type
-from waldur_core.structure.utils import (
-    handle_resource_not_found,
-    handle_resource_update_success,
-    update_pulled_fields,
-)
+from waldur_core.structure.utils import reconcile_resources, update_pulled_fields
 from waldur_openstack.openstack_base.backend import (
     BaseOpenStackBackend,
     OpenStackBackendError,
@@ -196,6 +193,7 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
         'console_type': 'novnc',
         'verify_ssl': False,
     }
+    CINDER_PAGE_SIZE = 1000
 
     def __init__(self, settings):
         super().__init__(settings, settings.options['tenant_id'])
@@ -233,16 +231,12 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
             backend_volume.backend_id: backend_volume
             for backend_volume in backend_volumes
         }
-        for volume in volumes:
-            try:
-                backend_volume = backend_volumes_map[volume.backend_id]
-            except KeyError:
-                handle_resource_not_found(volume)
-            else:
-                update_pulled_fields(
-                    volume, backend_volume, models.Volume.get_backend_fields()
-                )
-                handle_resource_update_success(volume)
+        reconcile_resources(
+            models.Volume,
+            volumes,
+            backend_volumes_map,
+            lambda volume, backend_volume: models.Volume.get_backend_fields(),
+        )
 
     def pull_snapshots(self):
         backend_snapshots = self.get_snapshots()
@@ -254,16 +248,12 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
             backend_snapshot.backend_id: backend_snapshot
             for backend_snapshot in backend_snapshots
         }
-        for snapshot in snapshots:
-            try:
-                backend_snapshot = backend_snapshots_map[snapshot.backend_id]
-            except KeyError:
-                handle_resource_not_found(snapshot)
-            else:
-                update_pulled_fields(
-                    snapshot, backend_snapshot, models.Snapshot.get_backend_fields()
-                )
-                handle_resource_update_success(snapshot)
+        reconcile_resources(
+            models.Snapshot,
+            snapshots,
+            backend_snapshots_map,
+            lambda snapshot, backend_snapshot: models.Snapshot.get_backend_fields(),
+        )
 
     def pull_instances(self):
         backend_instances = self.get_instances()
@@ -275,25 +265,24 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
             backend_instance.backend_id: backend_instance
             for backend_instance in backend_instances
         }
-        for instance in instances:
-            try:
-                backend_instance = backend_instances_map[instance.backend_id]
-            except KeyError:
-                handle_resource_not_found(instance)
-            else:
-                self.update_instance_fields(instance, backend_instance)
-                # XXX: can be optimized after https://goo.gl/BZKo8Y will be resolved.
-                self.pull_instance_security_groups(instance)
-                handle_resource_update_success(instance)
+        existing_instances = reconcile_resources(
+            models.Instance,
+            instances,
+            backend_instances_map,
+            self.get_instance_pulled_fields,
+        )
+        self.pull_instances_security_groups(existing_instances)
 
-    def update_instance_fields(self, instance, backend_instance):
+    def get_instance_pulled_fields(self, instance, backend_instance):
         # Preserve flavor fields in Waldur database if flavor is deleted in OpenStack
         fields = set(models.Instance.get_backend_fields())
         flavor_fields = {'flavor_name', 'flavor_disk', 'ram', 'cores', 'disk'}
         if not backend_instance.flavor_name:
             fields = fields - flavor_fields
-        fields = list(fields)
+        return list(fields)
 
+    def update_instance_fields(self, instance, backend_instance):
+        fields = self.get_instance_pulled_fields(instance, backend_instance)
         update_pulled_fields(instance, backend_instance, fields)
 
     def pull_flavors(self):
@@ -307,38 +296,30 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
         name_pattern = (
             re.compile(flavor_exclude_regex) if flavor_exclude_regex else None
         )
-        with transaction.atomic():
-            cur_flavors = self._get_current_properties(models.Flavor)
-            for backend_flavor in flavors:
-                if (
-                    name_pattern is not None
-                    and name_pattern.match(backend_flavor.name) is not None
-                ):
-                    logger.debug(
-                        'Skipping pull of %s flavor as it matches %s regex pattern.',
-                        backend_flavor.name,
-                        flavor_exclude_regex,
-                    )
-                    continue
-
-                cur_flavors.pop(backend_flavor.id, None)
-                models.Flavor.objects.update_or_create(
-                    settings=self.settings,
-                    backend_id=backend_flavor.id,
-                    defaults={
-                        'name': backend_flavor.name,
-                        'cores': backend_flavor.vcpus,
-                        'ram': backend_flavor.ram,
-                        'disk': self.gb2mb(backend_flavor.disk),
-                    },
+        backend_flavors = {}
+        for backend_flavor in flavors:
+            if (
+                name_pattern is not None
+                and name_pattern.match(backend_flavor.name) is not None
+            ):
+                logger.debug(
+                    'Skipping pull of %s flavor as it matches %s regex pattern.',
+                    backend_flavor.name,
+                    flavor_exclude_regex,
                 )
+                continue
 
-            models.Flavor.objects.filter(
-                backend_id__in=cur_flavors.keys(), settings=self.settings
-            ).delete()
+            backend_flavors[backend_flavor.id] = {
+                'name': backend_flavor.name,
+                'cores': backend_flavor.vcpus,
+                'ram': backend_flavor.ram,
+                'disk': self.gb2mb(backend_flavor.disk),
+            }
+
+        return self._sync_properties(models.Flavor, backend_flavors)
 
     def pull_images(self):
-        self._pull_images(models.Image)
+        return self._pull_images(models.Image)
 
     def pull_floating_ips(self):
         # method assumes that instance internal IPs is up to date.
@@ -931,6 +912,46 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
                 volume.runtime_state = backend_volume.status
                 volume.save(update_fields=['runtime_state'])
 
+    def _list_all_pages(self, manager):
+        """
+        Cinder API returns limited number of items per request,
+        therefore items are listed page by page.
+        """
+        items = []
+        marker = None
+        while True:
+            page = manager.list(marker=marker, limit=self.CINDER_PAGE_SIZE)
+            if not page:
+                return items
+            items.extend(page)
+            marker = page[-1].id
+
+    def pull_volumes_runtime_state(self, volumes):
+        """
+        Refresh runtime state of many volumes using paginated list call.
+        Missing volumes are skipped, they are handled by polling of each volume.
+        Returns list of refreshed volumes.
+        """
+        cinder = self.cinder_client
+        try:
+            backend_volumes = {
+                backend_volume.id: backend_volume
+                for backend_volume in self._list_all_pages(cinder.volumes)
+            }
+        except cinder_exceptions.ClientException as e:
+            raise OpenStackBackendError(e)
+
+        pulled_volumes = []
+        for volume in volumes:
+            backend_volume = backend_volumes.get(volume.backend_id)
+            if not backend_volume:
+                continue
+            pulled_volumes.append(volume)
+            if backend_volume.status != volume.runtime_state:
+                volume.runtime_state = backend_volume.status
+                volume.save(update_fields=['runtime_state'])
+        return pulled_volumes
+
     @log_backend_action('check is volume deleted')
     def is_volume_deleted(self, volume):
         cinder = self.cinder_client
@@ -1035,6 +1056,32 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
             snapshot.save(update_fields=['runtime_state'])
         return snapshot
 
+    def pull_snapshots_runtime_state(self, snapshots):
+        """
+        Refresh runtime state of many snapshots using single list call.
+        Missing snapshots are skipped, they are handled by polling of each snapshot.
+        Returns list of refreshed snapshots.
+        """
+        cinder = self.cinder_client
+        try:
+            backend_snapshots = {
+                backend_snapshot.id: backend_snapshot
+                for backend_snapshot in self._list_all_pages(cinder.volume_snapshots)
+            }
+        except cinder_exceptions.ClientException as e:
+            raise OpenStackBackendError(e)
+
+        pulled_snapshots = []
+        for snapshot in snapshots:
+            backend_snapshot = backend_snapshots.get(snapshot.backend_id)
+            if not backend_snapshot:
+                continue
+            pulled_snapshots.append(snapshot)
+            if backend_snapshot.status != snapshot.runtime_state:
+                snapshot.runtime_state = backend_snapshot.status
+                snapshot.save(update_fields=['runtime_state'])
+        return pulled_snapshots
+
     @log_backend_action()
     def delete_snapshot(self, snapshot):
         cinder = self.cinder_client
@@ -1999,6 +2046,79 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
             else:
                 instance.security_groups.add(security_group)
 
+    def get_instances_security_groups(self):
+        """
+        Fetch all Neutron ports of the current tenant using single request.
+        Returns dictionary where key is backend ID of instance
+        and value is set of backend IDs of its security groups.
+        """
+        neutron = self.neutron_client
+        try:
+            ports = neutron.list_ports(tenant_id=self.tenant_id)['ports']
+        except neutron_exceptions.NeutronClientException as e:
+            raise OpenStackBackendError(e)
+
+        result = collections.defaultdict(set)
+        for port in ports:
+            if port.get('device_id'):
+                result[port['device_id']].update(port.get('security_groups', []))
+        return result
+
+    def pull_instances_security_groups(self, instances):
+        """
+        Synchronize security groups of all given instances
+        using single backend request and constant number of queries.
+        """
+        if not instances:
+            return
+
+        backend_groups_map = self.get_instances_security_groups()
+        security_groups_map = {
+            security_group.backend_id: security_group
+            for security_group in models.SecurityGroup.objects.filter(
+                settings=self.settings
+            ).exclude(backend_id='')
+        }
+        Through = models.Instance.security_groups.through
+        current_links = Through.objects.filter(instance__in=instances).exclude(
+            securitygroup__backend_id=''
+        )
+
+        current_groups_map = collections.defaultdict(set)
+        stale_link_ids = []
+        instances_map = {instance.id: instance for instance in instances}
+        for link_id, instance_id, group_backend_id in current_links.values_list(
+            'id', 'instance_id', 'securitygroup__backend_id'
+        ):
+            backend_instance_id = instances_map[instance_id].backend_id
+            if group_backend_id in backend_groups_map.get(backend_instance_id, ()):
+                current_groups_map[instance_id].add(group_backend_id)
+            else:
+                stale_link_ids.append(link_id)
+
+        new_links = []
+        for instance in instances:
+            backend_ids = backend_groups_map.get(instance.backend_id, set())
+            for group_id in backend_ids - current_groups_map[instance.id]:
+                security_group = security_groups_map.get(group_id)
+                if not security_group:
+                    logger.warning(
+                        'Security group with id %s does not exist in database. '
+                        'Settings ID: %s',
+                        group_id,
+                        self.settings.id,
+                    )
+                    continue
+                new_links.append(
+                    Through(instance_id=instance.id, securitygroup_id=security_group.id)
+                )
+
+        with transaction.atomic():
+            if stale_link_ids:
+                Through.objects.filter(id__in=stale_link_ids).delete()
+            if new_links:
+                Through.objects.bulk_create(new_links)
+
     @log_backend_action()
     def push_instance_security_groups(self, instance):
         nova = self.nova_client
@@ -2130,6 +2250,40 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
                 instance.error_message = error_message
                 instance.save(update_fields=['error_message'])
 
+    def pull_instances_runtime_state(self, instances):
+        """
+        Refresh runtime state of many instances using single list call.
+        Missing instances are skipped, they are handled by polling of each instance.
+        Returns list of refreshed instances.
+        """
+        nova = self.nova_client
+        try:
+            backend_instances = {
+                backend_instance.id: backend_instance
+                for backend_instance in nova.servers.list()
+            }
+        except nova_exceptions.ClientException as e:
+            raise OpenStackBackendError(e)
+
+        pulled_instances = []
+        for instance in instances:
+            backend_instance = backend_instances.get(instance.backend_id)
+            if not backend_instance:
+                continue
+            pulled_instances.append(instance)
+            update_fields = []
+            if backend_instance.status != instance.runtime_state:
+                instance.runtime_state = backend_instance.status
+                update_fields.append('runtime_state')
+            if hasattr(backend_instance, 'fault'):
+                error_message = backend_instance.fault['message']
+                if instance.error_message != error_message:
+                    instance.error_message = error_message
+                    update_fields.append('error_message')
+            if update_fields:
+                instance.save(update_fields=update_fields)
+        return pulled_instances
+
     @log_backend_action()
     def confirm_instance_resize(self, instance):
         nova = self.nova_client
@@ -2162,9 +2316,6 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
         except nova_exceptions.ClientException as e:
             raise OpenStackBackendError(e)
 
-    def _get_current_volume_types(self):
-        return self._get_current_properties(models.VolumeType)
-
     def pull_volume_types(self):
         try:
             volume_types = self.cinder_client.volume_types.list()
@@ -2179,23 +2330,17 @@ class OpenStackTenantBackend(BaseOpenStackBackend):
         except cinder_exceptions.ClientException as e:
             raise OpenStackBackendError(e)
 
-        with transaction.atomic():
-            cur_volume_types = self._get_current_volume_types()
-            for backend_type in volume_types:
-                cur_volume_types.pop(backend_type.id, None)
-                models.VolumeType.objects.update_or_create(
-                    settings=self.settings,
-                    backend_id=backend_type.id,
-                    defaults={
-                        'name': backend_type.name,
-                        'description': backend_type.description or '',
-                        'is_default': backend_type.id == default_volume_type_id,
-                    },
-                )
-
-            models.VolumeType.objects.filter(
-                backend_id__in=cur_volume_types.keys(), settings=self.settings
-            ).delete()
+        return self._sync_properties(
+            models.VolumeType,
+            {
+                backend_type.id: {
+                    'name': backend_type.name,
+                    'description': backend_type.description or '',
+                    'is_default': backend_type.id == default_volume_type_id,
+                }
+                for backend_type in volume_types
+            },
+        )
 
     def pull_volume_availability_zones(self):
         if not self.is_volume_availability_zone_supported():
@@ -43,6 +43,11 @@ class OpenStackTenantExtension(WaldurExtension):
                 'schedule': timedelta(minutes=10),
                 'args': (),
             },
+            'openstacktenant-pull-transitional-runtime-states': {
+                'task': 'openstack_tenant.PullTransitionalRuntimeStates',
+                'schedule': timedelta(seconds=15),
+                'args': (),
+            },
         }
 
     @staticmethod
@@ -17,6 +17,7 @@ from rest_framework.reverse import reverse
 from waldur_core.core import serializers as core_serializers
 from waldur_core.core import signals as core_signals
 from waldur_core.core import utils as core_utils
+from waldur_core.quotas import models as quotas_models
 from waldur_core.structure import models as structure_models
 from waldur_core.structure import serializers as structure_serializers
 from waldur_core.structure.permissions import _has_admin_access
@@ -389,16 +390,16 @@ class VolumeExtendSerializer(serializers.Serializer):
     def update(self, instance: models.Volume, validated_data):
         new_size = validated_data['disk_size']
 
-        for quota_holder in instance.get_quota_scopes():
-            if not quota_holder:
-                continue
-            quota_holder.add_quota_usage(
-                'storage', new_size - instance.size, validate=True
-            )
-            if instance.type:
-                key = 'gigabytes_' + instance.type.name
-                delta = (new_size - instance.size) / 1024
-                quota_holder.add_quota_usage(key, delta, validate=True)
+        quota_holders = [
+            quota_holder for quota_holder in instance.get_quota_scopes() if quota_holder
+        ]
+        quota_deltas = {'storage': new_size - instance.size}
+        if instance.type:
+            key = 'gigabytes_' + instance.type.name
+            quota_deltas[key] = (new_size - instance.size) / 1024
+        quotas_models.validate_quota_changes(quota_holders, quota_deltas)
+        for quota_holder in quota_holders:
+            quota_holder.apply_quota_usage(quota_deltas)
 
         instance.size = new_size
         instance.save(update_fields=['size'])
@@ -486,15 +487,16 @@ class VolumeRetypeSerializer(serializers.HyperlinkedModelSerializer):
         old_type = instance.type
         new_type = validated_data.get('type')
 
-        for quota_holder in instance.get_quota_scopes():
-            if not quota_holder:
-                continue
-            quota_holder.add_quota_usage(
-                'gigabytes_' + old_type.name, -1 * instance.size / 1024, validate=True
-            )
-            quota_holder.add_quota_usage(
-                'gigabytes_' + new_type.name, instance.size / 1024, validate=True
-            )
+        quota_holders = [
+            quota_holder for quota_holder in instance.get_quota_scopes() if quota_holder
+        ]
+        quota_deltas = {
+            'gigabytes_' + old_type.name: -1 * instance.size / 1024,
+            'gigabytes_' + new_type.name: instance.size / 1024,
+        }
+        quotas_models.validate_quota_changes(quota_holders, quota_deltas)
+        for quota_holder in quota_holders:
+            quota_holder.apply_quota_usage(quota_deltas)
 
         return super().update(instance, validated_data)
 
@@ -1407,13 +1409,13 @@ class InstanceFlavorChangeSerializer(serializers.Serializer):
         if settings.scope:
             quota_holders.append(settings.scope)
 
+        quota_deltas = {
+            'ram': flavor.ram - instance.ram,
+            'vcpu': flavor.cores - instance.cores,
+        }
+        quotas_models.validate_quota_changes(quota_holders, quota_deltas)
         for quota_holder in quota_holders:
-            quota_holder.add_quota_usage(
-                'ram', flavor.ram - instance.ram, validate=True
-            )
-            quota_holder.add_quota_usage(
-                'vcpu', flavor.cores - instance.cores, validate=True
-            )
+            quota_holder.apply_quota_usage(quota_deltas)
 
         instance.ram = flavor.ram
         instance.cores = flavor.cores
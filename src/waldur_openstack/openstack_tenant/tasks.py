@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 
 from django.conf import settings
 from django.db import transaction
@@ -10,6 +11,7 @@ from waldur_core.core import tasks as core_tasks
 from waldur_core.quotas import exceptions as quotas_exceptions
 from waldur_core.structure import tasks as structure_tasks
 from waldur_core.structure.registry import get_resource_type
+from waldur_openstack.openstack_base.backend import OpenStackBackendError
 
 from . import log, models, serializers
 
@@ -155,9 +157,6 @@ class BaseScheduleTask(core_tasks.BackgroundTask):
     model = NotImplemented
     resource_attribute = NotImplemented
 
-    def is_equal(self, other_task):
-        return self.name == other_task.get('name')
-
     @transaction.atomic()
     def run(self):
         schedules = self.model.objects.filter(
@@ -300,9 +299,6 @@ class ScheduleBackups(BaseScheduleTask):
 class BaseDeleteExpiredResourcesTask(core_tasks.BackgroundTask):
     model = NotImplemented
 
-    def is_equal(self, other_task):
-        return self.name == other_task.get('name')
-
     def _get_executor(self):
         raise NotImplementedError()
 
@@ -383,6 +379,50 @@ class DeleteExpiredSnapshots(BaseDeleteExpiredResourcesTask):
         return executors.SnapshotDeleteExecutor
 
 
+class PullTransitionalRuntimeStates(core_tasks.BackgroundTask):
+    """
+    Refresh runtime state of resources which are being provisioned or updated
+    using single list call per tenant. Meanwhile polling tasks of resources
+    found in the list use runtime state stored in database instead of calling backend.
+    """
+
+    name = 'openstack_tenant.PullTransitionalRuntimeStates'
+    batch_poll_timeout = 30
+
+    def get_pulled_models(self):
+        return (
+            (models.Instance, 'pull_instances_runtime_state'),
+            (models.Volume, 'pull_volumes_runtime_state'),
+            (models.Snapshot, 'pull_snapshots_runtime_state'),
+        )
+
+    def run(self):
+        States = core_models.StateMixin.States
+        for model, backend_method in self.get_pulled_models():
+            resources = (
+                model.objects.filter(state__in=(States.CREATING, States.UPDATING))
+                .exclude(backend_id='')
+                .select_related('service_settings')
+            )
+            resources_by_settings = defaultdict(list)
+            for resource in resources:
+                resources_by_settings[resource.service_settings].append(resource)
+
+            for service_settings, items in resources_by_settings.items():
+                backend = service_settings.get_backend()
+                try:
+                    pulled_items = getattr(backend, backend_method)(items)
+                except OpenStackBackendError as e:
+                    logger.warning(
+                        'Unable to pull runtime state of %s for service settings %s. Error: %s',
+                        model.__name__,
+                        service_settings,
+                        e,
+                    )
+                    continue
+                core_tasks.mark_batch_polled(pulled_items, self.batch_poll_timeout)
+
+
 class LimitedPerTypeThrottleMixin:
     def get_limit(self, resource):
         nc_settings = getattr(settings, 'WALDUR_OPENSTACK_TENANT', {})
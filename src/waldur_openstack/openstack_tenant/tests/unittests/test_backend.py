@@ -668,6 +668,48 @@ class PullVolumeTest(BaseBackendTest):
         self.assertEqual(volume.image, None)
 
 
+class PullVolumesRuntimeStateTest(BaseBackendTest):
+    def test_volumes_are_listed_page_by_page_and_missing_volumes_are_skipped(self):
+        first_volume = factories.VolumeFactory(
+            backend_id='first_volume_id',
+            runtime_state='creating',
+            service_settings=self.settings,
+            project=self.fixture.project,
+        )
+        second_volume = factories.VolumeFactory(
+            backend_id='second_volume_id',
+            runtime_state='creating',
+            service_settings=self.settings,
+            project=self.fixture.project,
+        )
+        missing_volume = factories.VolumeFactory(
+            backend_id='missing_volume_id',
+            runtime_state='creating',
+            service_settings=self.settings,
+            project=self.fixture.project,
+        )
+        self.cinder_client_mock.volumes.list.side_effect = [
+            [mock.Mock(id='first_volume_id', status='available')],
+            [mock.Mock(id='second_volume_id', status='error')],
+            [],
+        ]
+
+        pulled_volumes = self.tenant_backend.pull_volumes_runtime_state(
+            [first_volume, second_volume, missing_volume]
+        )
+
+        self.assertEqual(pulled_volumes, [first_volume, second_volume])
+        self.cinder_client_mock.volumes.list.assert_called_with(
+            marker='second_volume_id', limit=self.tenant_backend.CINDER_PAGE_SIZE
+        )
+        first_volume.refresh_from_db()
+        second_volume.refresh_from_db()
+        missing_volume.refresh_from_db()
+        self.assertEqual(first_volume.runtime_state, 'available')
+        self.assertEqual(second_volume.runtime_state, 'error')
+        self.assertEqual(missing_volume.runtime_state, 'creating')
+
+
 class PullInstanceAvailabilityZonesTest(BaseBackendTest):
     def test_default_zone_is_not_pulled(self):
         self.nova_client_mock.availability_zones.list.return_value = [
@@ -1354,3 +1396,82 @@ class CreateInstanceTest(VolumesBaseTest):
         # Assert
         kwargs = self.nova_client_mock.servers.create.mock_calls[0][2]
         self.assertEqual(kwargs['availability_zone'], 'default_availability_zone')
+
+
+class PullResourcesTest(BaseBackendTest):
+    def get_backend_copy(self, resource):
+        return resource.__class__.objects.get(pk=resource.pk)
+
+    def test_only_changed_volumes_are_updated(self):
+        changed_volume = self.fixture.volume
+        unchanged_volume = factories.VolumeFactory(
+            project=self.fixture.project,
+            service_settings=self.settings,
+            state=models.Volume.States.OK,
+        )
+        backend_volume = self.get_backend_copy(changed_volume)
+        backend_volume.name = 'new-name'
+        self.tenant_backend.get_volumes = mock.Mock(
+            return_value=[backend_volume, self.get_backend_copy(unchanged_volume)]
+        )
+
+        with mock.patch('django.db.models.signals.post_save.send') as mocked_send:
+            self.tenant_backend.pull_volumes()
+
+        changed_volume.refresh_from_db()
+        self.assertEqual(changed_volume.name, 'new-name')
+        self.assertEqual(
+            [call.kwargs['instance'] for call in mocked_send.call_args_list],
+            [changed_volume],
+        )
+
+    def test_missing_volume_is_marked_as_erred(self):
+        volume = self.fixture.volume
+        self.tenant_backend.get_volumes = mock.Mock(return_value=[])
+
+        self.tenant_backend.pull_volumes()
+
+        volume.refresh_from_db()
+        self.assertEqual(volume.state, models.Volume.States.ERRED)
+        self.assertEqual(volume.runtime_state, '')
+        self.assertEqual(volume.error_message, 'Does not exist at backend.')
+
+    def test_erred_volume_is_recovered(self):
+        volume = self.fixture.volume
+        volume.state = models.Volume.States.ERRED
+        volume.error_message = 'Does not exist at backend.'
+        volume.save()
+        self.tenant_backend.get_volumes = mock.Mock(
+            return_value=[self.get_backend_copy(volume)]
+        )
+
+        self.tenant_backend.pull_volumes()
+
+        volume.refresh_from_db()
+        self.assertEqual(volume.state, models.Volume.States.OK)
+        self.assertEqual(volume.error_message, '')
+
+    def test_security_groups_of_instances_are_fetched_once_per_tenant(self):
+        instance = self.fixture.instance
+        stale_group = factories.SecurityGroupFactory(settings=self.settings)
+        new_group = factories.SecurityGroupFactory(settings=self.settings)
+        instance.security_groups.add(stale_group)
+        self.tenant_backend.get_instances = mock.Mock(
+            return_value=[self.get_backend_copy(instance)]
+        )
+        self.neutron_client_mock.list_ports.return_value = {
+            'ports': [
+                {
+                    'device_id': instance.backend_id,
+                    'security_groups': [new_group.backend_id],
+                }
+            ]
+        }
+
+        self.tenant_backend.pull_instances()
+
+        self.assertEqual(list(instance.security_groups.all()), [new_group])
+        self.neutron_client_mock.list_ports.assert_called_once_with(
+            tenant_id=self.tenant_backend.tenant_id
+        )
+        self.nova_client_mock.servers.list_security_group.assert_not_called()
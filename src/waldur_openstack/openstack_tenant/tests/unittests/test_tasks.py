@@ -7,6 +7,7 @@ from django.test import TestCase
 from django.utils import timezone
 from freezegun import freeze_time
 
+from waldur_core.core import tasks as core_tasks
 from waldur_openstack.openstack import models as openstack_models
 from waldur_openstack.openstack_tenant import models, tasks
 
@@ -340,3 +341,39 @@ class SnapshotScheduleTaskTest(TestCase):
             'event_type'
         ]
         self.assertEqual(event_type, 'resource_snapshot_schedule_deactivated')
+
+
+class PullTransitionalRuntimeStatesTest(TestCase):
+    def setUp(self):
+        self.instance = factories.InstanceFactory(
+            state=models.Instance.States.CREATING,
+            runtime_state='BUILD',
+            backend_id='instance_id',
+        )
+        self.ok_instance = factories.InstanceFactory(
+            state=models.Instance.States.OK,
+            service_settings=self.instance.service_settings,
+            backend_id='ok_instance_id',
+        )
+
+    @mock.patch('waldur_core.structure.models.ServiceSettings.get_backend')
+    def test_runtime_state_of_tenant_instances_is_pulled_with_single_call(
+        self, get_backend_mock
+    ):
+        backend = get_backend_mock.return_value
+        backend.pull_instances_runtime_state.return_value = [self.instance]
+        tasks.PullTransitionalRuntimeStates().run()
+
+        backend.pull_instances_runtime_state.assert_called_once_with([self.instance])
+        self.assertTrue(core_tasks.is_batch_polled(self.instance))
+
+    @mock.patch('waldur_core.structure.models.ServiceSettings.get_backend')
+    def test_resources_which_are_not_pulled_are_still_polled_individually(
+        self, get_backend_mock
+    ):
+        backend = get_backend_mock.return_value
+        backend.pull_instances_runtime_state.return_value = []
+        tasks.PullTransitionalRuntimeStates().run()
+
+        self.assertFalse(core_tasks.is_batch_polled(self.instance))
+        self.assertFalse(core_tasks.is_batch_polled(self.ok_instance))
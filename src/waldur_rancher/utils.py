@@ -9,6 +9,7 @@ from rest_framework import serializers
 
 from waldur_core.core.models import User
 from waldur_core.quotas import exceptions as quotas_exceptions
+from waldur_core.quotas import models as quotas_models
 from waldur_core.structure.models import ProjectRole, ServiceSettings
 from waldur_openstack.openstack_tenant import models as openstack_tenant_models
 from waldur_openstack.openstack_tenant.views import InstanceViewSet
@@ -214,26 +215,21 @@ def validate_quotas(nodes, tenant_settings, project):
         project.customer,
         tenant_settings,
     ]
-    for quota_name in ['storage', 'vcpu', 'ram']:
-        requested = sum(get_node_quota(quota_name, node) for node in nodes)
-
-        for source in quota_sources:
-            try:
-                limit = source.get_quota_limit(quota_name)
-                usage = source.get_quota_usage(quota_name)
-                if limit != -1 and (usage + requested > limit):
-                    raise quotas_exceptions.QuotaValidationError(
-                        _(
-                            '"%(name)s" quota is over limit. Required: %(usage)s, limit: %(limit)s.'
-                        )
-                        % dict(
-                            name=quota_name,
-                            usage=usage + requested,
-                            limit=limit,
-                        )
-                    )
-            except ObjectDoesNotExist:
-                pass
+    quota_deltas = {
+        quota_name: sum(get_node_quota(quota_name, node) for node in nodes)
+        for quota_name in ['storage', 'vcpu', 'ram']
+    }
+    violations = quotas_models.get_quota_violations(quota_sources, quota_deltas)
+    if violations:
+        violation = violations[0]
+        raise quotas_exceptions.QuotaValidationError(
+            _('"%(name)s" quota is over limit. Required: %(usage)s, limit: %(limit)s.')
+            % dict(
+                name=violation.name,
+                usage=violation.required,
+                limit=violation.limit,
+            )
+        )
 
 
 def get_node_quota(quota_name, node):
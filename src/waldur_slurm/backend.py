@@ -31,18 +31,37 @@ class SlurmBackend(ServiceBackend):
             port=settings.options.get('port', 22),
             key_path=django_settings.WALDUR_SLURM['PRIVATE_KEY_PATH'],
             use_sudo=settings.options.get('use_sudo', False),
+            control_persist=django_settings.WALDUR_SLURM['SSH_CONTROL_PERSIST'],
         )
 
     def pull_resources(self):
-        for allocation in self.get_allocation_queryset().filter(
-            state=models.Allocation.States.OK
-        ):
+        """
+        Usage report and associations are fetched once for all allocations
+        of the cluster and applied to each allocation.
+        """
+        allocations = list(self.get_allocation_queryset())
+        accounts = [
+            allocation.backend_id
+            for allocation in allocations
+            if allocation.backend_id.strip()
+        ]
+        report = {}
+        associations = {}
+        if accounts:
+            report = self.get_usage_report(accounts)
+            associations = self.get_associations(accounts)
+
+        for allocation in allocations:
+            if allocation.state != models.Allocation.States.OK:
+                usage = report.get(allocation.backend_id)
+                if usage:
+                    self._update_quotas(allocation, usage)
+                continue
             try:
                 logger.debug('About to pull allocation %s', allocation)
-                self.pull_allocation(allocation)
+                self.pull_allocation(allocation, report, associations)
             except Exception as e:
                 logger.error('Error while pulling allocation [%s]: %s', allocation, e)
-            self.sync_usage()
 
     def ping(self, raise_exception=False):
         try:
@@ -54,47 +73,93 @@ class SlurmBackend(ServiceBackend):
         else:
             return True
 
-    def sync_users(self, allocation):
+    def sync_users(self, allocation, all_backend_usernames=None):
+        """
+        Associations are created and deleted in one round trip per allocation.
+        If list of usernames associated with allocation account is provided,
+        it is used instead of querying backend.
+        """
+        account = allocation.backend_id
+
+        if not account.strip():
+            raise ServiceBackendError(f'Empty backend_id for allocation: {allocation}')
+
+        if all_backend_usernames is None:
+            all_backend_usernames = self.client.list_account_users(account)
+
         users = allocation.project.get_users()
-        profiles = freeipa_models.Profile.objects.filter(user__in=users)
+        profiles = list(freeipa_models.Profile.objects.filter(user__in=users))
+        associated_usernames = {username.lower() for username in all_backend_usernames}
+        new_usernames = [
+            profile.username.lower()
+            for profile in profiles
+            if profile.username.lower() not in associated_usernames
+        ]
+        default_account = self.settings.options.get('default_account')
+        errors = self.client.create_associations(
+            new_usernames, account, default_account
+        )
+
         for profile in profiles:
-            succeeded = self.add_user(
-                allocation, profile.user, profile.username.lower()
-            )
-            if succeeded:
-                models.Association.objects.get_or_create(
+            username = profile.username.lower()
+            if username in new_usernames:
+                if username in errors:
+                    logger.error(
+                        'Unable to create association in Slurm: %s', errors[username]
+                    )
+                    continue
+                logger.info(
+                    'Association between %s and %s has been created', username, account
+                )
+                signals.slurm_association_created.send(
+                    models.Allocation,
                     allocation=allocation,
-                    username=profile.username,
+                    user=profile.user,
+                    username=username,
                 )
+            models.Association.objects.get_or_create(
+                allocation=allocation,
+                username=profile.username,
+            )
 
-        all_backend_usernames = self.client.list_account_users(allocation.backend_id)
         backend_usernames = freeipa_models.Profile.objects.filter(
             username__in=all_backend_usernames
         ).values_list('username', flat=True)
         local_usernames = [profile.username for profile in profiles]
         stale_usernames = set(backend_usernames) - set(local_usernames)
 
-        for profile in freeipa_models.Profile.objects.filter(
-            username__in=stale_usernames
-        ):
+        stale_profiles = list(
+            freeipa_models.Profile.objects.filter(username__in=stale_usernames)
+        )
+        errors = self.client.delete_associations(
+            [profile.username.lower() for profile in stale_profiles], account
+        )
+
+        for profile in stale_profiles:
             username = profile.username.lower()
-            succeeded = self.delete_user(allocation, profile.user, username)
-            if succeeded:
-                try:
-                    models.Association.objects.get(
-                        allocation=allocation, username=username
-                    ).delete()
-                    logger.info(
-                        'Association between %s and %s has been deleted',
-                        allocation,
-                        profile.user,
-                    )
-                except models.Association.DoesNotExist:
-                    logger.warn(
-                        'Association between %s and %s has been already deleted',
-                        allocation,
-                        profile.user,
-                    )
+            if username in errors:
+                logger.error(
+                    'Unable to delete association in Slurm: %s', errors[username]
+                )
+                continue
+            signals.slurm_association_deleted.send(
+                models.Allocation, allocation=allocation, user=profile.user
+            )
+            try:
+                models.Association.objects.get(
+                    allocation=allocation, username=username
+                ).delete()
+                logger.info(
+                    'Association between %s and %s has been deleted',
+                    allocation,
+                    profile.user,
+                )
+            except models.Association.DoesNotExist:
+                logger.warn(
+                    'Association between %s and %s has been already deleted',
+                    allocation,
+                    profile.user,
+                )
 
     def create_allocation(self, allocation):
         project = allocation.project
@@ -224,8 +289,11 @@ class SlurmBackend(ServiceBackend):
                 continue
             self._update_quotas(allocation, usage)
 
-    def pull_allocation(self, allocation):
-        self.sync_users(allocation)
+    def pull_allocation(self, allocation, report=None, associations=None):
+        """
+        Usage report and associations grouped by account may be provided
+        by caller which pulls all allocations of the cluster.
+        """
         account = allocation.backend_id
 
         if not account.strip():
@@ -233,12 +301,20 @@ class SlurmBackend(ServiceBackend):
                 'Empty backend_id for allocation: %s' % allocation
             )
 
-        report = self.get_usage_report([account])
+        if associations is None:
+            lines = None
+            self.sync_users(allocation)
+        else:
+            lines = associations.get(account, [])
+            self.sync_users(allocation, [line.user for line in lines if line.user])
+
+        if report is None:
+            report = self.get_usage_report([account])
         usage = report.get(account)
         if not usage:
             usage = {'TOTAL_ACCOUNT_USAGE': Quotas()}
         self._update_quotas(allocation, usage)
-        limits = self.get_allocation_limits(account)
+        limits = self.get_allocation_limits(account, lines)
         self._update_limits(allocation, limits)
 
     def get_usage_report(self, accounts):
@@ -260,8 +336,19 @@ class SlurmBackend(ServiceBackend):
 
         return report
 
-    def get_allocation_limits(self, account):
-        lines = self.client.get_resource_limits(account)
+    def get_associations(self, accounts):
+        """
+        Returns dictionary where key is account name
+        and value is list of its association lines.
+        """
+        associations = {}
+        for line in self.client.list_associations(accounts):
+            associations.setdefault(line.account, []).append(line)
+        return associations
+
+    def get_allocation_limits(self, account, lines=None):
+        if lines is None:
+            lines = self.client.get_resource_limits(account)
         correct_lines = [
             association for association in lines if association.resource_limits
         ]
@@ -280,31 +367,74 @@ class SlurmBackend(ServiceBackend):
 
     @transaction.atomic()
     def _update_quotas(self, allocation, usage):
-        quotas = usage.pop('TOTAL_ACCOUNT_USAGE')
+        quotas = usage['TOTAL_ACCOUNT_USAGE']
         allocation.cpu_usage = quotas.cpu
         allocation.gpu_usage = quotas.gpu
         allocation.ram_usage = quotas.ram
         allocation.save(update_fields=['cpu_usage', 'gpu_usage', 'ram_usage'])
 
-        usernames = usage.keys()
+        self._update_user_usages(
+            allocation,
+            {
+                username: quotas
+                for username, quotas in usage.items()
+                if username != 'TOTAL_ACCOUNT_USAGE'
+            },
+        )
+
+    def _update_user_usages(self, allocation, usage):
+        if not usage:
+            return
+
+        now = timezone.now()
         usermap = {
             profile.username: profile.user
-            for profile in freeipa_models.Profile.objects.filter(username__in=usernames)
+            for profile in freeipa_models.Profile.objects.filter(
+                username__in=usage.keys()
+            ).select_related('user')
         }
-
-        for username, quotas in usage.items():
-            models.AllocationUserUsage.objects.update_or_create(
+        existing_usages = {
+            (user_usage.username, user_usage.user_id): user_usage
+            for user_usage in models.AllocationUserUsage.objects.filter(
                 allocation=allocation,
-                year=timezone.now().year,
-                month=timezone.now().month,
-                user=usermap.get(username),
-                username=username,
-                defaults={
-                    'cpu_usage': quotas.cpu,
-                    'gpu_usage': quotas.gpu,
-                    'ram_usage': quotas.ram,
-                },
+                year=now.year,
+                month=now.month,
+                username__in=usage.keys(),
             )
+        }
+
+        new_usages = []
+        changed_usages = []
+        for username, quotas in usage.items():
+            user = usermap.get(username)
+            values = {
+                'cpu_usage': quotas.cpu,
+                'gpu_usage': quotas.gpu,
+                'ram_usage': quotas.ram,
+            }
+            user_usage = existing_usages.get((username, user and user.id))
+            if user_usage is None:
+                new_usages.append(
+                    models.AllocationUserUsage(
+                        allocation=allocation,
+                        year=now.year,
+                        month=now.month,
+                        user=user,
+                        username=username,
+                        **values,
+                    )
+                )
+            elif any(
+                getattr(user_usage, field) != value for field, value in values.items()
+            ):
+                for field, value in values.items():
+                    setattr(user_usage, field, value)
+                changed_usages.append(user_usage)
+
+        models.AllocationUserUsage.objects.bulk_create(new_usages)
+        models.AllocationUserUsage.objects.bulk_update(
+            changed_usages, ['cpu_usage', 'gpu_usage', 'ram_usage']
+        )
 
     def create_customer(self, customer):
         customer_name = self.get_customer_name(customer)
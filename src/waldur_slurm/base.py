@@ -1,6 +1,10 @@
 import abc
+import collections
 import logging
+import os
+import re
 import subprocess  # noqa: S404
+import tempfile
 
 from django.utils.functional import cached_property
 
@@ -13,13 +17,180 @@ class BatchError(Exception):
     pass
 
 
+CommandResult = collections.namedtuple('CommandResult', ['status', 'output'])
+
+BATCH_STATUS_MARKER = '__waldur_batch_command_status__'
+
+
+class BaseTransport(metaclass=abc.ABCMeta):
+    """
+    Transport runs shell commands at SLURM master and returns their output.
+    """
+
+    @abc.abstractmethod
+    def run(self, command_line):
+        """
+        Run shell command line.
+        :param command_line: [string] shell command line
+        :return: [string] combined output of the command
+        Raises BatchError if command exits with non-zero status.
+        """
+        raise NotImplementedError()
+
+    def execute(self, command):
+        """
+        Execute single command.
+        :param command: list[string] command and its arguments
+        :return: [string] output
+        """
+        return self.run(' '.join(command))
+
+    def execute_batch(self, commands):
+        """
+        Execute several commands in one round trip.
+        Failure of one command does not stop the rest of commands.
+        :param commands: list[list[string]] commands and their arguments
+        :return: list[CommandResult] status and output of each command
+        """
+        if not commands:
+            return []
+        status_format = f"'\\n{BATCH_STATUS_MARKER} %d\\n'"
+        command_line = '; '.join(
+            '{}; printf {} $?'.format(' '.join(command), status_format)
+            for command in commands
+        )
+        parts = re.split(rf'\n{BATCH_STATUS_MARKER} (\d+)\n', self.run(command_line))
+        if len(parts) != 2 * len(commands) + 1:
+            raise BatchError(
+                f'Unable to parse output of batch of {len(commands)} commands.'
+            )
+        return [
+            CommandResult(int(status), output)
+            for output, status in zip(parts[0:-1:2], parts[1::2])
+        ]
+
+
+class SSHTransport(BaseTransport):
+    """
+    Runs commands at SLURM master over SSH.
+    If control_persist is positive, SSH connection is shared by consecutive
+    commands and kept open for given number of seconds after last command,
+    so that TCP connection and key exchange are not repeated for each command.
+
+    Master connection is started by a separate background process with its
+    output detached, because otherwise it keeps output pipe of the command
+    open and reading of command output blocks until master exits.
+    Commands only reuse master connection if it is available.
+    """
+
+    master_timeout = 30
+
+    def __init__(self, hostname, key_path, username='root', port=22, control_persist=0):
+        self.hostname = hostname
+        self.key_path = key_path
+        self.username = username
+        self.port = port
+        self.control_persist = control_persist
+
+    def get_options(self):
+        options = [
+            'UserKnownHostsFile=/dev/null',
+            'StrictHostKeyChecking=no',
+        ]
+        if self.control_persist:
+            options.append(
+                'ControlPath=' + os.path.join(tempfile.gettempdir(), 'waldur-slurm-%C')
+            )
+        return options
+
+    def get_ssh_command(self, *options):
+        ssh_command = ['ssh']
+        for option in self.get_options() + list(options):
+            ssh_command.extend(['-o', option])
+        ssh_command.extend(
+            [
+                f'{self.username}@{self.hostname}',
+                '-p',
+                str(self.port),
+                '-i',
+                self.key_path,
+            ]
+        )
+        return ssh_command
+
+    def call_detached(self, ssh_command):
+        try:
+            return subprocess.run(  # noqa: S603
+                ssh_command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=self.master_timeout,
+            ).returncode
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning('Failed to execute command "%s": %s', ssh_command, e)
+            return None
+
+    def start_master(self):
+        if self.call_detached(self.get_ssh_command() + ['-O', 'check']) == 0:
+            return
+        ssh_command = self.get_ssh_command(
+            'ControlMaster=yes', f'ControlPersist={self.control_persist}'
+        ) + ['-N', '-f']
+        logger.debug('Starting SSH master connection: %s', ' '.join(ssh_command))
+        if self.call_detached(ssh_command) != 0:
+            logger.warning(
+                'Unable to start SSH master connection to %s, '
+                'commands are executed over separate connections.',
+                self.hostname,
+            )
+
+    def run(self, command_line):
+        if self.control_persist:
+            self.start_master()
+            ssh_command = self.get_ssh_command('ControlMaster=no')
+        else:
+            ssh_command = self.get_ssh_command()
+        ssh_command.append(command_line)
+
+        try:
+            logger.debug('Executing SSH command: %s', ' '.join(ssh_command))
+            return subprocess.check_output(  # noqa: S603
+                ssh_command, stderr=subprocess.STDOUT, encoding='utf-8'
+            )
+        except subprocess.CalledProcessError as e:
+            logger.exception('Failed to execute command "%s".', ssh_command)
+            stdout = e.output or ''
+            lines = stdout.splitlines()
+            if len(lines) > 0 and lines[0].startswith('Warning: Permanently added'):
+                lines = lines[1:]
+            stdout = '\n'.join(lines)
+            raise BatchError(stdout)
+
+
 class BaseBatchClient(metaclass=abc.ABCMeta):
-    def __init__(self, hostname, key_path, username='root', port=22, use_sudo=False):
+    def __init__(
+        self,
+        hostname,
+        key_path,
+        username='root',
+        port=22,
+        use_sudo=False,
+        control_persist=0,
+        transport=None,
+    ):
         self.hostname = hostname
         self.key_path = key_path
         self.username = username
         self.port = port
         self.use_sudo = use_sudo
+        self.transport = transport or SSHTransport(
+            hostname=hostname,
+            key_path=key_path,
+            username=username,
+            port=port,
+            control_persist=control_persist,
+        )
 
     @abc.abstractmethod
     def list_accounts(self):
@@ -109,42 +280,22 @@ class BaseBatchClient(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
-    def execute_command(self, command):
-        server = f'{self.username}@{self.hostname}'
-        port = str(self.port)
+    def get_command(self, command):
         if self.use_sudo:
-            account_command = ['sudo']
-        else:
-            account_command = []
+            return ['sudo'] + list(command)
+        return list(command)
 
-        account_command.extend(command)
-        ssh_command = [
-            'ssh',
-            '-o',
-            'UserKnownHostsFile=/dev/null',
-            '-o',
-            'StrictHostKeyChecking=no',
-            server,
-            '-p',
-            port,
-            '-i',
-            self.key_path,
-            ' '.join(account_command),
-        ]
+    def execute_command(self, command):
+        return self.transport.execute(self.get_command(command))
 
-        try:
-            logger.debug('Executing SSH command: %s', ' '.join(ssh_command))
-            return subprocess.check_output(  # noqa: S603
-                ssh_command, stderr=subprocess.STDOUT, encoding='utf-8'
-            )
-        except subprocess.CalledProcessError as e:
-            logger.exception('Failed to execute command "%s".', ssh_command)
-            stdout = e.output or ''
-            lines = stdout.splitlines()
-            if len(lines) > 0 and lines[0].startswith('Warning: Permanently added'):
-                lines = lines[1:]
-            stdout = '\n'.join(lines)
-            raise BatchError(stdout)
+    def execute_commands(self, commands):
+        """
+        Execute several commands in one round trip.
+        :return: list[CommandResult]
+        """
+        return self.transport.execute_batch(
+            [self.get_command(command) for command in commands]
+        )
 
 
 class BaseReportLine(metaclass=abc.ABCMeta):
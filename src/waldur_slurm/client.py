@@ -2,7 +2,11 @@ import logging
 import re
 
 from waldur_slurm.base import BaseBatchClient, BatchError
-from waldur_slurm.parser import SlurmAssociationLine, SlurmReportLine
+from waldur_slurm.parser import (
+    SlurmAssociationLine,
+    SlurmReportLine,
+    SlurmUserAssociationLine,
+)
 from waldur_slurm.structures import Account, Association
 from waldur_slurm.utils import format_current_month
 
@@ -111,6 +115,52 @@ class SlurmClient(BaseBatchClient):
             ]
         )
 
+    def create_associations(self, usernames, account, default_account=''):
+        """
+        Create associations of several users with account in one round trip.
+        :return: dict where key is username of failed command and value is error message
+        """
+        results = self._execute_commands(
+            [
+                [
+                    'add',
+                    'user',
+                    username,
+                    f'account={account}',
+                    f'DefaultAccount={default_account}',
+                ]
+                for username in usernames
+            ]
+        )
+        return self._get_errors(usernames, results)
+
+    def delete_associations(self, usernames, account):
+        """
+        Delete associations of several users with account in one round trip.
+        :return: dict where key is username of failed command and value is error message
+        """
+        results = self._execute_commands(
+            [
+                [
+                    'remove',
+                    'user',
+                    'where',
+                    f'name={username}',
+                    'and',
+                    f'account={account}',
+                ]
+                for username in usernames
+            ]
+        )
+        return self._get_errors(usernames, results)
+
+    def _get_errors(self, keys, results):
+        return {
+            key: result.output.strip() or f'Exit status {result.status}'
+            for key, result in zip(keys, results)
+            if result.status
+        }
+
     def delete_association(self, username, account):
         return self._execute_command(
             [
@@ -152,6 +202,21 @@ class SlurmClient(BaseBatchClient):
             SlurmAssociationLine(line) for line in output.splitlines() if '|' in line
         ]
 
+    def list_associations(self, accounts):
+        args = [
+            'list',
+            'associations',
+            'format=account,user,GrpTRESMins',
+            'where',
+            'accounts=' + ','.join(accounts),
+        ]
+        output = self._execute_command(args, immediate=False)
+        return [
+            SlurmUserAssociationLine(line)
+            for line in output.splitlines()
+            if '|' in line
+        ]
+
     def list_account_users(self, account):
         args = [
             'list',
@@ -167,9 +232,20 @@ class SlurmClient(BaseBatchClient):
             if '|' in line and line[-1] != '|'
         ]
 
-    def _execute_command(self, command, command_name='sacctmgr', immediate=True):
+    def _get_command(self, command, command_name='sacctmgr', immediate=True):
         account_command = [command_name, '--parsable2', '--noheader']
         if immediate:
             account_command.append('--immediate')
         account_command.extend(command)
-        return self.execute_command(account_command)
+        return account_command
+
+    def _execute_command(self, command, command_name='sacctmgr', immediate=True):
+        return self.execute_command(self._get_command(command, command_name, immediate))
+
+    def _execute_commands(self, commands, command_name='sacctmgr', immediate=True):
+        return self.execute_commands(
+            [
+                self._get_command(command, command_name, immediate)
+                for command in commands
+            ]
+        )
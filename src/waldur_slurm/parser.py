@@ -123,3 +123,19 @@ class SlurmAssociationLine(SlurmReportLine):
     @cached_property
     def resource_limits(self):
         return self._resources
+
+
+class SlurmUserAssociationLine(SlurmAssociationLine):
+    """
+    Association line in format account|user|GrpTRESMins.
+    """
+
+    @cached_property
+    def user(self):
+        return self._parts[1]
+
+    @cached_property
+    def _resources(self):
+        if self._parts[2] != '':
+            pairs = self._parts[2].split(',')
+            return dict(pair.split('=') for pair in pairs)
@@ -34,12 +34,29 @@ allocation1|user2
 allocation1|user3
 """
 
+CLUSTER_REPORT = """
+allocation1|cpu=1,mem=51200M,node=1,gres/gpu=1,gres/gpu:tesla=1|00:01:00|user1|
+allocation2|cpu=2,mem=51200M,node=2,gres/gpu=2,gres/gpu:tesla=1|00:02:00|user2|
+"""
+
+CLUSTER_ASSOCIATIONS = """
+allocation1||cpu=400,mem=100M,gres/gpu=120
+allocation1|user1|
+allocation2||cpu=500,mem=200M,gres/gpu=130
+allocation2|user2|
+"""
+
 
 class BackendTest(TestCase):
     def setUp(self):
         self.fixture = fixtures.SlurmFixture()
         self.allocation = self.fixture.allocation
         self.account = self.allocation.backend_id
+        self.run_mock = mock.patch('subprocess.run').start()
+        self.run_mock.return_value.returncode = 0
+
+    def tearDown(self):
+        mock.patch.stopall()
 
     def prepare_limits_check(self, quotas):
         self.allocation.cpu_limit = quotas['CPU']
@@ -65,6 +82,10 @@ class BackendTest(TestCase):
             'UserKnownHostsFile=/dev/null',
             '-o',
             'StrictHostKeyChecking=no',
+            '-o',
+            'ControlPath=/tmp/waldur-slurm-%C',
+            '-o',
+            'ControlMaster=no',
             'root@localhost',
             '-p',
             '22',
@@ -125,6 +146,57 @@ class BackendTest(TestCase):
         self.assertEqual(user2_allocation_usage.gpu_usage, 2 * 2)
         self.assertEqual(user2_allocation_usage.ram_usage, 2 * 51200)
 
+    @freeze_time('2017-10-16')
+    @mock.patch('subprocess.check_output')
+    def test_pull_resources_fetches_report_and_associations_once(self, check_output):
+        allocation2 = factories.AllocationFactory(
+            service_settings=self.fixture.settings, project=self.fixture.project
+        )
+        accounts = {'allocation1': self.account, 'allocation2': allocation2.backend_id}
+
+        def execute_command(command, **kwargs):
+            output = (
+                CLUSTER_REPORT
+                if command[-1].startswith('sacct ')
+                else CLUSTER_ASSOCIATIONS
+            )
+            for key, account in accounts.items():
+                output = output.replace(key, account)
+            return output
+
+        check_output.side_effect = execute_command
+        freeipa_models.Profile.objects.create(
+            user=self.fixture.manager, username='user1'
+        )
+        models.AllocationUserUsage.objects.create(
+            allocation=self.allocation,
+            year=2017,
+            month=10,
+            user=self.fixture.manager,
+            username='user1',
+        )
+
+        backend = self.allocation.get_backend()
+        backend.pull_resources()
+
+        self.assertEqual(check_output.call_count, 2)
+        self.allocation.refresh_from_db()
+        allocation2.refresh_from_db()
+        self.assertEqual(self.allocation.cpu_usage, 1)
+        self.assertEqual(self.allocation.cpu_limit, 400)
+        self.assertEqual(allocation2.cpu_usage, 2 * 2)
+        self.assertEqual(allocation2.cpu_limit, 500)
+
+        user_usage = models.AllocationUserUsage.objects.get(
+            allocation=self.allocation, year=2017, month=10
+        )
+        self.assertEqual(user_usage.user, self.fixture.manager)
+        self.assertEqual(user_usage.cpu_usage, 1)
+        self.assertEqual(
+            models.AllocationUserUsage.objects.get(allocation=allocation2).gpu_usage,
+            2 * 2,
+        )
+
     @mock.patch('subprocess.check_output')
     def test_set_default_resource_limits(self, check_output):
         default_limits = django_settings.WALDUR_SLURM['DEFAULT_LIMITS']
@@ -28,6 +28,7 @@ class ParserTest(TestCase):
         self.subprocess_patcher = mock.patch('subprocess.check_output')
         self.subprocess_mock = self.subprocess_patcher.start()
         self.subprocess_mock.return_value = raw
+        mock.patch('subprocess.run').start().return_value.returncode = 0
 
         backend = self.fixture.settings.get_backend()
         return backend.get_usage_report(VALID_ALLOCATION)
@@ -0,0 +1,119 @@
+import subprocess  # noqa: S404
+from unittest import mock
+
+from django.test import TestCase
+
+from waldur_freeipa import models as freeipa_models
+from waldur_slurm import base, models
+
+from . import factories, fixtures
+from .utils import FakeTransport, override_plugin_settings
+
+
+class ShellTransport(base.BaseTransport):
+    def run(self, command_line):
+        return subprocess.check_output(  # noqa: S603, S607
+            ['sh', '-c', command_line], encoding='utf-8'
+        )
+
+
+class TransportTest(TestCase):
+    def test_batch_output_is_split_per_command(self):
+        results = ShellTransport().execute_batch(
+            [['echo', 'account1'], ['false'], ['printf', 'account2']]
+        )
+        self.assertEqual(
+            results,
+            [
+                base.CommandResult(0, 'account1\n'),
+                base.CommandResult(1, ''),
+                base.CommandResult(0, 'account2'),
+            ],
+        )
+
+    @mock.patch('subprocess.run')
+    @mock.patch('subprocess.check_output')
+    def test_ssh_master_is_started_with_detached_output(self, check_output, run):
+        run.return_value.returncode = 255
+        base.SSHTransport('localhost', '/etc/waldur/id_rsa', control_persist=60).run(
+            'sacctmgr list account'
+        )
+
+        self.assertEqual(run.call_count, 2)
+        check_command = run.call_args_list[0][0][0]
+        self.assertEqual(check_command[-2:], ['-O', 'check'])
+        master_command, master_kwargs = run.call_args_list[1]
+        self.assertIn('ControlMaster=yes', master_command[0])
+        self.assertIn('ControlPersist=60', master_command[0])
+        self.assertEqual(master_command[0][-2:], ['-N', '-f'])
+        for stream in ('stdin', 'stdout', 'stderr'):
+            self.assertEqual(master_kwargs[stream], subprocess.DEVNULL)
+
+        command = check_output.call_args[0][0]
+        self.assertIn('ControlMaster=no', command)
+        self.assertNotIn('ControlPersist=60', command)
+
+    @mock.patch('subprocess.run')
+    @mock.patch('subprocess.check_output')
+    def test_running_ssh_master_is_reused(self, check_output, run):
+        run.return_value.returncode = 0
+        base.SSHTransport('localhost', '/etc/waldur/id_rsa', control_persist=60).run(
+            'sacctmgr list account'
+        )
+        self.assertEqual(run.call_count, 1)
+        self.assertIn('ControlMaster=no', check_output.call_args[0][0])
+
+    @override_plugin_settings(SSH_CONTROL_PERSIST=0)
+    @mock.patch('subprocess.run')
+    @mock.patch('subprocess.check_output')
+    def test_ssh_connection_is_not_shared_if_it_is_disabled(self, check_output, run):
+        fixture = fixtures.SlurmFixture()
+        fixture.settings.get_backend().client.list_accounts()
+        run.assert_not_called()
+        command = check_output.call_args[0][0]
+        self.assertNotIn('ControlMaster=no', command)
+        self.assertFalse(any(arg.startswith('ControlPath=') for arg in command))
+
+
+class SyncUsersTest(TestCase):
+    def setUp(self):
+        self.fixture = fixtures.SlurmFixture()
+        self.allocation = self.fixture.allocation
+        self.account = self.allocation.backend_id
+        freeipa_models.Profile.objects.create(
+            user=self.fixture.manager, username='user1'
+        )
+        freeipa_models.Profile.objects.create(user=self.fixture.admin, username='user2')
+        freeipa_models.Profile.objects.create(user=self.fixture.user, username='user3')
+        factories.AssociationFactory(allocation=self.allocation, username='user3')
+
+        self.transport = FakeTransport(self.handle_command)
+        self.backend = self.allocation.get_backend()
+        self.backend.client.transport = self.transport
+
+    def handle_command(self, command):
+        if 'list' in command:
+            return f'{self.account}|\n{self.account}|user3\n'
+        if 'name=user3' in command:
+            return ''
+        if 'user2' in command:
+            raise base.BatchError('Unable to create association.')
+        return ''
+
+    def test_associations_are_changed_in_single_round_trip(self):
+        self.backend.sync_users(self.allocation)
+
+        self.assertEqual(len(self.transport.round_trips), 3)
+        list_round_trip, add_round_trip, remove_round_trip = self.transport.round_trips
+        self.assertEqual(len(add_round_trip), 2)
+        self.assertEqual(len(remove_round_trip), 1)
+
+        self.assertEqual(
+            set(self.allocation.associations.values_list('username', flat=True)),
+            {'user1'},
+        )
+        self.assertFalse(
+            models.Association.objects.filter(
+                allocation=self.allocation, username='user2'
+            ).exists()
+        )
@@ -3,8 +3,41 @@ import copy
 from django.conf import settings
 from django.test import override_settings
 
+from waldur_slurm import base
+
 
 def override_plugin_settings(**kwargs):
     os_settings = copy.deepcopy(settings.WALDUR_SLURM)
     os_settings.update(kwargs)
     return override_settings(WALDUR_SLURM=os_settings)
+
+
+class FakeTransport(base.BaseTransport):
+    """
+    Transport which does not connect to SLURM master.
+    Commands are recorded per round trip and their output is returned by handler.
+    Handler accepts command as list of strings and may raise BatchError.
+    """
+
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda command: '')
+        self.round_trips = []
+
+    def run(self, command_line):
+        return self.execute(command_line.split())
+
+    def execute(self, command):
+        self.round_trips.append([command])
+        return self.handler(command)
+
+    def execute_batch(self, commands):
+        if not commands:
+            return []
+        self.round_trips.append(commands)
+        results = []
+        for command in commands:
+            try:
+                results.append(base.CommandResult(0, self.handler(command)))
+            except base.BatchError as e:
+                results.append(base.CommandResult(1, str(e)))
+        return results